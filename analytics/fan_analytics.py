@@ -0,0 +1,230 @@
+# fan_analytics.py
+import argparse
+import time
+from typing import Optional
+
+import numpy as np
+
+from fan_columns import DEFAULT_CSV_PATH, NO_MERCHANT, FanTable
+from fan_sketches import FanSketches, store_sketches
+from fan_store import STORE_DIR, FanStore
+
+LEAGUES = {
+    'nba': 'NBA',
+    'nfl': 'NFL',
+    'nhl': 'NHL',
+    'mlb': 'MLB',
+    'mls': 'MLS',
+    'wnba': 'WNBA',
+    'nwsl': 'NWSL'
+}
+
+# Questions the chat route understands, used by --benchmark
+SAMPLE_QUESTIONS = [
+    "What are the most popular streaming services?",
+    "Show total spend by community",
+    "Which community has the most fans?",
+    "How many fans are in each community?",
+    "How many NFL fans are there?",
+    "How many unique fans are there?",
+    "What are the popular streaming services for NBA fans?",
+    "What is the average spend for NHL fans?",
+    "What is the net change in subscriptions for MLB fans?",
+    "Compare the top streaming services",
+]
+
+HELP_TEXT = (
+    "I'm not sure how to answer that question about the OTT fan movement data. You can ask about:\n\n"
+    "• Popular streaming services overall or for a specific league (NBA, NFL, etc.)\n"
+    "• Spending by community or average spend for a specific league\n"
+    "• Fan counts by community or for a specific league\n"
+    "• Net change in streaming subscriptions\n"
+    "• Comparison of top streaming services"
+)
+
+
+def format_merchant_name(merchant: str) -> str:
+    """netflix -> Netflix, disney_plus -> Disney Plus, _none_ -> None (same as the chat route)"""
+    if not merchant or merchant == NO_MERCHANT:
+        return 'None'
+    return ' '.join(word[:1].upper() + word[1:] for word in merchant.replace('_', ' ').split(' '))
+
+
+def extract_community(query: str) -> Optional[str]:
+    for key, value in LEAGUES.items():
+        if key in query:
+            return value
+    return None
+
+
+def pct(part, whole) -> str:
+    return f"{part / whole * 100:.1f}" if whole else "0.0"
+
+
+class FanAnalytics:
+    """The chat route's questions, each answered with one or two aggregates.
+
+    `source` is anything with `aggregate(by, where, exclude)` returning a
+    GroupTable, e.g. a FanTable. Answers match processQuery in
+    frontend/src/app/api/chat/route.js word for word.
+
+    With `sketches` (a FanSketches, e.g. store_sketches() over the store's
+    exports), overall popularity comes from the merged top-merchant summary
+    and "unique fans" questions from the merged distinct-fan counters,
+    instead of scanning rows.
+    """
+
+    def __init__(self, source, sketches: Optional[FanSketches] = None):
+        self.source = source
+        self.sketches = sketches
+
+    def total_rows(self, where=None) -> int:
+        return int(self.source.aggregate(where=where, measures=()).total('rows'))
+
+    def popular_merchants(self, community: Optional[str] = None, k: int = 5, measures=()):
+        where = {'COMMUNITY': community} if community else None
+        return self.source.aggregate(['PRIMARY_MERCHANT'], where=where, exclude={'PRIMARY_MERCHANT': NO_MERCHANT},
+                                     measures=measures).order(k=k)
+
+    def answer(self, query: str) -> str:
+        q = query.lower()
+        community = extract_community(q)
+
+        if 'popular' in q and 'streaming' in q and not community:
+            if self.sketches:
+                total = self.sketches.rows
+                top = [(row['merchant'], row['rows']) for row in self.sketches.popular_merchants()]
+            else:
+                total = self.total_rows()
+                groups = self.popular_merchants()
+                top = zip(groups['PRIMARY_MERCHANT'], groups['rows'])
+            lines = ["The most popular streaming services among all sports fans are:"]
+            for i, (merchant, count) in enumerate(top, 1):
+                lines.append(f"{i}. {format_merchant_name(merchant)}: {count} fans ({pct(count, total)}%)")
+            return '\n'.join(lines) + '\n'
+
+        if 'spend' in q and 'community' in q and 'average' not in q:
+            groups = self.source.aggregate(['COMMUNITY'], exclude={'COMMUNITY': ''},
+                                           measures=('PRIMARY_SPEND', 'SECONDARY_SPEND'))
+            spend = groups['PRIMARY_SPEND'] + groups['SECONDARY_SPEND']
+            order = np.argsort(-spend, kind='stable')
+            lines = ["Total streaming spend by sports community:"]
+            lines += [f"{groups['COMMUNITY'][i]}: ${spend[i]:.2f}" for i in order]
+            return '\n'.join(lines) + '\n'
+
+        if self.sketches and ('unique' in q or 'distinct' in q) and 'fans' in q:
+            who = f"{community} fans" if community else "fans"
+            return f"There are about {self.sketches.distinct_fans(community):,.0f} unique {who} in the dataset."
+
+        if ('which' in q or 'what' in q) and 'community' in q and 'most' in q:
+            groups = self.source.aggregate(['COMMUNITY'], measures=())
+            top = groups.order(k=1)
+            name, count = top['COMMUNITY'][0], top['rows'][0]
+            return (f"{name} has the most fans in this dataset with {count} fans "
+                    f"({pct(count, groups.total())}% of the total).")
+
+        if ('fans' in q and 'each community' in q) or ('how many' in q and 'fans' in q and 'community' in q):
+            groups = self.source.aggregate(['COMMUNITY'], measures=()).order()
+            total = groups.total()
+            lines = ["Fan counts by sports community:"]
+            lines += [f"{name}: {count} fans ({pct(count, total)}%)" for name, count in zip(groups['COMMUNITY'], groups['rows'])]
+            return '\n'.join(lines) + '\n'
+
+        if community and ('how many' in q or 'number of' in q or 'count' in q):
+            groups = self.source.aggregate(['COMMUNITY'], measures=())
+            count = int(groups['rows'][groups['COMMUNITY'] == community].sum())
+            return (f"There are {count} {community} fans in the dataset, "
+                    f"representing {pct(count, groups.total())}% of all fans.")
+
+        if community and 'popular' in q and 'streaming' in q:
+            top = self.popular_merchants(community)
+            if len(top) == 0:
+                return f"No streaming services found for {community} fans with sufficient data."
+            community_rows = self.total_rows({'COMMUNITY': community})
+            lines = [f"Top streaming services for {community} fans:"]
+            for i, (merchant, count) in enumerate(zip(top['PRIMARY_MERCHANT'], top['rows']), 1):
+                lines.append(f"{i}. {format_merchant_name(merchant)}: {count} fans ({pct(count, community_rows)}%)")
+            return '\n'.join(lines) + '\n'
+
+        if community and 'average' in q and 'spend' in q:
+            totals = self.source.aggregate(where={'COMMUNITY': community},
+                                           measures=('PRIMARY_SPEND', 'PRIMARY_SPEND_N',
+                                                     'SECONDARY_SPEND', 'SECONDARY_SPEND_N')).rows()
+            if not totals:
+                totals = [{'rows': 0, 'PRIMARY_SPEND': 0.0, 'PRIMARY_SPEND_N': 0, 'SECONDARY_SPEND': 0.0, 'SECONDARY_SPEND_N': 0}]
+            row = totals[0]
+            avg_primary = row['PRIMARY_SPEND'] / row['PRIMARY_SPEND_N'] if row['PRIMARY_SPEND_N'] else 0.0
+            avg_secondary = row['SECONDARY_SPEND'] / row['SECONDARY_SPEND_N'] if row['SECONDARY_SPEND_N'] else 0.0
+            total_spend = row['PRIMARY_SPEND'] + row['SECONDARY_SPEND']
+            avg_total = total_spend / row['rows'] if row['rows'] else float('nan')
+            return (f"For {community} fans ({row['rows']} total):\n"
+                    f"Average primary streaming spend: ${avg_primary:.2f}\n"
+                    f"Average secondary streaming spend: ${avg_secondary:.2f}\n"
+                    f"Total average spend per fan: ${avg_total:.2f}\n"
+                    f"Total community spend: ${total_spend:.2f}")
+
+        if 'net change' in q or ('wins' in q and 'losses' in q):
+            where = {'COMMUNITY': community} if community else None
+            totals = self.source.aggregate(where=where, measures=('WINS', 'LOSSES', 'NET')).rows()
+            row = totals[0] if totals else {'WINS': 0, 'LOSSES': 0, 'NET': 0}
+            heading = (f"Streaming subscription changes for {community} fans:" if community
+                       else "Overall streaming subscription changes:")
+            return (f"{heading}\n"
+                    f"New subscriptions (wins): {row['WINS']}\n"
+                    f"Canceled subscriptions (losses): {row['LOSSES']}\n"
+                    f"Net change: {row['NET']} ({'growth' if row['NET'] > 0 else 'decline'})")
+
+        if 'compare' in q and 'streaming' in q:
+            # One pass gives every merchant's community mix; the top 5 come from its margins
+            groups = self.source.aggregate(['PRIMARY_MERCHANT', 'COMMUNITY'], exclude={'PRIMARY_MERCHANT': NO_MERCHANT},
+                                           measures=('PRIMARY_SPEND',))
+            streaming_rows = groups.total()
+            top = groups.rollup(['PRIMARY_MERCHANT']).order(k=5)
+            lines = ["Comparison of top streaming services:", ""]
+            for merchant, count, spend in zip(top['PRIMARY_MERCHANT'], top['rows'], top['PRIMARY_SPEND']):
+                mix = groups['PRIMARY_MERCHANT'] == merchant
+                best = np.flatnonzero(mix)[np.argmax(groups['rows'][mix])]
+                lines.append(f"{format_merchant_name(merchant)}:")
+                lines.append(f"- Subscribers: {count} ({pct(count, streaming_rows)}% of streaming fans)")
+                lines.append(f"- Average spend: ${spend / count:.2f}")
+                lines.append(f"- Most common fan type: {groups['COMMUNITY'][best]} ({pct(groups['rows'][best], count)}%)")
+                lines.append("")
+            return '\n'.join(lines) + '\n'
+
+        return HELP_TEXT
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Answer fan movement questions from the columnar engine')
+    parser.add_argument('question', nargs='*', help='Question to answer, e.g. "popular streaming services for NBA"')
+    parser.add_argument('--csv', default=str(DEFAULT_CSV_PATH), help='Fan export CSV')
+    parser.add_argument('--store', action='store_true', help=f'Read the memory-mapped store in {STORE_DIR} instead of the CSV')
+    parser.add_argument('--benchmark', action='store_true', help='Time every sample question')
+    parser.add_argument('--scale', type=int, default=1, help='With --benchmark, repeat the rows this many times')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = FanStore().table() if args.store else FanTable.from_csv(args.csv)
+    if not len(table):
+        raise SystemExit("No fan rows loaded; convert an export with fan_store.py first")
+    print(f"📊 Loaded {len(table):,} rows ({table.nbytes / 1e6:.1f} MB of columns) in {time.perf_counter() - started:.2f}s")
+
+    if args.scale > 1:
+        table = FanTable({name: np.tile(column, args.scale) for name, column in table.columns.items()}, table.dictionaries)
+        print(f"📈 Scaled to {len(table):,} rows ({table.nbytes / 1e6:.1f} MB)")
+
+    # Per-export sketches saved with the store merge in milliseconds; for a CSV they take one pass
+    if args.store:
+        sketches = store_sketches(FanStore())
+    else:
+        sketches = FanSketches()
+        sketches.add(table)
+    analytics = FanAnalytics(table, sketches)
+    if args.question:
+        print(analytics.answer(' '.join(args.question)))
+
+    if args.benchmark:
+        for question in SAMPLE_QUESTIONS:
+            started = time.perf_counter()
+            analytics.answer(question)
+            print(f"⏱️ {(time.perf_counter() - started) * 1000:8.1f} ms  {question}")
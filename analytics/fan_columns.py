@@ -0,0 +1,297 @@
+# fan_columns.py
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CSV_PATH = Path(__file__).parent.parent / 'frontend' / 'public' / '2025-04-04 3_16pm.csv'
+
+# Columns stored as dictionary codes, in file order
+CATEGORICAL = ('COMMUNITY', 'MOVEMENT_GROUP', 'FAN_ID', 'PRIMARY_MERCHANT', 'SECONDARY_MERCHANT')
+# Subscription movement flags: WINS/LOSSES are 0/1, NET is -1/0/1
+MOVEMENT = ('WINS', 'LOSSES', 'NET')
+# Monthly spend; missing values are NaN
+SPEND = ('PRIMARY_SPEND', 'SECONDARY_SPEND')
+COLUMNS = CATEGORICAL + ('DAY_DATE',) + MOVEMENT + SPEND
+
+# Merchant placeholder for "no subscription" in the export
+NO_MERCHANT = '_none_'
+
+# Measures every aggregate returns. *_SPEND_N counts rows with a non-zero
+# spend, which is what the chat route averages over.
+MEASURES = ('rows',) + MOVEMENT + SPEND + tuple(f"{column}_N" for column in SPEND)
+
+# Above this many possible key combinations, group-bys switch from a dense
+# bincount to sorting the keys
+DENSE_GROUP_LIMIT = 1 << 22
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# Bytes read from each end of a file by sample_fingerprint
+SAMPLE_BYTES = 1 << 16
+
+
+def code_dtype(size: int) -> np.dtype:
+    """Smallest unsigned integer type that can index `size` dictionary entries"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def days_to_dates(days: np.ndarray) -> np.ndarray:
+    """int32 day numbers (days since 1970-01-01) -> datetime64[D]"""
+    return EPOCH + days.astype('timedelta64[D]')
+
+
+def dates_to_days(values) -> np.ndarray:
+    """ISO dates (strings or datetime64) -> int32 day numbers"""
+    return (np.asarray(values, dtype='datetime64[D]') - EPOCH).astype(np.int32)
+
+
+def file_fingerprint(path: Path) -> str:
+    """sha256 of a file's contents, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sample_fingerprint(path: Path, sample: int = SAMPLE_BYTES) -> str:
+    """sha256 of a file's size plus its first and last `sample` bytes
+
+    Cheap enough for the chat route to check on every cold start; route.js
+    computes the same digest.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode('ascii'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(sample))
+        if size > sample:
+            f.seek(max(sample, size - sample))
+            digest.update(f.read(sample))
+    return digest.hexdigest()
+
+
+class Dictionary:
+    """Append-only string dictionary; codes stay valid as new values are added"""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._array = None
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def extend(self, values: Iterable[str]):
+        index = self.index
+        new = [value for value in dict.fromkeys(values) if value not in index]
+        if new:
+            index.update(zip(new, range(len(self.values), len(self.values) + len(new))))
+            self.values.extend(new)
+            self._array = None
+
+    def code(self, value: str) -> Optional[int]:
+        return self.index.get(value)
+
+    def encode(self, uniques: Sequence[str], local_codes: np.ndarray) -> np.ndarray:
+        """Map codes from pd.factorize (local to one batch) onto this dictionary, growing it as needed"""
+        self.extend(uniques)
+        lookup = np.fromiter(map(self.index.__getitem__, uniques), dtype=np.int64, count=len(uniques))
+        return lookup[local_codes].astype(code_dtype(len(self)))
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        if self._array is None:
+            self._array = np.asarray(self.values, dtype=object)
+        return self._array[codes]
+
+
+class GroupTable:
+    """Result of an aggregate: one row per non-empty group, key columns decoded"""
+
+    def __init__(self, keys: Dict[str, np.ndarray], measures: Dict[str, np.ndarray]):
+        self.keys = keys
+        self.measures = measures
+
+    def __len__(self) -> int:
+        return len(self.measures['rows'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.keys[name] if name in self.keys else self.measures[name]
+
+    def total(self, measure: str = 'rows'):
+        return self.measures[measure].sum()
+
+    def order(self, measure: str = 'rows', descending: bool = True, k: Optional[int] = None) -> 'GroupTable':
+        """Groups sorted by a measure; ties keep dictionary (first seen) order, like a stable JS sort over countBy"""
+        values = self.measures[measure]
+        index = np.argsort(-values if descending else values, kind='stable')[:k]
+        return GroupTable({name: column[index] for name, column in self.keys.items()},
+                          {name: column[index] for name, column in self.measures.items()})
+
+    def rollup(self, by: Sequence[str]) -> 'GroupTable':
+        """Re-group on a subset of the key columns, summing every measure; groups keep first-seen order"""
+        key = np.zeros(len(self), dtype=np.int64)
+        for name in by:
+            codes, uniques = pd.factorize(self.keys[name])
+            key = key * max(len(uniques), 1) + codes
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind='stable')
+        ids = np.empty_like(order)
+        ids[order] = np.arange(len(order))
+        ids = ids[inverse]
+        measures = {
+            name: np.bincount(ids, weights=values, minlength=len(order)).astype(values.dtype)
+            for name, values in self.measures.items()
+        }
+        return GroupTable({name: self.keys[name][first[order]] for name in by}, measures)
+
+    def rows(self) -> List[Dict]:
+        names = list(self.keys) + list(self.measures)
+        columns = [self[name] for name in names]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+class FanTable:
+    """Fan movement rows as typed, dictionary-encoded NumPy columns.
+
+    Categorical columns hold small unsigned codes into a Dictionary (first
+    seen order), DAY_DATE holds int32 day numbers, WINS/LOSSES/NET int8 and
+    spend float32 with NaN for missing. Every question is answered by one
+    `aggregate` call: the group keys are combined into a single integer and
+    each measure is one weighted bincount over the whole column, so no pass
+    depends on the number of groups.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, Dictionary]):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def __len__(self) -> int:
+        return len(self.columns['DAY_DATE'])
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, dictionaries: Optional[Dict[str, Dictionary]] = None) -> 'FanTable':
+        """Encode a DataFrame with the export's columns, extending `dictionaries` if given"""
+        dictionaries = dictionaries if dictionaries is not None else {name: Dictionary() for name in CATEGORICAL}
+        columns = {}
+        for name in CATEGORICAL:
+            local_codes, uniques = pd.factorize(frame[name].fillna(NO_MERCHANT if 'MERCHANT' in name else ''))
+            columns[name] = dictionaries[name].encode(list(uniques), local_codes)
+        dates = frame['DAY_DATE']
+        columns['DAY_DATE'] = dates_to_days(dates.to_numpy() if pd.api.types.is_datetime64_any_dtype(dates)
+                                            else dates.to_numpy(dtype=str))
+        for name in MOVEMENT:
+            columns[name] = frame[name].fillna(0).to_numpy(dtype=np.int8)
+        for name in SPEND:
+            columns[name] = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float32)
+        return cls(columns, dictionaries)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CSV_PATH) -> 'FanTable':
+        frame = pd.read_csv(path, usecols=list(COLUMNS), dtype={name: str for name in CATEGORICAL + ('DAY_DATE',)},
+                            keep_default_na=False, na_values={name: [''] for name in MOVEMENT + SPEND})
+        return cls.from_frame(frame)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def code(self, column: str, value: str) -> Optional[int]:
+        return self.dictionaries[column].code(value)
+
+    def mask(self, where: Optional[Dict[str, str]] = None, exclude: Optional[Dict[str, str]] = None) -> Optional[np.ndarray]:
+        """Boolean row mask for column == value (where) and column != value (exclude), or None for all rows"""
+        mask = None
+        for column, value in (where or {}).items():
+            code = self.code(column, value)
+            hit = self.columns[column] == code if code is not None else np.zeros(len(self), dtype=bool)
+            mask = hit if mask is None else mask & hit
+        for column, value in (exclude or {}).items():
+            code = self.code(column, value)
+            if code is None:
+                continue
+            hit = self.columns[column] != code
+            mask = hit if mask is None else mask & hit
+        return mask
+
+    def _day_range(self):
+        days = self.columns['DAY_DATE']
+        return (int(days.min()), int(days.max())) if len(days) else (0, 0)
+
+    def _weights(self, measure: str, column) -> Optional[np.ndarray]:
+        """Per-row contribution to a measure; None means 1 per row"""
+        if measure == 'rows':
+            return None
+        if measure in MOVEMENT:
+            return column(measure)
+        if measure in SPEND:
+            return np.nan_to_num(column(measure))
+        values = column(measure[:-len('_N')])
+        return ~np.isnan(values) & (values != 0)
+
+    def aggregate(self, by: Sequence[str] = (), where: Optional[Dict[str, str]] = None,
+                  exclude: Optional[Dict[str, str]] = None, measures: Sequence[str] = MEASURES) -> GroupTable:
+        """MEASURES (all, or the ones asked for) for each non-empty group of `by`, over rows matching where/exclude"""
+        rows = self.mask(where, exclude)
+        selected = rows.sum() if rows is not None else len(self)
+
+        def column(name):
+            return self.columns[name] if rows is None else self.columns[name][rows]
+
+        # Combine the group columns' codes into one mixed-radix key per row
+        first_day, last_day = self._day_range()
+        sizes = []
+        key = None
+        for name in by:
+            codes = column(name).astype(np.int64)
+            if name in self.dictionaries:
+                size = len(self.dictionaries[name])
+            else:
+                codes -= first_day
+                size = last_day - first_day + 1
+            key = codes if key is None else key * size + codes
+            sizes.append(size)
+
+        combinations = int(np.prod(sizes, dtype=np.float64))
+        dense = combinations <= DENSE_GROUP_LIMIT
+        if key is None:
+            ids, groups = None, 1
+        elif dense:
+            ids, groups = key, combinations
+        else:
+            uniques, ids = np.unique(key, return_inverse=True)
+            groups = len(uniques)
+
+        def reduce(weights=None):
+            if ids is None:
+                return np.array([selected if weights is None else weights.sum(dtype=np.float64)])
+            return np.bincount(ids, weights=weights, minlength=groups)
+
+        counts = reduce(self._weights('rows', column))
+        results = {'rows': counts.astype(np.int64)}
+        for name in MEASURES[1:]:
+            if name in measures:
+                values = reduce(self._weights(name, column))
+                results[name] = values if name in SPEND else values.astype(np.int64)
+
+        # Drop empty groups; the rest stay in key order, i.e. dictionary (first seen) order
+        nonempty = np.flatnonzero(counts)
+        results = {name: values[nonempty] for name, values in results.items()}
+        if ids is None:
+            return GroupTable({}, results)
+
+        group_keys = nonempty if dense else uniques[nonempty]
+        keys = {}
+        for name, codes in zip(by, np.unravel_index(group_keys, sizes)):
+            if name in self.dictionaries:
+                keys[name] = self.dictionaries[name].decode(codes)
+            else:
+                keys[name] = days_to_dates(codes + first_day)
+        return GroupTable(keys, results)
@@ -0,0 +1,244 @@
+# fan_cube.py
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from fan_columns import (DEFAULT_CSV_PATH, MEASURES, SAMPLE_BYTES, SPEND, Dictionary, FanTable, GroupTable, code_dtype,
+                         dates_to_days, file_fingerprint, sample_fingerprint)
+
+# Cube dimensions; every chat question is a rollup of these
+DIMENSIONS = ('COMMUNITY', 'PRIMARY_MERCHANT', 'SECONDARY_MERCHANT', 'DAY_DATE')
+
+# Small rollup the chat route reads; its questions never split by day or secondary merchant
+ROUTE_DIMENSIONS = ('COMMUNITY', 'PRIMARY_MERCHANT')
+
+EXPORTS_DIR = DEFAULT_CSV_PATH.parent
+EXPORT_PATTERN = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*.csv'
+CACHE_DIR = Path(__file__).parent / '.cache' / 'cube'
+ROUTE_CUBE_PATH = EXPORTS_DIR / 'fan-cube.json'
+
+CUBE_VERSION = 1
+
+# Names the route uses for each measure in fan-cube.json
+ROUTE_MEASURES = {
+    'rows': 'rows',
+    'WINS': 'wins',
+    'LOSSES': 'losses',
+    'NET': 'net',
+    'PRIMARY_SPEND': 'primarySpend',
+    'PRIMARY_SPEND_N': 'primarySpendN',
+    'SECONDARY_SPEND': 'secondarySpend',
+    'SECONDARY_SPEND_N': 'secondarySpendN',
+}
+
+
+class FanCube(FanTable):
+    """Rollup of fan rows: one row per (community, merchants, day) with summed measures.
+
+    It has the same `aggregate` interface as FanTable, so FanAnalytics can
+    answer from it unchanged, but each cube row stands for many fan rows:
+    measures are sums of the stored measure columns instead of counts.
+    """
+
+    def _weights(self, measure: str, column) -> np.ndarray:
+        return column(measure)
+
+    @classmethod
+    def from_groups(cls, groups: GroupTable, dictionaries: Optional[Dict[str, Dictionary]] = None) -> 'FanCube':
+        """Encode an aggregate over DIMENSIONS (decoded keys) as a cube.
+
+        Codes follow `dictionaries` (the source's first-seen order) when given,
+        so ties between merchants or communities still break the way the
+        chat route's countBy over the raw rows does.
+        """
+        columns = {}
+        source = dictionaries or {}
+        dictionaries = {}
+        for name in DIMENSIONS:
+            if name == 'DAY_DATE':
+                columns[name] = dates_to_days(groups[name])
+                continue
+            codes, uniques = pd.factorize(groups[name])
+            dictionaries[name] = Dictionary(source[name].values if name in source else ())
+            columns[name] = dictionaries[name].encode(list(uniques), codes)
+        for name in MEASURES:
+            columns[name] = groups[name]
+        return cls(columns, dictionaries)
+
+    @classmethod
+    def from_table(cls, table: FanTable) -> 'FanCube':
+        return cls.from_groups(table.aggregate(DIMENSIONS), table.dictionaries)
+
+    @classmethod
+    def merge(cls, cubes: Iterable['FanCube']) -> 'FanCube':
+        """Combine cubes (e.g. daily partitions) into one, summing cells they share"""
+        cubes = list(cubes)
+        dictionaries = {name: Dictionary() for name in DIMENSIONS if name != 'DAY_DATE'}
+        parts = []
+        for cube in cubes:
+            columns = dict(cube.columns)
+            for name, dictionary in dictionaries.items():
+                # Re-map each partition's codes onto the shared dictionaries
+                columns[name] = dictionary.encode(cube.dictionaries[name].values, cube.columns[name].astype(np.int64))
+            parts.append(columns)
+        combined = {
+            name: np.concatenate([part[name] for part in parts]) if parts else np.zeros(0)
+            for name in DIMENSIONS + MEASURES
+        }
+        for name in dictionaries:
+            combined[name] = combined[name].astype(code_dtype(len(dictionaries[name])))
+        return cls.from_groups(cls(combined, dictionaries).aggregate(DIMENSIONS), dictionaries)
+
+    def save(self, path: Path, meta: Optional[Dict] = None):
+        """Write the cube as a compressed .npz (codes, measures and dictionaries)"""
+        arrays = {f"col_{name}": column for name, column in self.columns.items()}
+        arrays.update({f"dict_{name}": np.asarray(dictionary.values, dtype=str) for name, dictionary in self.dictionaries.items()})
+        arrays['meta'] = np.asarray(json.dumps({'version': CUBE_VERSION, **(meta or {})}))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp.npz')
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['FanCube']:
+        """Read a cube written by save(), or None if it is missing or from another version"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != CUBE_VERSION:
+                    return None
+                columns = {key[len('col_'):]: data[key] for key in data.files if key.startswith('col_')}
+                dictionaries = {key[len('dict_'):]: Dictionary(data[key].tolist()) for key in data.files if key.startswith('dict_')}
+        except (OSError, ValueError, KeyError):
+            return None
+        cube = cls(columns, dictionaries)
+        cube.meta = meta
+        return cube
+
+    def route_rollup(self, sources: Optional[List[Dict]] = None) -> Dict:
+        """COMMUNITY x PRIMARY_MERCHANT cells in the columnar JSON layout route.js reads
+
+        `sources` lists the fingerprints of each export summarized; the route
+        compares the size and sampled hash with the CSV it would otherwise parse.
+        """
+        groups = self.aggregate(ROUTE_DIMENSIONS)
+        communities = self.dictionaries['COMMUNITY']
+        merchants = self.dictionaries['PRIMARY_MERCHANT']
+        cells = {
+            'community': [communities.code(value) for value in groups['COMMUNITY']],
+            'merchant': [merchants.code(value) for value in groups['PRIMARY_MERCHANT']],
+        }
+        for name, key in ROUTE_MEASURES.items():
+            values = groups[name]
+            cells[key] = [round(float(value), 6) for value in values] if name in SPEND else values.tolist()
+        return {
+            'version': CUBE_VERSION,
+            'sources': sources or [],
+            'communities': communities.values,
+            'merchants': merchants.values,
+            'cells': cells,
+        }
+
+
+class CubeBuilder:
+    """Builds the fan cube from daily exports, one cached partition per CSV.
+
+    A partition is rebuilt only when its CSV's size or mtime changed and
+    its content hash differs, so a new daily export costs one CSV parse
+    plus a merge of small partition cubes.
+    """
+
+    def __init__(self, sources: List[Path], cache_dir: Path = CACHE_DIR):
+        self.sources = [Path(source) for source in sources]
+        self.cache_dir = Path(cache_dir)
+        self.stats = {'built': 0, 'reused': 0, 'removed': 0}
+        # Fingerprints of each export in the last build, as written to fan-cube.json
+        self.fingerprints: List[Dict] = []
+
+    def _partition_path(self, source: Path) -> Path:
+        return self.cache_dir / f"{source.stem}.npz"
+
+    def partition(self, source: Path) -> FanCube:
+        path = self._partition_path(source)
+        stat = source.stat()
+        cached = FanCube.load(path) if path.exists() else None
+        if cached is not None:
+            meta = cached.meta
+            if meta.get('size') == stat.st_size and meta.get('mtime_ns') == stat.st_mtime_ns:
+                self._record(source, stat.st_size, meta['sha256'])
+                self.stats['reused'] += 1
+                return cached
+            fingerprint = file_fingerprint(source)
+            if meta.get('sha256') == fingerprint:
+                cached.save(path, dict(meta, size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+                self._record(source, stat.st_size, fingerprint)
+                self.stats['reused'] += 1
+                return cached
+        else:
+            fingerprint = file_fingerprint(source)
+
+        started = time.perf_counter()
+        table = FanTable.from_csv(source)
+        cube = FanCube.from_table(table)
+        cube.save(path, {'source': source.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                         'sha256': fingerprint, 'fan_rows': len(table)})
+        self._record(source, stat.st_size, fingerprint)
+        self.stats['built'] += 1
+        print(f"🧊 {source.name}: {len(table):,} rows -> {len(cube):,} cells in {time.perf_counter() - started:.2f}s")
+        return cube
+
+    def _record(self, source: Path, size: int, fingerprint: str):
+        self.fingerprints.append({'name': source.name, 'size': size, 'sha256': fingerprint,
+                                  'sampleBytes': SAMPLE_BYTES, 'sampleSha256': sample_fingerprint(source)})
+
+    def build(self) -> FanCube:
+        self.fingerprints = []
+        cubes = [self.partition(source) for source in self.sources]
+        # Partitions whose export is gone drop out of the cube
+        wanted = {self._partition_path(source) for source in self.sources}
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.npz'):
+                if path not in wanted and path.name != 'cube.npz':
+                    path.unlink()
+                    self.stats['removed'] += 1
+        cube = FanCube.merge(cubes)
+        cube.save(self.cache_dir / 'cube.npz', {'sources': [source.name for source in self.sources]})
+        return cube
+
+
+def find_exports(directory: Path = EXPORTS_DIR) -> List[Path]:
+    return sorted(Path(directory).glob(EXPORT_PATTERN))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the fan rollup cube from daily exports')
+    parser.add_argument('sources', nargs='*', help=f'Export CSVs (default: {EXPORT_PATTERN} in {EXPORTS_DIR})')
+    parser.add_argument('--route-json', default=str(ROUTE_CUBE_PATH), help='Where to write the rollup the chat route reads')
+    parser.add_argument('--question', help='Answer a question from the cube after building it')
+    args = parser.parse_args()
+
+    sources = [Path(source) for source in args.sources] or find_exports()
+    if not sources:
+        raise SystemExit(f"No exports matching {EXPORT_PATTERN} in {EXPORTS_DIR}")
+
+    started = time.perf_counter()
+    builder = CubeBuilder(sources)
+    cube = builder.build()
+    print(f"✅ Cube: {len(cube):,} cells from {len(sources)} exports in {time.perf_counter() - started:.2f}s "
+          f"({builder.stats['built']} built, {builder.stats['reused']} reused, {builder.stats['removed']} removed)")
+
+    route_path = Path(args.route_json)
+    tmp_path = route_path.with_name(route_path.name + '.tmp')
+    tmp_path.write_text(json.dumps(cube.route_rollup(builder.fingerprints), separators=(',', ':')))
+    os.replace(tmp_path, route_path)
+    print(f"📝 Route rollup: {route_path} ({route_path.stat().st_size // 1024}KB)")
+
+    if args.question:
+        from fan_analytics import FanAnalytics
+        print(FanAnalytics(cube).answer(args.question))
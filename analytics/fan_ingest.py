@@ -0,0 +1,227 @@
+# fan_ingest.py
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from fan_columns import CATEGORICAL, COLUMNS, DEFAULT_CSV_PATH, MOVEMENT, NO_MERCHANT, SPEND, FanTable
+from fan_sketches import FanSketches, sketch_path, source_sketches
+from fan_store import STORE_DIR, FanStore
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+# Values the movement flags may take; anything else rejects the row
+MOVEMENT_VALUES = {'WINS': (0, 1), 'LOSSES': (0, 1), 'NET': (-1, 0, 1)}
+
+# Dedupe key layout: FAN_ID code in the high 32 bits, then COMMUNITY code, then day number
+COMMUNITY_BITS = 12
+DAY_BITS = 20
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+class KeySet:
+    """Exact set of uint64 keys held as sorted runs.
+
+    Each batch of new keys becomes a run, merged into the previous run
+    while that one is no more than twice its size, so there are O(log n)
+    runs to search and each key is re-sorted O(log n) times. Memory is
+    8 bytes per distinct key however large the input is.
+    """
+
+    def __init__(self, keys: np.ndarray = None):
+        self.runs = []
+        if keys is not None and len(keys):
+            self.runs.append(np.unique(keys))
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self.runs:
+            position = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found |= run[position] == keys
+        return found
+
+    def add(self, keys: np.ndarray):
+        """Add keys that are distinct and not in the set yet"""
+        if not len(keys):
+            return
+        run = np.sort(keys)
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]))
+        self.runs.append(run)
+
+
+class Ingester:
+    """Streams fan exports into a FanStore in bounded memory.
+
+    The CSV is read `chunk_rows` rows at a time; each chunk is validated,
+    deduplicated and appended to the store before the next one is read, so
+    memory depends on the chunk size and the number of distinct fans, not
+    on the size of the export. Progress is saved with every chunk, and an
+    interrupted export resumes after the last stored chunk. The export's
+    sketches (see fan_sketches) are updated with each chunk as well.
+
+    Rows are rejected when COMMUNITY or FAN_ID is empty, DAY_DATE is not a
+    YYYY-MM-DD date, or a movement flag is outside its allowed values.
+    Empty merchants become `_none_`, empty movement flags 0, and empty or
+    unparseable spend NaN (unparseable and negative spend is counted as
+    coerced).
+
+    With `dedupe`, only the first row for each (FAN_ID, DAY_DATE) is kept,
+    across chunks, exports and what is already in the store. With
+    `per_community` the key also includes COMMUNITY, so a fan followed in
+    two communities keeps a row in each.
+    """
+
+    def __init__(self, store: FanStore, chunk_rows: int = DEFAULT_CHUNK_ROWS, dedupe: bool = True,
+                 per_community: bool = False):
+        self.store = store
+        self.chunk_rows = chunk_rows
+        self.dedupe = dedupe
+        self.per_community = per_community
+        self.stats = {'read': 0, 'stored': 0, 'rejected': 0, 'duplicates': 0, 'coerced': 0}
+        self.seen = None
+
+    def _keys(self, fan_codes: np.ndarray, community_codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        keys = fan_codes.astype(np.uint64) << np.uint64(COMMUNITY_BITS + DAY_BITS)
+        if self.per_community:
+            if len(community_codes) and community_codes.max() >= 1 << COMMUNITY_BITS:
+                raise ValueError(f"More than {1 << COMMUNITY_BITS} communities; widen COMMUNITY_BITS")
+            keys |= community_codes.astype(np.uint64) << np.uint64(DAY_BITS)
+        return keys | days.astype(np.uint64)
+
+    def _load_seen(self):
+        table = self.store.table()
+        self.seen = KeySet(self._keys(table.columns['FAN_ID'], table.columns['COMMUNITY'], table.columns['DAY_DATE']))
+
+    def clean(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Validate and coerce a parsed chunk; returns the valid rows"""
+        frame = chunk
+        valid = (frame['COMMUNITY'] != '') & (frame['FAN_ID'] != '')
+
+        days = pd.to_datetime(frame['DAY_DATE'], format='%Y-%m-%d', errors='coerce')
+        valid &= days.notna() & (days.dt.year >= 1970)
+        frame['DAY_DATE'] = days
+
+        for name in ('PRIMARY_MERCHANT', 'SECONDARY_MERCHANT'):
+            frame[name] = frame[name].replace('', NO_MERCHANT)
+
+        # Numeric columns arrive as floats with NaN for empty cells, or as strings if the chunk has junk in them
+        for name in MOVEMENT:
+            values = pd.to_numeric(frame[name], errors='coerce')
+            valid &= values.isin(MOVEMENT_VALUES[name]) | frame[name].isna()
+            frame[name] = values.fillna(0)
+
+        for name in SPEND:
+            values = pd.to_numeric(frame[name], errors='coerce')
+            coerced = (values.isna() & frame[name].notna()) | (values < 0)
+            self.stats['coerced'] += int(coerced[valid].sum())
+            frame[name] = values.mask(coerced)
+
+        self.stats['rejected'] += int((~valid).sum())
+        return frame[valid]
+
+    def _drop_duplicates(self, table: FanTable) -> FanTable:
+        if self.seen is None:
+            self._load_seen()
+        # Key on the store's codes, so duplicates are found across chunks and exports
+        fan_codes = self.store.dictionaries['FAN_ID'].encode(table.dictionaries['FAN_ID'].values,
+                                                            table.columns['FAN_ID'].astype(np.int64))
+        community_codes = self.store.dictionaries['COMMUNITY'].encode(table.dictionaries['COMMUNITY'].values,
+                                                                     table.columns['COMMUNITY'].astype(np.int64))
+        keys = self._keys(fan_codes, community_codes, table.columns['DAY_DATE'])
+
+        uniques, first = np.unique(keys, return_index=True)
+        new = ~self.seen.contains(uniques)
+        self.seen.add(uniques[new])
+        keep = np.sort(first[new])
+        self.stats['duplicates'] += len(table) - len(keep)
+        if len(keep) == len(table):
+            return table
+        return FanTable({name: column[keep] for name, column in table.columns.items()}, table.dictionaries)
+
+    def ingest(self, path: Path):
+        """Append one export to the store, resuming it if an earlier run was interrupted"""
+        path = Path(path)
+        stat = path.stat()
+        existing = self.store.source(path.name)
+        skip = 0
+        if existing:
+            if existing.get('size') != stat.st_size or existing.get('mtime_ns') != stat.st_mtime_ns:
+                raise SystemExit(f"{path.name} changed since it was loaded; rebuild the store to reload it")
+            if existing.get('complete'):
+                print(f"⏭️ {path.name}: already in the store ({existing['rows']:,} rows)")
+                return
+            if existing is not self.store.manifest['sources'][-1]:
+                raise SystemExit(f"{path.name} was interrupted before other exports were added; rebuild the store")
+            skip = existing.get('read', 0)
+            print(f"↩️ {path.name}: resuming after {skip:,} rows")
+
+        # Sketches for this export are kept up to date with every chunk the store takes
+        sketches = source_sketches(self.store, path.name) if existing else FanSketches()
+        read = skip
+        started = time.perf_counter()
+        reader = pd.read_csv(path, usecols=list(COLUMNS), dtype={name: object for name in CATEGORICAL + ('DAY_DATE',)},
+                             keep_default_na=False, na_values={name: [''] for name in MOVEMENT + SPEND},
+                             skipinitialspace=True, low_memory=False, chunksize=self.chunk_rows,
+                             skiprows=(lambda i: 0 < i <= skip) if skip else None)
+        with reader:
+            for chunk in reader:
+                read += len(chunk)
+                self.stats['read'] += len(chunk)
+                table = FanTable.from_frame(self.clean(chunk))
+                if self.dedupe:
+                    table = self._drop_duplicates(table)
+                self.store.append(table, path.name, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                                  read=read, complete=False)
+                sketches.add(table)
+                sketches.save(sketch_path(self.store, path.name), {'source': path.name})
+                self.stats['stored'] += len(table)
+                elapsed = time.perf_counter() - started
+                print(f"📥 {path.name}: {read:,} rows read, {self.stats['stored']:,} stored - "
+                      f"{(read - skip) / elapsed:,.0f} rows/s, peak RSS {peak_rss_mb():.0f} MB")
+
+        if self.store.source(path.name) is None:
+            # An export with no data rows still counts as loaded
+            self.store.append(FanTable.from_frame(pd.DataFrame(columns=list(COLUMNS))), path.name,
+                              size=stat.st_size, mtime_ns=stat.st_mtime_ns, read=read, complete=False)
+        self.store.update_source(path.name, complete=True)
+
+    def summary(self, elapsed: float) -> Dict:
+        return dict(self.stats, seconds=round(elapsed, 2),
+                    rows_per_second=round(self.stats['read'] / elapsed) if elapsed > 0 else 0,
+                    peak_rss_mb=round(peak_rss_mb(), 1))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Stream fan exports into the columnar store in bounded memory')
+    parser.add_argument('sources', nargs='*', help=f'Export CSVs (default: {DEFAULT_CSV_PATH.name})')
+    parser.add_argument('--store', default=str(STORE_DIR), help='Store directory')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows parsed per chunk')
+    parser.add_argument('--keep-duplicates', action='store_true', help='Store every row, even repeated FAN_ID/DAY_DATE pairs')
+    parser.add_argument('--per-community', action='store_true', help='Dedupe on FAN_ID/DAY_DATE/COMMUNITY instead')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    ingester = Ingester(FanStore(Path(args.store)), chunk_rows=args.chunk_rows, dedupe=not args.keep_duplicates,
+                        per_community=args.per_community)
+    for source in [Path(source) for source in args.sources] or [DEFAULT_CSV_PATH]:
+        ingester.ingest(source)
+
+    summary = ingester.summary(time.perf_counter() - started)
+    print(f"✅ Read {summary['read']:,} rows in {summary['seconds']}s ({summary['rows_per_second']:,} rows/s), "
+          f"stored {summary['stored']:,}, rejected {summary['rejected']:,}, duplicates {summary['duplicates']:,}, "
+          f"spend values coerced {summary['coerced']:,}; peak RSS {summary['peak_rss_mb']} MB")
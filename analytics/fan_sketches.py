@@ -0,0 +1,291 @@
+# fan_sketches.py
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fan_columns import NO_MERCHANT, FanTable
+from fan_store import STORE_DIR, FanStore
+
+SKETCH_VERSION = 1
+
+# 2**14 one-byte registers per group: about 0.8% standard error on distinct counts
+DEFAULT_PRECISION = 14
+
+# Counters kept by the top-merchant summary; top-k answers are exact while k is well below this
+DEFAULT_CAPACITY = 64
+
+
+def fan_hashes(values: Sequence[str]) -> np.ndarray:
+    """64-bit hashes of FAN_ID strings, stable across processes so sketches from any run merge"""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counters for a set of named groups, one row of registers per group"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, names: Sequence[str] = (), registers: np.ndarray = None):
+        self.precision = precision
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.registers = registers if registers is not None else np.zeros((len(self.names), 1 << precision), np.uint8)
+
+    def _rows(self, names: Sequence[str]) -> np.ndarray:
+        """Register rows for `names`, adding empty rows for groups not seen before"""
+        new = [name for name in dict.fromkeys(names) if name not in self.index]
+        if new:
+            self.index.update(zip(new, range(len(self.names), len(self.names) + len(new))))
+            self.names.extend(new)
+            self.registers = np.vstack([self.registers, np.zeros((len(new), 1 << self.precision), np.uint8)])
+        return np.fromiter(map(self.index.__getitem__, names), dtype=np.int64, count=len(names))
+
+    def add(self, names: Sequence[str], codes: np.ndarray, hashes: np.ndarray):
+        """Count hashes[i] in group names[codes[i]]"""
+        rows = self._rows(names)[codes]
+        low_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(low_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << low_bits) - 1)
+        # Rank is the position of the first set bit in the low bits; log2 is exact below 2**53
+        ranks = np.full(len(hashes), low_bits + 1, dtype=np.uint8)
+        nonzero = rest != 0
+        ranks[nonzero] = low_bits - np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.uint8)
+        np.maximum.at(self.registers, (rows, buckets), ranks)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog precision {other.precision} into {self.precision}")
+        rows = self._rows(other.names)
+        self.registers[rows] = np.maximum(self.registers[rows], other.registers)
+
+    def estimates(self) -> Dict[str, float]:
+        m = 1 << self.precision
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum(axis=1)
+        zeros = (self.registers == 0).sum(axis=1)
+        # Small cardinalities are more accurate with linear counting over the empty registers
+        linear = m * np.log(m / np.maximum(zeros, 1))
+        estimates = np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+        return dict(zip(self.names, estimates.tolist()))
+
+    def estimate(self, name: str) -> float:
+        return self.estimates().get(name, 0.0)
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters: at most `capacity` counters, each count an overestimate by at most its error.
+
+    Any item with a true count above total / capacity is guaranteed to be
+    kept, and summaries merge (Agarwal et al.), so per-day summaries combine
+    into one for any range of days.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, item: str, weight: int = 1):
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer may have been counted that many times before
+            smallest = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(smallest)
+            del self.errors[smallest]
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+
+    def _floor(self) -> int:
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: 'SpaceSaving'):
+        mine, theirs = self._floor(), other._floor()
+        counts, errors = {}, {}
+        for item in dict.fromkeys(list(self.counts) + list(other.counts)):
+            counts[item] = self.counts.get(item, mine) + other.counts.get(item, theirs)
+            errors[item] = self.errors.get(item, mine) + other.errors.get(item, theirs)
+        kept = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """(item, count, error) by count, highest first; ties keep insertion order"""
+        items = sorted(self.counts, key=self.counts.get, reverse=True)[:k]
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+
+class FanSketches:
+    """Constant-size summaries of fan rows that merge across store sources (daily exports).
+
+    Holds distinct-fan HyperLogLogs overall, per COMMUNITY and per
+    PRIMARY_MERCHANT, and a Space-Saving summary of streaming rows per
+    merchant. Their size depends on the number of communities and
+    merchants, not on the number of rows, so popularity over months of
+    partitions is a merge of small arrays.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, capacity: int = DEFAULT_CAPACITY):
+        self.rows = 0
+        self.fans = HyperLogLog(precision)
+        self.communities = HyperLogLog(precision)
+        self.merchants = HyperLogLog(precision)
+        self.top_merchants = SpaceSaving(capacity)
+
+    def add(self, table: FanTable):
+        if not len(table):
+            return
+        row_hashes = fan_hashes(table.dictionaries['FAN_ID'].values)[table.columns['FAN_ID']]
+        self.fans.add(['all'], np.zeros(len(table), dtype=np.int64), row_hashes)
+        self.communities.add(table.dictionaries['COMMUNITY'].values, table.columns['COMMUNITY'], row_hashes)
+
+        streaming = table.mask(exclude={'PRIMARY_MERCHANT': NO_MERCHANT})
+        merchants = table.columns['PRIMARY_MERCHANT']
+        if streaming is not None:
+            merchants, row_hashes = merchants[streaming], row_hashes[streaming]
+        names = table.dictionaries['PRIMARY_MERCHANT'].values
+        self.merchants.add(names, merchants, row_hashes)
+        counts = np.bincount(merchants, minlength=len(names))
+        for code in np.flatnonzero(counts):
+            self.top_merchants.add(names[code], int(counts[code]))
+        self.rows += len(table)
+
+    @classmethod
+    def merge(cls, sketches: Iterable['FanSketches']) -> 'FanSketches':
+        merged = None
+        for sketch in sketches:
+            if merged is None:
+                merged = cls(sketch.fans.precision, sketch.top_merchants.capacity)
+            merged.rows += sketch.rows
+            merged.fans.merge(sketch.fans)
+            merged.communities.merge(sketch.communities)
+            merged.merchants.merge(sketch.merchants)
+            merged.top_merchants.merge(sketch.top_merchants)
+        return merged or cls()
+
+    def distinct_fans(self, community: Optional[str] = None) -> float:
+        return self.communities.estimate(community) if community else self.fans.estimate('all')
+
+    def popular_merchants(self, k: int = 5) -> List[Dict]:
+        """Top merchants by streaming rows, with their distinct-fan estimates"""
+        fans = self.merchants.estimates()
+        return [{'merchant': merchant, 'rows': count, 'error': error, 'fans': fans.get(merchant, 0.0)}
+                for merchant, count, error in self.top_merchants.top(k)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.fans.registers.nbytes + self.communities.registers.nbytes + self.merchants.registers.nbytes
+
+    def save(self, path: Path, meta: Optional[Dict] = None):
+        arrays = {}
+        for name in ('fans', 'communities', 'merchants'):
+            hll = getattr(self, name)
+            arrays[f"{name}_registers"] = hll.registers
+            arrays[f"{name}_names"] = np.asarray(hll.names, dtype=str)
+        top = self.top_merchants.top()
+        arrays['top_items'] = np.asarray([item for item, _, _ in top], dtype=str)
+        arrays['top_counts'] = np.asarray([count for _, count, _ in top], dtype=np.int64)
+        arrays['top_errors'] = np.asarray([error for _, _, error in top], dtype=np.int64)
+        arrays['meta'] = np.asarray(json.dumps({
+            'version': SKETCH_VERSION, 'rows': self.rows, 'precision': self.fans.precision,
+            'capacity': self.top_merchants.capacity, **(meta or {})
+        }))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp.npz')
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['FanSketches']:
+        """Read sketches written by save(), or None if missing or from another version"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != SKETCH_VERSION:
+                    return None
+                sketches = cls(meta['precision'], meta['capacity'])
+                for name in ('fans', 'communities', 'merchants'):
+                    setattr(sketches, name, HyperLogLog(meta['precision'], data[f"{name}_names"].tolist(),
+                                                        data[f"{name}_registers"]))
+                for item, count, error in zip(data['top_items'].tolist(), data['top_counts'].tolist(),
+                                              data['top_errors'].tolist()):
+                    sketches.top_merchants.counts[item] = count
+                    sketches.top_merchants.errors[item] = error
+        except (OSError, ValueError, KeyError):
+            return None
+        sketches.rows = meta['rows']
+        sketches.meta = meta
+        return sketches
+
+
+def sketch_path(store: FanStore, source: str) -> Path:
+    return store.path / 'sketches' / f"{source}.npz"
+
+
+def source_sketches(store: FanStore, source: str) -> FanSketches:
+    """Sketches for one store source, rebuilt from its stored rows if missing or behind the store"""
+    path = sketch_path(store, source)
+    stored = store.source(source)
+    sketches = FanSketches.load(path)
+    if sketches is not None and sketches.rows == stored['rows']:
+        return sketches
+
+    table = store.table()
+    rows = slice(stored['start'], stored['start'] + stored['rows'])
+    sketches = FanSketches()
+    sketches.add(FanTable({name: column[rows] for name, column in table.columns.items()}, table.dictionaries))
+    sketches.save(path, {'source': source})
+    return sketches
+
+
+def store_sketches(store: FanStore, sources: Optional[Sequence[str]] = None) -> FanSketches:
+    """Sketches for `sources` (default every source in the store), merged from each source's saved sketches"""
+    names = sources or [source['name'] for source in store.manifest['sources']]
+    return FanSketches.merge(source_sketches(store, name) for name in names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Approximate distinct fans and top merchants from per-export sketches')
+    parser.add_argument('sources', nargs='*', help='Store sources (export file names) to merge; default all')
+    parser.add_argument('--store', default=str(STORE_DIR), help='Store directory')
+    parser.add_argument('-k', type=int, default=5, help='Merchants to list')
+    parser.add_argument('--check', action='store_true', help='Compare with exact counts from the stored rows')
+    args = parser.parse_args()
+
+    store = FanStore(Path(args.store))
+    names = args.sources or [source['name'] for source in store.manifest['sources']]
+    if not names:
+        raise SystemExit("The store is empty; load exports with fan_ingest.py first")
+
+    started = time.perf_counter()
+    sketches = store_sketches(store, names)
+    merged = time.perf_counter() - started
+
+    print(f"🧮 {len(names)} sources, {sketches.rows:,} rows, sketches {sketches.nbytes / 1024:.0f}KB, "
+          f"loaded and merged in {merged * 1000:.1f} ms")
+    print(f"Distinct fans: ~{sketches.distinct_fans():,.0f}")
+    for community, estimate in sorted(sketches.communities.estimates().items(), key=lambda item: -item[1]):
+        print(f"  {community}: ~{estimate:,.0f} fans")
+    print("Top streaming services:")
+    for i, row in enumerate(sketches.popular_merchants(args.k), 1):
+        print(f"  {i}. {row['merchant']}: {row['rows']:,} rows (±{row['error']:,}), ~{row['fans']:,.0f} fans")
+
+    if args.check:
+        table = store.table()
+        exact = pd.DataFrame({name: table.dictionaries[name].decode(table.columns[name])
+                              for name in ('COMMUNITY', 'PRIMARY_MERCHANT', 'FAN_ID')})
+        streaming = exact[exact['PRIMARY_MERCHANT'] != NO_MERCHANT]
+        print(f"Exact distinct fans: {exact['FAN_ID'].nunique():,}")
+        for name, group in (('community', exact.groupby('COMMUNITY')), ('merchant', streaming.groupby('PRIMARY_MERCHANT'))):
+            estimates = (sketches.communities if name == 'community' else sketches.merchants).estimates()
+            errors = [abs(estimates[key] - count) / count for key, count in group['FAN_ID'].nunique().items()]
+            print(f"Per-{name} distinct fans: mean error {np.mean(errors) * 100:.2f}%, max {np.max(errors) * 100:.2f}%")
+        top = streaming['PRIMARY_MERCHANT'].value_counts().head(args.k)
+        print(f"Exact top {args.k}: {', '.join(f'{merchant} {count:,}' for merchant, count in top.items())}")
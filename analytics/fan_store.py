@@ -0,0 +1,285 @@
+# fan_store.py
+import argparse
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from fan_columns import CATEGORICAL, COLUMNS, DEFAULT_CSV_PATH, Dictionary, FanTable, code_dtype, file_fingerprint
+
+STORE_DIR = Path(__file__).parent / '.cache' / 'store'
+STORE_VERSION = 1
+
+# On-disk type of each column. Code columns start wide enough that appends
+# rarely outgrow them; when a dictionary does, the column is widened in place.
+STORAGE_DTYPES = {
+    'COMMUNITY': np.uint16,
+    'MOVEMENT_GROUP': np.uint16,
+    'FAN_ID': np.uint32,
+    'PRIMARY_MERCHANT': np.uint16,
+    'SECONDARY_MERCHANT': np.uint16,
+    'DAY_DATE': np.int32,
+    'WINS': np.int8,
+    'LOSSES': np.int8,
+    'NET': np.int8,
+    'PRIMARY_SPEND': np.float32,
+    'SECONDARY_SPEND': np.float32,
+}
+
+
+def _write_header(f, dtype: np.dtype, rows: int):
+    # numpy pads 1.0 headers so the row count can grow without moving the data
+    f.seek(0)
+    npy_format.write_array_header_1_0(f, {'descr': npy_format.dtype_to_descr(np.dtype(dtype)),
+                                          'fortran_order': False, 'shape': (rows,)})
+
+
+def _data_offset(f) -> int:
+    f.seek(0)
+    npy_format.read_magic(f)
+    npy_format.read_array_header_1_0(f)
+    return f.tell()
+
+
+def append_column(path: Path, values: np.ndarray, rows: int):
+    """Append values to a growable .npy column holding `rows` committed rows.
+
+    Anything past the committed rows (left by an interrupted append) is
+    overwritten. The header is rewritten last, so readers that trust the
+    manifest's row count never see a partial write.
+    """
+    if not path.exists():
+        with open(path, 'wb') as f:
+            _write_header(f, values.dtype, 0)
+    with open(path, 'r+b') as f:
+        offset = _data_offset(f)
+        f.seek(offset + rows * values.dtype.itemsize)
+        f.write(np.ascontiguousarray(values).tobytes())
+        f.truncate()
+        _write_header(f, values.dtype, rows + len(values))
+
+
+def map_column(path: Path, rows: int) -> np.ndarray:
+    """First `rows` values of a column file, memory-mapped read-only"""
+    if rows == 0:
+        with open(path, 'rb') as f:
+            npy_format.read_magic(f)
+            _, _, dtype = npy_format.read_array_header_1_0(f)
+        return np.zeros(0, dtype=dtype)
+    return np.asarray(np.load(path, mmap_mode='r')[:rows])
+
+
+def read_dictionary(path: Path, count: int) -> List[str]:
+    """First `count` values of a JSON-lines dictionary file"""
+    if count == 0 or not path.exists():
+        return []
+    # Lines past `count` may be left over from an interrupted append
+    lines = path.read_text(encoding='utf-8').split('\n', count)[:count]
+    # One JSON string per line, so the committed lines parse as a single array
+    return json.loads('[' + ','.join(lines) + ']')
+
+
+def append_dictionary(path: Path, values: List[str], offset: int) -> int:
+    """Write values after the first `offset` committed bytes of a dictionary file; returns the new size"""
+    with open(path, 'r+b' if path.exists() else 'wb') as f:
+        f.seek(offset)
+        # A newline item separator gives one JSON string per line, dumped in a single call
+        f.write((json.dumps(list(values), separators=('\n', ':'))[1:-1] + '\n').encode('utf-8'))
+        f.truncate()
+        return f.tell()
+
+
+class StoredDictionaries(Mapping):
+    """Column name -> Dictionary, each read from disk the first time it's used.
+
+    Questions only look up communities and merchants, so the large FAN_ID
+    dictionary is never read at startup.
+    """
+
+    def __init__(self, directory: Path, counts: Dict[str, int]):
+        self.directory = directory
+        self.counts = counts
+        self._loaded: Dict[str, Dictionary] = {}
+
+    def __getitem__(self, name: str) -> Dictionary:
+        if name not in self.counts:
+            raise KeyError(name)
+        if name not in self._loaded:
+            self._loaded[name] = Dictionary(read_dictionary(self.directory / f"{name}.jsonl", self.counts[name]))
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.counts)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class FanStore:
+    """Fan rows on disk as one growable, memory-mapped .npy file per column.
+
+    Layout under `path`:
+      manifest.json         committed row count, column types, dictionary sizes and byte lengths, sources
+      columns/<NAME>.npy    one flat array per column, codes for categorical columns
+      dictionaries/<NAME>.jsonl  append-only string dictionary, one JSON string per line
+
+    Opening the store reads the manifest and maps the columns, so a cold
+    process answers its first question without parsing anything, and
+    processes on one machine share the mapped pages through the OS cache.
+    Appends write column data and new dictionary entries first and the
+    manifest last; the manifest's counts are what readers trust.
+    """
+
+    def __init__(self, path: Path = STORE_DIR):
+        self.path = Path(path)
+        self.manifest = self._read_manifest()
+        self._dictionaries = None
+
+    def _read_manifest(self) -> Dict:
+        try:
+            manifest = json.loads((self.path / 'manifest.json').read_text())
+        except (OSError, ValueError):
+            manifest = None
+        if not manifest or manifest.get('version') != STORE_VERSION:
+            manifest = {
+                'version': STORE_VERSION,
+                'rows': 0,
+                'dtypes': {name: np.dtype(dtype).str for name, dtype in STORAGE_DTYPES.items()},
+                'dictionaries': {name: 0 for name in CATEGORICAL},
+                'dictionary_bytes': {name: 0 for name in CATEGORICAL},
+                'sources': [],
+            }
+        return manifest
+
+    def _write_manifest(self):
+        tmp_path = self.path / 'manifest.json.tmp'
+        tmp_path.write_text(json.dumps(self.manifest, indent=2))
+        os.replace(tmp_path, self.path / 'manifest.json')
+
+    def __len__(self) -> int:
+        return self.manifest['rows']
+
+    @property
+    def dictionaries(self) -> StoredDictionaries:
+        if self._dictionaries is None:
+            self._dictionaries = StoredDictionaries(self.path / 'dictionaries', self.manifest['dictionaries'])
+        return self._dictionaries
+
+    def table(self) -> FanTable:
+        """The stored rows as a FanTable over memory-mapped columns"""
+        rows = len(self)
+        if rows == 0:
+            columns = {name: np.zeros(0, dtype=np.dtype(dtype)) for name, dtype in self.manifest['dtypes'].items()}
+        else:
+            columns = {name: map_column(self.path / 'columns' / f"{name}.npy", rows) for name in COLUMNS}
+        return FanTable(columns, self.dictionaries)
+
+    def source(self, name: str) -> Optional[Dict]:
+        return next((source for source in self.manifest['sources'] if source['name'] == name), None)
+
+    def append(self, table: FanTable, source: str, **meta):
+        """Add a FanTable's rows, re-coding its categorical columns onto the store's dictionaries.
+
+        Rows appended under the same `source` as the previous append extend
+        that source's range, so one export can arrive in several batches.
+        """
+        (self.path / 'columns').mkdir(parents=True, exist_ok=True)
+        (self.path / 'dictionaries').mkdir(parents=True, exist_ok=True)
+        rows = len(self)
+        added = len(table)
+
+        columns = dict(table.columns)
+        for name in CATEGORICAL:
+            dictionary = self.dictionaries[name]
+            # Callers may have grown the dictionary already (e.g. to dedupe on codes); compare with what's on disk
+            before = self.manifest['dictionaries'][name]
+            codes = dictionary.encode(table.dictionaries[name].values, table.columns[name].astype(np.int64))
+            dtype = np.dtype(self.manifest['dtypes'][name])
+            if len(dictionary) > np.iinfo(dtype).max + 1:
+                dtype = code_dtype(len(dictionary))
+                self._widen(name, dtype, rows)
+            columns[name] = codes.astype(dtype)
+            if len(dictionary) > before:
+                self.manifest['dictionary_bytes'][name] = append_dictionary(
+                    self.path / 'dictionaries' / f"{name}.jsonl", dictionary.values[before:],
+                    self.manifest['dictionary_bytes'][name])
+            self.manifest['dictionaries'][name] = len(dictionary)
+
+        for name in COLUMNS:
+            values = columns[name].astype(np.dtype(self.manifest['dtypes'][name]), copy=False)
+            append_column(self.path / 'columns' / f"{name}.npy", values, rows)
+
+        sources = self.manifest['sources']
+        if sources and sources[-1]['name'] == source:
+            sources[-1]['rows'] += added
+        else:
+            sources.append({'name': source, 'start': rows, 'rows': added})
+        sources[-1].update(meta, updated=datetime.now().isoformat(timespec='seconds'))
+        self.manifest['rows'] = rows + added
+        self._write_manifest()
+
+    def update_source(self, name: str, **meta):
+        """Record details about a source already in the store, e.g. that it finished loading"""
+        self.source(name).update(meta)
+        self._write_manifest()
+
+    def _widen(self, name: str, dtype: np.dtype, rows: int):
+        path = self.path / 'columns' / f"{name}.npy"
+        if path.exists():
+            values = np.array(map_column(path, rows), dtype=dtype)
+            path.unlink()
+            append_column(path, values, 0)
+        self.manifest['dtypes'][name] = np.dtype(dtype).str
+        print(f"↔️ Widened {name} codes to {np.dtype(dtype).name}")
+
+    def nbytes(self) -> int:
+        return sum(path.stat().st_size for path in self.path.rglob('*') if path.is_file())
+
+
+def convert(sources: List[Path], store: FanStore):
+    """Add each export to the store, skipping ones already converted"""
+    for source in sources:
+        stat = source.stat()
+        existing = store.source(source.name)
+        if existing:
+            if existing.get('size') == stat.st_size and existing.get('sha256') == file_fingerprint(source):
+                print(f"⏭️ {source.name}: already in the store ({existing['rows']:,} rows)")
+                continue
+            raise SystemExit(f"{source.name} changed since it was converted; rerun with --rebuild")
+
+        started = time.perf_counter()
+        table = FanTable.from_csv(source)
+        store.append(table, source.name, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                     sha256=file_fingerprint(source), read=len(table), complete=True)
+        print(f"📦 {source.name}: {len(table):,} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert fan exports to the memory-mapped columnar store')
+    parser.add_argument('sources', nargs='*', help=f'Export CSVs (default: {DEFAULT_CSV_PATH.name})')
+    parser.add_argument('--store', default=str(STORE_DIR), help='Store directory')
+    parser.add_argument('--rebuild', action='store_true', help='Delete the store and convert from scratch')
+    args = parser.parse_args()
+
+    store_path = Path(args.store)
+    if args.rebuild and store_path.exists():
+        shutil.rmtree(store_path)
+
+    convert([Path(source) for source in args.sources] or [DEFAULT_CSV_PATH], FanStore(store_path))
+
+    # What a cold process pays before its first answer
+    started = time.perf_counter()
+    store = FanStore(store_path)
+    table = store.table()
+    opened = time.perf_counter() - started
+    from fan_analytics import FanAnalytics
+    FanAnalytics(table).answer("What are the most popular streaming services?")
+    print(f"✅ Store: {len(store):,} rows, {store.nbytes() / 1e6:.1f} MB on disk, "
+          f"opened in {opened * 1000:.1f} ms, first answer after {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,138 @@
+# bench_url_health.py
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from rate_limiter import shared_limiter
+from tool_audit import ToolAuditor
+
+
+class StubToolHandler(BaseHTTPRequestHandler):
+    """Answers HEAD/GET for fake tool URLs with a deterministic status mix"""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.02
+
+    def _respond(self):
+        time.sleep(self.latency)
+        bucket = zlib.crc32(self.path.encode()) % 20
+        if bucket == 0:
+            self.send_response(404)
+        elif bucket == 1:
+            self.send_response(301)
+            self.send_header('Location', f"{self.path}/new")
+        elif bucket == 2:
+            self.send_response(500)
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_GET(self):
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_stub_servers(count: int, latency: float):
+    """Start `count` stub servers on free ports, each acting as a separate host"""
+    StubToolHandler.latency = latency
+    servers = []
+    for _ in range(count):
+        server = StubServer(('127.0.0.1', 0), StubToolHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def write_fake_tool_data(path: Path, servers, tool_count: int):
+    """Write a toolData.js with `tool_count` tools spread across the stub hosts"""
+    tools = []
+    for i in range(tool_count):
+        port = servers[i % len(servers)].server_address[1]
+        tools.append({
+            'id': str(i + 1),
+            'name': f'Fake Tool {i + 1}',
+            'source_url': f'http://127.0.0.1:{port}/tool/{i + 1}',
+            'short_description': 'Benchmark tool',
+            'screenshot_url': f'/screenshots/fake_tool_{i + 1}.png',
+            'category': 'Foundational AI',
+            'type': 'personal',
+            'sector': 'N/A'
+        })
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('export const TOOL_DATA = ')
+        json.dump(tools, f, indent=2)
+        f.write(';\n')
+
+
+def time_engine(tool_data_path: Path, engine: str, **kwargs) -> dict:
+    """Run one URL check pass and return timing and result counts"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        auditor = ToolAuditor(tool_data_path=str(tool_data_path), use_cache=False)
+        started = time.perf_counter()
+        auditor.check_urls_parallel(engine=engine, **kwargs)
+        elapsed = time.perf_counter() - started
+
+    checked = sum(len(auditor.results[key]) for key in ('healthy', 'redirected', 'notFound', 'error'))
+    return {
+        'engine': engine,
+        'seconds': elapsed,
+        'checked': checked,
+        'urls_per_second': checked / elapsed if elapsed else 0,
+        'healthy': len(auditor.results['healthy']),
+        'redirected': len(auditor.results['redirected']),
+        'not_found': len(auditor.results['notFound']),
+        'errors': len(auditor.results['error'])
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark URL health engines against local stub hosts')
+    parser.add_argument('--tools', type=int, default=2000, help='Number of fake tool URLs')
+    parser.add_argument('--hosts', type=int, default=50, help='Number of stub hosts (one port each)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated server latency in seconds')
+    parser.add_argument('--engines', nargs='+', choices=['thread', 'async'], default=['thread', 'async'])
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--host-rate', type=float, default=1000,
+                        help='Per-host token-bucket rate in requests/second (stub hosts accept any rate)')
+
+    args = parser.parse_args()
+
+    shared_limiter().host_limit = (args.host_rate, max(1, int(args.host_rate)))
+    servers = start_stub_servers(args.hosts, args.latency)
+    print(f"🧪 Started {len(servers)} stub hosts, {args.tools} fake tools, {args.latency * 1000:.0f}ms latency")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tool_data_path = Path(tmp_dir) / 'toolData.js'
+        write_fake_tool_data(tool_data_path, servers, args.tools)
+
+        for engine in args.engines:
+            print(f"\n⏱️  Running {engine} engine...")
+            stats = time_engine(tool_data_path, engine,
+                                max_concurrency=args.concurrency, per_host_limit=args.per_host)
+            print(f"  {stats['checked']} URLs in {stats['seconds']:.2f}s "
+                  f"({stats['urls_per_second']:.0f} URLs/s)")
+            print(f"  healthy={stats['healthy']} redirected={stats['redirected']} "
+                  f"not_found={stats['not_found']} errors={stats['errors']}")
+
+    for server in servers:
+        server.shutdown()
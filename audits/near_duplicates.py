@@ -0,0 +1,233 @@
+# near_duplicates.py
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import numpy as np
+
+from tool_catalog import ToolCatalog
+
+# Query parameters that never change which page a URL points at
+TRACKING_PARAMS = {'fbclid', 'gclid', 'msclkid', 'ref', 'referrer', 'source', 'redirected', 'mc_cid', 'mc_eid'}
+
+# Domains hosting many unrelated products; sharing one is not a duplicate signal
+PLATFORM_DOMAINS = {
+    'github.com', 'google.com', 'microsoft.com', 'amazon.com', 'apple.com', 'huggingface.co',
+    'notion.so', 'vercel.app', 'openai.com', 'meta.com', 'ibm.com', 'salesforce.com', 'adobe.com',
+}
+
+# Words that do not help tell tool names apart
+NAME_STOPWORDS = {'ai', 'app', 'the', 'hq', 'inc', 'io', 'labs'}
+
+ALIAS_PATTERN = re.compile(r'\(\s*(?:formerly|previously|fka|aka|now)\s+([^)]+)\)', re.IGNORECASE)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def canonical_url(url: str) -> str:
+    """Scheme-less, lowercase URL without www., default ports, fragments, tracking params or trailing slash"""
+    parsed = urlparse(url.strip() if '//' in url else f"//{url.strip()}")
+    host = (parsed.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    path = re.sub(r'/+', '/', parsed.path or '').rstrip('/')
+    if path.endswith(('/index.html', '/index.htm')):
+        path = path.rsplit('/', 1)[0]
+
+    query = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    canonical = host + path
+    if query:
+        canonical += '?' + urlencode(sorted(query))
+    return canonical
+
+
+def split_name(name: str, strip_stopwords: bool = True) -> Tuple[str, List[str]]:
+    """Normalized name plus aliases, e.g. 'Windsurf (formerly Codeium)' -> ('windsurf', ['codeium'])
+
+    Stopwords are dropped for fuzzy matching; exact matching keeps them so
+    'Jasper' and 'Jasper AI' stay distinct.
+    """
+    aliases = [_normalize_words(alias, strip_stopwords) for alias in ALIAS_PATTERN.findall(name or '')]
+    base = _normalize_words(ALIAS_PATTERN.sub(' ', name or ''), strip_stopwords)
+    return base, [alias for alias in aliases if alias]
+
+
+def _normalize_words(text: str, strip_stopwords: bool = True) -> str:
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    kept = [word for word in words if word not in NAME_STOPWORDS] if strip_stopwords else words
+    return ''.join(kept or words)
+
+
+def _char_shingles(text: str, k: int = 3) -> Set[str]:
+    text = f" {text} "
+    return {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+
+
+def _word_shingles(text: str, k: int = 2) -> Set[str]:
+    words = re.findall(r'[a-z0-9]+', (text or '').lower())
+    if len(words) < k:
+        return set(words)
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    """Vectorized MinHash signatures with banded LSH bucketing.
+
+    Signatures are `bands * rows` wide; two sets land in a shared bucket
+    with high probability once their Jaccard similarity is above roughly
+    (1 / bands) ** (1 / rows).
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        self.a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Set[str]) -> Optional[np.ndarray]:
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # a < 2**31 and hash < 2**32 keep a * hash + b below 2**64
+        permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def candidate_pairs(self, shingle_sets: List[Set[str]], max_bucket: int = 50) -> Set[Tuple[int, int]]:
+        """Index pairs sharing at least one band bucket
+
+        Buckets larger than `max_bucket` are skipped so a degenerate key
+        (e.g. a one-word description) cannot make generation quadratic.
+        """
+        buckets = defaultdict(list)
+        for index, shingles in enumerate(shingle_sets):
+            signature = self.signature(shingles)
+            if signature is None:
+                continue
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                buckets[key].append(index)
+
+        pairs = set()
+        for members in buckets.values():
+            if 1 < len(members) <= max_bucket:
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        pairs.add((first, second))
+        return pairs
+
+
+class NearDuplicateDetector:
+    """Find exact and likely duplicate tools in a ToolCatalog.
+
+    Exact matches (canonical URL, normalized name or alias) are reported as
+    `duplicate_url` / `duplicate_name`. Fuzzy candidates come from MinHash
+    LSH over name trigrams and description bigrams plus registrable-domain
+    groups, and are verified with exact Jaccard before being reported.
+    Tools sharing a domain are only reported when their names are at least
+    `domain_name_threshold` similar, since unrelated products often share
+    a company domain.
+    """
+
+    def __init__(self, name_threshold: float = 0.6, description_threshold: float = 0.5,
+                 domain_name_threshold: float = 0.3, max_domain_group: int = 8, seed: int = 1):
+        self.name_threshold = name_threshold
+        self.domain_name_threshold = domain_name_threshold
+        self.description_threshold = description_threshold
+        self.max_domain_group = max_domain_group
+        self.lsh = MinHashLSH(seed=seed)
+
+    def find(self, catalog: ToolCatalog) -> Dict[str, List[Dict]]:
+        """Return {'exact': [...], 'near': [...]} pairs as {'tool1', 'tool2', 'reason', 'reasons', 'score'}
+
+        `reasons` lists every check that matched the pair, strongest first;
+        `reason` and `score` are those of the first.
+        """
+        records = list(catalog)
+        position = {record: i for i, record in enumerate(records)}
+        names = [split_name(record.name) for record in records]
+        name_shingles = [_char_shingles(base) if base else set() for base, _ in names]
+
+        found: Dict[Tuple[int, int], Dict[str, float]] = defaultdict(dict)
+
+        def add(i: int, j: int, reason: str, score: float):
+            if i != j:
+                found[(min(i, j), max(i, j))].setdefault(reason, round(score, 3))
+
+        # Exact: canonical URL
+        by_url = defaultdict(list)
+        for i, record in enumerate(records):
+            url = canonical_url(record.source_url or '')
+            if url:
+                by_url[url].append(i)
+        for members in by_url.values():
+            for j in members[1:]:
+                add(members[0], j, 'duplicate_url', 1.0)
+
+        # Exact: normalized name, including "(formerly X)" aliases
+        by_name = defaultdict(list)
+        for i, record in enumerate(records):
+            base, aliases = split_name(record.name, strip_stopwords=False)
+            for key in {base, *aliases} - {''}:
+                by_name[key].append(i)
+        for members in by_name.values():
+            for j in members[1:]:
+                add(members[0], j, 'duplicate_name', 1.0)
+
+        # Near: similar names via LSH
+        for i, j in self.lsh.candidate_pairs(name_shingles):
+            score = jaccard(name_shingles[i], name_shingles[j])
+            if score >= self.name_threshold:
+                add(i, j, 'similar_name', score)
+
+        # Near: same registrable domain, outside shared platforms
+        for domain, group in catalog.groups('domain').items():
+            if not domain or domain in PLATFORM_DOMAINS or not 1 < len(group) <= self.max_domain_group:
+                continue
+            members = [position[record] for record in group]
+            for a, i in enumerate(members):
+                for j in members[a + 1:]:
+                    score = jaccard(name_shingles[i], name_shingles[j])
+                    if score >= self.domain_name_threshold:
+                        add(i, j, 'same_domain', score)
+
+        # Near: similar descriptions via LSH
+        description_shingles = [_word_shingles(record.short_description) for record in records]
+        for i, j in self.lsh.candidate_pairs(description_shingles):
+            score = jaccard(description_shingles[i], description_shingles[j])
+            if score >= self.description_threshold:
+                add(i, j, 'similar_description', score)
+
+        results = {'exact': [], 'near': []}
+        for (i, j), reasons in sorted(found.items()):
+            reason, score = next(iter(reasons.items()))
+            kind = 'exact' if reason.startswith('duplicate_') else 'near'
+            results[kind].append({
+                'tool1': records[i].to_dict(),
+                'tool2': records[j].to_dict(),
+                'reason': reason,
+                'reasons': list(reasons),
+                'score': score
+            })
+        return results
+
+
+def find_near_duplicates(tools: Iterable[Dict], **kwargs) -> Dict[str, List[Dict]]:
+    return NearDuplicateDetector(**kwargs).find(ToolCatalog(tools))
@@ -1,14 +1,16 @@
 # get_new_tool_screenshots.py
-import requests
 import os
-import time
-from PIL import Image
-from io import BytesIO
+import sys
 from pathlib import Path
 
+# The capture engine lives with the other screenshot scripts in frontend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend'))
+from capture_backends import BACKENDS
+from capture_engine import CaptureEngine, CaptureJob
+
 
 class ScreenshotGenerator:
-    def __init__(self):
+    def __init__(self, concurrency=None, backend=None):
         # Define the new tools that need screenshots
         self.new_tools = [
             {
@@ -75,6 +77,15 @@ class ScreenshotGenerator:
         # Ensure directory exists
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
 
+        self.engine = CaptureEngine(
+            str(self.screenshots_dir),
+            concurrency=concurrency,
+            extra_params={'block_cookie_banners': 'true', 'block_ads': 'true'},
+            backend=backend,
+            optimize=True,
+            timeout=30
+        )
+
         print(f"📁 Screenshots directory: {self.screenshots_dir}")
 
     def load_env(self):
@@ -101,50 +112,8 @@ class ScreenshotGenerator:
 
     def take_screenshot(self, url, filename):
         """Take a screenshot of a URL"""
-        api_key = os.getenv("SCREENSHOTONE_API_KEY")
-
-        if not api_key:
-            print("❌ SCREENSHOTONE_API_KEY not found in environment")
-            return False
-
-        try:
-            # Build screenshot API URL
-            screenshot_url = (
-                f"https://api.screenshotone.com/take"
-                f"?access_key={api_key}"
-                f"&url={url}"
-                f"&viewport_width=1280"
-                f"&viewport_height=800"
-                f"&format=png"
-                f"&block_cookie_banners=true"
-                f"&block_ads=true"
-            )
-
-            print(f"  📸 Requesting screenshot...")
-            response = requests.get(screenshot_url, timeout=30)
-
-            if response.status_code == 200:
-                # Save the image
-                img = Image.open(BytesIO(response.content))
-                save_path = self.screenshots_dir / filename
-                img.save(save_path, 'PNG', optimize=True)
-
-                # Verify file was saved
-                if save_path.exists() and save_path.stat().st_size > 0:
-                    print(f"  ✅ Saved: {filename} ({save_path.stat().st_size // 1024}KB)")
-                    return True
-                else:
-                    print(f"  ❌ Failed to save {filename}")
-                    return False
-            else:
-                print(f"  ❌ API error: {response.status_code}")
-                if response.status_code == 429:
-                    print("  ⚠️  Rate limit reached. Wait a bit before continuing.")
-                return False
-
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)}")
-            return False
+        job, = self.engine.run([CaptureJob(filename, url, filename=filename)])
+        return job.ok
 
     def check_existing_screenshots(self):
         """Check which screenshots already exist"""
@@ -182,24 +151,13 @@ class ScreenshotGenerator:
         for tool in missing:
             print(f"   - {tool['name']}")
 
-        # Generate missing screenshots
+        # Generate missing screenshots concurrently
         print("\n🚀 Starting screenshot generation...")
-        successful = 0
-        failed = []
-
-        for i, tool in enumerate(missing, 1):
-            print(f"\n[{i}/{len(missing)}] {tool['name']}")
-            print(f"  🔗 URL: {tool['url']}")
-
-            if self.take_screenshot(tool['url'], tool['filename']):
-                successful += 1
-            else:
-                failed.append(tool['name'])
+        jobs = [CaptureJob(tool['name'], tool['url'], filename=tool['filename']) for tool in missing]
+        self.engine.run(jobs)
 
-            # Rate limiting
-            if i < len(missing):
-                print("  ⏳ Waiting 3 seconds...")
-                time.sleep(3)
+        successful = sum(job.ok for job in jobs)
+        failed = [job.name for job in jobs if not job.ok]
 
         # Summary
         print("\n" + "=" * 60)
@@ -222,5 +180,14 @@ class ScreenshotGenerator:
 
 
 if __name__ == "__main__":
-    generator = ScreenshotGenerator()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate screenshots for newly added tools')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Number of screenshots captured at once (default: CAPTURE_CONCURRENCY or 4)')
+    parser.add_argument('--backend', default=None, choices=sorted(BACKENDS),
+                        help='Capture backend (default: CAPTURE_BACKEND or screenshotone)')
+    args = parser.parse_args()
+
+    generator = ScreenshotGenerator(concurrency=args.concurrency, backend=args.backend)
     generator.generate_all_screenshots()
\ No newline at end of file
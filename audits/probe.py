@@ -0,0 +1,96 @@
+# probe.py
+import threading
+from typing import Dict, Optional
+
+import aiohttp
+import requests
+
+# Servers that reject HEAD usually answer with one of these
+HEAD_REJECTED_STATUSES = {403, 405, 501}
+
+
+class ProbeResult:
+    """Status and headers of a probed URL, plus at most `read_bytes` of body"""
+    __slots__ = ('url', 'status_code', 'headers', 'method', 'sample')
+
+    def __init__(self, url: str, status_code: int, headers, method: str, sample: bytes = b''):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.method = method
+        self.sample = sample
+
+
+class ProbeStats:
+    """Counts what a run downloaded versus what full GETs would have cost"""
+
+    def __init__(self):
+        self.head_requests = 0
+        self.get_fallbacks = 0
+        self.bytes_read = 0
+        self.bytes_saved = 0
+        self.unknown_sizes = 0
+        self._lock = threading.Lock()
+
+    def record(self, method: str, headers, bytes_read: int = 0):
+        content_length = headers.get('Content-Length')
+        with self._lock:
+            if method == 'HEAD':
+                self.head_requests += 1
+            else:
+                self.get_fallbacks += 1
+            self.bytes_read += bytes_read
+            if content_length and content_length.isdigit():
+                self.bytes_saved += max(0, int(content_length) - bytes_read)
+            else:
+                self.unknown_sizes += 1
+
+    def summary(self) -> str:
+        return (f"🪶 Probe: {self.head_requests} HEAD, {self.get_fallbacks} GET fallbacks, "
+                f"{self.bytes_read / 1024:.1f} KB body read, "
+                f"{self.bytes_saved / 1024:.1f} KB body avoided "
+                f"({self.unknown_sizes} responses without Content-Length)")
+
+
+def probe(session: requests.Session, url: str, headers: Optional[Dict] = None,
+          allow_redirects: bool = False, timeout: float = 5, read_bytes: int = 0,
+          stats: Optional[ProbeStats] = None) -> ProbeResult:
+    """Probe a URL without downloading its body
+
+    Tries HEAD first. Only when the server rejects HEAD does it fall back
+    to a streamed GET, reading at most `read_bytes` before closing the
+    connection.
+    """
+    response = session.head(url, headers=headers, allow_redirects=allow_redirects, timeout=timeout)
+    if response.status_code not in HEAD_REJECTED_STATUSES:
+        if stats:
+            stats.record('HEAD', response.headers)
+        return ProbeResult(response.url, response.status_code, response.headers, 'HEAD')
+
+    response = session.get(url, headers=headers, allow_redirects=allow_redirects, timeout=timeout, stream=True)
+    try:
+        sample = response.raw.read(read_bytes, decode_content=True) if read_bytes else b''
+    finally:
+        response.close()
+    if stats:
+        stats.record('GET', response.headers, len(sample))
+    return ProbeResult(response.url, response.status_code, response.headers, 'GET', sample)
+
+
+async def probe_async(session: aiohttp.ClientSession, url: str, headers: Optional[Dict] = None,
+                      allow_redirects: bool = False, read_bytes: int = 0,
+                      stats: Optional[ProbeStats] = None) -> ProbeResult:
+    """aiohttp version of probe(); the session's timeout applies"""
+    async with session.head(url, headers=headers, allow_redirects=allow_redirects) as response:
+        if response.status not in HEAD_REJECTED_STATUSES:
+            if stats:
+                stats.record('HEAD', response.headers)
+            return ProbeResult(str(response.url), response.status, response.headers, 'HEAD')
+
+    async with session.get(url, headers=headers, allow_redirects=allow_redirects) as response:
+        sample = await response.content.read(read_bytes) if read_bytes else b''
+        # Drop the connection instead of draining the rest of the body
+        response.close()
+        if stats:
+            stats.record('GET', response.headers, len(sample))
+        return ProbeResult(str(response.url), response.status, response.headers, 'GET', sample)
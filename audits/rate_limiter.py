@@ -0,0 +1,172 @@
+# rate_limiter.py
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Default budget for tool websites we probe: requests per second and burst size
+DEFAULT_HOST_LIMIT = (2.0, 4)
+
+# Known API budgets (requests per second, burst). Override with
+# RATE_LIMIT_<NAME> in the environment, e.g. RATE_LIMIT_SCREENSHOTONE=1.5
+API_LIMITS = {
+    'screenshotone': (40 / 60, 2),
+    'sheets': (60 / 60, 10),
+}
+
+# Statuses that mean "slow down" rather than "this URL is broken"
+THROTTLE_STATUSES = {429, 503}
+
+MAX_BACKOFF = 300
+
+
+def host_key(url: str) -> str:
+    """Bucket key for a URL's host"""
+    return urlparse(url).netloc.lower()
+
+
+def api_key(name: str) -> str:
+    """Bucket key for a named API"""
+    return f"api:{name}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    `reserve()` always takes a token and returns how long the caller must
+    wait before using it, so concurrent callers queue up fairly instead of
+    polling. `pause()` blocks the bucket entirely, e.g. after a 429.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(delay, self.blocked_until - now)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: Optional[float]) -> float:
+        """Block the bucket for `seconds`, or back off exponentially if unknown"""
+        with self._lock:
+            self.strikes += 1
+            if seconds is None:
+                seconds = min(MAX_BACKOFF, 2 ** self.strikes)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            return seconds
+
+    def reset_backoff(self):
+        with self._lock:
+            self.strikes = 0
+
+
+class RateLimiter:
+    """Per-host and per-API token buckets shared by every thread in a process"""
+
+    def __init__(self, host_limit: Tuple[float, int] = DEFAULT_HOST_LIMIT,
+                 api_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.host_limit = host_limit
+        self.api_limits = dict(API_LIMITS if api_limits is None else api_limits)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, key: str) -> Tuple[float, int]:
+        if key.startswith('api:'):
+            name = key[len('api:'):]
+            rate, capacity = self.api_limits.get(name, self.host_limit)
+            override = os.getenv(f"RATE_LIMIT_{name.upper()}")
+            if override:
+                rate = float(override)
+            return rate, capacity
+        return self.host_limit
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(*self._limit_for(key))
+            return self._buckets[key]
+
+    def wait(self, key: str):
+        """Block until the bucket for `key` allows another request"""
+        self.bucket(key).acquire()
+
+    async def wait_async(self, key: str):
+        await self.bucket(key).acquire_async()
+
+    def throttle(self, key: str, retry_after: Optional[str] = None) -> float:
+        """Record a throttling response; returns the pause applied in seconds"""
+        return self.bucket(key).pause(parse_retry_after(retry_after))
+
+    def is_throttled(self, status_code: int, headers) -> bool:
+        if status_code == 429:
+            return True
+        # Only treat 503 as throttling when the server says when to come back
+        return status_code in THROTTLE_STATUSES and 'Retry-After' in headers
+
+    def call_with_backoff(self, key: str, request_fn: Callable, max_retries: int = 3):
+        """Run `request_fn` under the bucket for `key`, retrying on 429/Retry-After
+
+        `request_fn` must return a requests.Response. The last response is
+        returned even if it is still throttled after `max_retries` retries.
+        """
+        for attempt in range(max_retries + 1):
+            self.wait(key)
+            response = request_fn()
+            if not self.is_throttled(response.status_code, response.headers):
+                self.bucket(key).reset_backoff()
+                return response
+            if attempt < max_retries:
+                pause = self.throttle(key, response.headers.get('Retry-After'))
+                print(f"  ⏳ {key} throttled ({response.status_code}), backing off {pause:.1f}s")
+        return response
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter() -> RateLimiter:
+    """Process-wide limiter so every script and thread shares the same buckets"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -1,10 +1,12 @@
 # redirect_fix.py
 import json
-import shutil
 from datetime import datetime
 from pathlib import Path
 import os
 
+from tool_catalog import ToolCatalog
+from tool_data import load_tool_data, save_tool_data
+
 
 class RedirectFixer:
     def __init__(self):
@@ -69,43 +71,23 @@ class RedirectFixer:
 
     def parse_tool_data(self):
         """Parse the toolData.js file"""
-        with open(self.tool_data_path, 'r') as f:
-            content = f.read()
-
-        # Extract the array content
-        start = content.find('[')
-        end = content.rfind(']') + 1
-        tools_json = content[start:end]
-
-        # Parse as JSON
-        tools = json.loads(tools_json)
-        return tools, content[:start], content[end:]
-
-    def create_backup(self):
-        """Create timestamped backup"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = self.tool_data_path.parent / f"{self.tool_data_path.name}.backup.{timestamp}"
-        shutil.copy2(self.tool_data_path, backup_path)
-        print(f"✅ Created backup: {backup_path}")
-        return backup_path
-
-    def update_tool_urls(self, tools, update_recommendations):
+        tool_data = load_tool_data(self.tool_data_path)
+        return tool_data.tools, tool_data.prefix, tool_data.suffix
+
+    def update_tool_urls(self, catalog, update_recommendations):
         """Update tool URLs based on recommendations"""
+        updates = []
         updates_made = []
 
-        for tool in tools:
-            tool_name = tool.get('name', '')
-
-            if tool_name in update_recommendations:
-                old_url = tool['source_url']
-                new_url = update_recommendations[tool_name]
-
-                # Clean up the new URL (remove trailing slashes, query params for redirects)
-                new_url = new_url.rstrip('/')
-                if '?redirected=' in new_url:
-                    new_url = new_url.split('?redirected=')[0]
+        for tool_name, new_url in update_recommendations.items():
+            # Clean up the new URL (remove trailing slashes, query params for redirects)
+            new_url = new_url.rstrip('/')
+            if '?redirected=' in new_url:
+                new_url = new_url.split('?redirected=')[0]
 
-                tool['source_url'] = new_url
+            for record in catalog.find_by_name(tool_name, exact=True):
+                old_url = record.source_url
+                updates.append((record, {'source_url': new_url}))
 
                 updates_made.append({
                     'name': tool_name,
@@ -115,38 +97,34 @@ class RedirectFixer:
 
                 print(f"✓ Updated {tool_name}: {old_url} → {new_url}")
 
-        return tools, updates_made
+        catalog.update_many(updates)
+        return catalog, updates_made
 
-    def handle_rebrands(self, tools):
+    def handle_rebrands(self, catalog):
         """Handle special cases for rebranded tools"""
+        rebrands = [
+            # (old name, marker in new URL, new name, label)
+            ('Tome', 'lightfield', 'Lightfield', 'Tome → Lightfield'),
+            ('Codeium', 'windsurf', 'Windsurf', 'Codeium → Windsurf'),
+        ]
         rebrand_updates = []
 
-        for tool in tools:
-            # Tome → Lightfield
-            if tool['name'] == 'Tome' and 'lightfield' in tool.get('source_url', ''):
-                tool['name'] = 'Lightfield (formerly Tome)'
-                tool['short_description'] = tool['short_description'].replace('Tome', 'Lightfield')
-                rebrand_updates.append('Tome → Lightfield')
+        for old_name, url_marker, new_name, label in rebrands:
+            for record in catalog.find_by_name(old_name, exact=True):
+                if url_marker in (record.source_url or ''):
+                    catalog.update(
+                        record,
+                        name=f"{new_name} (formerly {old_name})",
+                        short_description=record.short_description.replace(old_name, new_name)
+                    )
+                    rebrand_updates.append(label)
 
-            # Codeium → Windsurf
-            elif tool['name'] == 'Codeium' and 'windsurf' in tool.get('source_url', ''):
-                tool['name'] = 'Windsurf (formerly Codeium)'
-                tool['short_description'] = tool['short_description'].replace('Codeium', 'Windsurf')
-                rebrand_updates.append('Codeium → Windsurf')
-
-        return tools, rebrand_updates
+        return catalog, rebrand_updates
 
     def save_updated_tools(self, tools, prefix, suffix):
         """Save the updated tools back to toolData.js"""
-        # Convert back to formatted JSON
-        tools_json = json.dumps(tools, indent=2)
-
-        # Reconstruct the file
-        new_content = prefix + tools_json + suffix
-
-        # Write to file
-        with open(self.tool_data_path, 'w') as f:
-            f.write(new_content)
+        # Atomic write; the previous content is recoverable from the change journal
+        save_tool_data(self.tool_data_path, tools, prefix, suffix, reason='redirect fixes')
 
         print(f"✅ Saved updated toolData.js at: {self.tool_data_path}")
 
@@ -179,27 +157,25 @@ class RedirectFixer:
 
         print(f"Found {len(update_recommendations)} tools needing updates")
 
-        # Create backup
-        backup_path = self.create_backup()
-
         # Parse current tool data
         tools, prefix, suffix = self.parse_tool_data()
-        print(f"Loaded {len(tools)} tools from toolData.js")
+        catalog = ToolCatalog(tools)
+        print(f"Loaded {len(catalog)} tools from toolData.js")
 
         # Update URLs
-        tools, updates_made = self.update_tool_urls(tools, update_recommendations)
+        catalog, updates_made = self.update_tool_urls(catalog, update_recommendations)
 
         # Handle rebrands
-        tools, rebrand_updates = self.handle_rebrands(tools)
+        catalog, rebrand_updates = self.handle_rebrands(catalog)
 
         # Save updated tools
-        self.save_updated_tools(tools, prefix, suffix)
+        self.save_updated_tools(catalog.to_list(), prefix, suffix)
 
         # Generate report
         self.generate_update_report(updates_made, rebrand_updates)
 
         print("\n✨ Done! All redirects have been fixed.")
-        print(f"🔄 To revert changes, restore from: {backup_path}")
+        print("🔄 To revert: python tool_journal.py --rollback")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+# redirect_resolver.py
+import asyncio
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+
+from probe import ProbeStats, probe_async
+from rate_limiter import RateLimiter, host_key, shared_limiter
+from url_health import USER_AGENT
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class RedirectResolver:
+    """Resolve many redirect chains concurrently over one pooled session.
+
+    Every hop (one request to one URL) is memoized for the lifetime of the
+    resolver, so tools that redirect through the same vendor domains share
+    the work, and concurrent chains hitting the same hop wait on a single
+    in-flight request. Chains are cut short when a URL repeats.
+    """
+
+    def __init__(self, max_concurrency: int = 50, per_host_limit: int = 4, timeout: float = 10,
+                 max_redirects: int = 5, limiter: Optional[RateLimiter] = None, max_retries: int = 3):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.limiter = limiter or shared_limiter()
+        self.max_retries = max_retries
+        self.stats = {'requests': 0, 'memo_hits': 0, 'loops': 0}
+        self.probe_stats = ProbeStats()
+        self._hops: Dict[str, asyncio.Future] = {}
+
+    async def _request_hop(self, session: aiohttp.ClientSession, url: str) -> Dict:
+        key = host_key(url)
+        self.stats['requests'] += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.wait_async(key)
+                response = await probe_async(session, url, stats=self.probe_stats)
+                throttled = self.limiter.is_throttled(response.status_code, response.headers)
+                if not throttled or attempt == self.max_retries:
+                    return {'status': response.status_code, 'location': response.headers.get('Location', '')}
+                self.limiter.throttle(key, response.headers.get('Retry-After'))
+        except asyncio.TimeoutError:
+            return {'status': 'Error', 'error': 'Timeout'}
+        except (aiohttp.ClientError, ValueError) as e:
+            return {'status': 'Error', 'error': str(e)}
+
+    async def _hop(self, session: aiohttp.ClientSession, url: str) -> Dict:
+        """Return the memoized response for one URL, requesting it at most once"""
+        if url in self._hops:
+            self.stats['memo_hits'] += 1
+        else:
+            self._hops[url] = asyncio.ensure_future(self._request_hop(session, url))
+        return await self._hops[url]
+
+    async def _resolve(self, session: aiohttp.ClientSession, url: str) -> List[Dict]:
+        redirect_chain = []
+        seen = set()
+        current_url = url
+
+        for _ in range(self.max_redirects):
+            if current_url in seen:
+                self.stats['loops'] += 1
+                redirect_chain.append({
+                    'url': current_url,
+                    'status': 'Loop',
+                    'error': 'Redirect loop detected'
+                })
+                break
+            seen.add(current_url)
+
+            hop = await self._hop(session, current_url)
+            if hop['status'] == 'Error':
+                redirect_chain.append({'url': current_url, 'status': 'Error', 'error': hop['error']})
+                break
+
+            redirect_chain.append({'url': current_url, 'status': hop['status']})
+
+            if hop['status'] in REDIRECT_STATUSES and hop['location']:
+                # Handles absolute, scheme-relative and relative redirects
+                current_url = urljoin(current_url, hop['location'])
+            else:
+                # No more redirects, this is the final URL
+                break
+
+        return redirect_chain
+
+    async def _resolve_all(self, urls: List[str]) -> Dict[str, List[Dict]]:
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        # Per-socket limits, so time queued for a connector slot isn't counted
+        session_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=session_timeout,
+            headers={'User-Agent': USER_AGENT}
+        ) as session:
+            unique_urls = list(dict.fromkeys(urls))
+            chains = await asyncio.gather(*(self._resolve(session, url) for url in unique_urls))
+        return dict(zip(unique_urls, chains))
+
+    def resolve_all(self, urls: List[str]) -> Dict[str, List[Dict]]:
+        """Follow every URL's redirect chain; returns {url: chain}
+
+        Each chain entry is {'url', 'status'} plus 'error' for failed or
+        looping hops, matching RedirectChecker.follow_redirect_chain.
+        """
+        return asyncio.run(self._resolve_all(urls))
+
+    def resolve(self, url: str) -> List[Dict]:
+        return self.resolve_all([url])[url]
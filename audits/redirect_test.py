@@ -1,13 +1,15 @@
 # check_all_redirects.py
 import json
-import requests
 from urllib.parse import urlparse
-import time
+
+from rate_limiter import shared_limiter
+from redirect_resolver import RedirectResolver
 
 
 class RedirectChecker:
     def __init__(self):
         self.audit_report_path = 'audit-report.json'
+        self.limiter = shared_limiter()
 
     def load_redirected_tools(self):
         """Load tools that were marked as redirected"""
@@ -27,40 +29,8 @@ class RedirectChecker:
 
     def follow_redirect_chain(self, url, max_redirects=5):
         """Follow redirects to find final destination"""
-        redirect_chain = []
-        current_url = url
-
-        for i in range(max_redirects):
-            try:
-                response = requests.get(current_url, allow_redirects=False, timeout=10)
-                redirect_chain.append({
-                    'url': current_url,
-                    'status': response.status_code
-                })
-
-                if response.status_code in [301, 302, 303, 307, 308]:
-                    # Get the redirect location
-                    location = response.headers.get('Location', '')
-
-                    # Handle relative redirects
-                    if location.startswith('/'):
-                        parsed = urlparse(current_url)
-                        location = f"{parsed.scheme}://{parsed.netloc}{location}"
-
-                    current_url = location
-                else:
-                    # No more redirects, this is the final URL
-                    break
-
-            except Exception as e:
-                redirect_chain.append({
-                    'url': current_url,
-                    'status': 'Error',
-                    'error': str(e)
-                })
-                break
-
-        return redirect_chain
+        resolver = RedirectResolver(max_redirects=max_redirects, limiter=self.limiter)
+        return resolver.resolve(url)
 
     def analyze_redirect(self, original_url, final_url):
         """Analyze the type of redirect"""
@@ -92,12 +62,15 @@ class RedirectChecker:
         redirected_tools = self.load_redirected_tools()
         results = []
 
+        # Resolve every chain concurrently; hops shared between tools are fetched once
+        resolver = RedirectResolver(limiter=self.limiter)
+        chains = resolver.resolve_all([tool['original_url'] for tool in redirected_tools])
+
         for i, tool in enumerate(redirected_tools, 1):
             print(f"\n[{i}/{len(redirected_tools)}] Checking {tool['name']}...")
             print(f"Original URL: {tool['original_url']}")
 
-            # Follow the redirect chain
-            chain = self.follow_redirect_chain(tool['original_url'])
+            chain = chains[tool['original_url']]
 
             if chain:
                 final_url = chain[-1]['url']
@@ -113,16 +86,23 @@ class RedirectChecker:
                     for step in chain:
                         print(f"  → {step['url']} ({step['status']})")
 
+                # A looping chain has no real destination to update to
+                is_loop = chain[-1]['status'] == 'Loop'
+                if is_loop:
+                    print("⚠️  Redirect loop detected, not recommending an update")
+
                 results.append({
                     'tool': tool,
                     'final_url': final_url,
                     'analysis': analysis,
                     'chain_length': len(chain),
-                    'needs_update': 'MAJOR' in analysis or 'PATH CHANGE' in analysis
+                    'needs_update': not is_loop and ('MAJOR' in analysis or 'PATH CHANGE' in analysis)
                 })
 
-            # Rate limiting
-            time.sleep(0.5)
+        stats = resolver.stats
+        print(f"\n🔗 Resolver: {stats['requests']} requests, {stats['memo_hits']} shared hops reused, "
+              f"{stats['loops']} loops")
+        print(resolver.probe_stats.summary())
 
         # Generate summary report
         self.generate_redirect_report(results)
@@ -1,9 +1,11 @@
 # apply_all_tool_replacements.py
 import json
-import shutil
 from datetime import datetime
 from pathlib import Path
 
+from tool_catalog import ToolCatalog
+from tool_data import load_tool_data, save_tool_data
+
 
 class ToolReplacementProcessor:
     def __init__(self):
@@ -118,101 +120,72 @@ class ToolReplacementProcessor:
             }
         }
 
-    def create_backup(self):
-        """Create timestamped backup"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = f"{self.tool_data_path}.full_replacements_backup.{timestamp}"
-        shutil.copy2(self.tool_data_path, backup_path)
-        print(f"✅ Created backup: {backup_path}")
-        return backup_path
-
     def parse_tool_data(self):
         """Parse the toolData.js file"""
-        with open(self.tool_data_path, 'r') as f:
-            content = f.read()
-
-        start = content.find('[')
-        end = content.rfind(']') + 1
-        tools_json = content[start:end]
-
-        tools = json.loads(tools_json)
-        return tools, content[:start], content[end:]
+        tool_data = load_tool_data(self.tool_data_path)
+        return tool_data.tools, tool_data.prefix, tool_data.suffix
 
     def process_replacements(self, tools):
         """Process all replacements"""
-        updated_tools = []
+        catalog = ToolCatalog(tools)
         changes_made = {
             'replaced': [],
             'warnings': []
         }
 
-        # Track which tools we've found
-        tools_found = {name: False for name in self.replacements.keys()}
+        for tool_name, replacement in self.replacements.items():
+            records = catalog.find_by_name(tool_name, exact=True)
 
-        for tool in tools:
-            tool_name = tool.get('name', '')
+            if not records:
+                warning = f"Tool '{tool_name}' not found in toolData.js"
+                print(f"⚠️  Warning: {warning}")
+                changes_made['warnings'].append(warning)
+                continue
+
+            # Update screenshot path
+            screenshot_name = replacement['new_tool'].lower().replace(' ', '_').replace('.', '')
+            new_data = {
+                'name': replacement['new_tool'],
+                'source_url': replacement['url'],
+                'short_description': replacement['description'],
+                'screenshot_url': f"/screenshots/{screenshot_name}.png"
+            }
 
-            if tool_name in self.replacements:
-                tools_found[tool_name] = True
-                replacement = self.replacements[tool_name]
+            # Update category/sector/type if specified
+            for field in ('category', 'sector', 'type'):
+                if field in replacement:
+                    new_data[field] = replacement[field]
 
+            for record in records:
                 # Store old data for report
                 old_data = {
-                    'name': tool['name'],
-                    'url': tool['source_url'],
-                    'id': tool['id']
+                    'name': record.name,
+                    'url': record.source_url,
+                    'id': record.id
                 }
 
-                # Update tool with new data
-                tool['name'] = replacement['new_tool']
-                tool['source_url'] = replacement['url']
-                tool['short_description'] = replacement['description']
-
-                # Update category/sector/type if specified
-                if 'category' in replacement:
-                    tool['category'] = replacement['category']
-                if 'sector' in replacement:
-                    tool['sector'] = replacement['sector']
-                if 'type' in replacement:
-                    tool['type'] = replacement['type']
-
-                # Update screenshot path
-                screenshot_name = replacement['new_tool'].lower().replace(' ', '_').replace('.', '')
-                tool['screenshot_url'] = f"/screenshots/{screenshot_name}.png"
+                catalog.update(record, **new_data)
 
                 changes_made['replaced'].append({
                     'old': old_data,
                     'new': {
-                        'name': tool['name'],
-                        'url': tool['source_url']
+                        'name': record.name,
+                        'url': record.source_url
                     },
                     'reason': replacement['reason']
                 })
 
-                print(f"🔄 Replaced: {old_data['name']} → {tool['name']}")
-
-            updated_tools.append(tool)
-
-        # Check for tools not found
-        for tool_name, found in tools_found.items():
-            if not found:
-                warning = f"Tool '{tool_name}' not found in toolData.js"
-                print(f"⚠️  Warning: {warning}")
-                changes_made['warnings'].append(warning)
+                print(f"🔄 Replaced: {old_data['name']} → {record.name}")
 
         # Re-index tools
-        for i, tool in enumerate(updated_tools):
-            tool['id'] = str(i + 1)
+        catalog.reindex_ids()
 
-        return updated_tools, changes_made
+        return catalog.to_list(), changes_made
 
     def save_updated_tools(self, tools, prefix, suffix):
         """Save the updated tools back to toolData.js"""
-        tools_json = json.dumps(tools, indent=2)
-        new_content = prefix + tools_json + suffix
-
-        with open(self.tool_data_path, 'w') as f:
-            f.write(new_content)
+        # Atomic write; the previous content is recoverable from the change journal
+        save_tool_data(self.tool_data_path, tools, prefix, suffix, reason='tool replacements')
 
         print(f"✅ Saved updated toolData.js")
 
@@ -269,9 +242,6 @@ class ToolReplacementProcessor:
         print("🔧 Applying All Tool Replacements (CSV + Additional)")
         print("=" * 80)
 
-        # Create backup
-        backup_path = self.create_backup()
-
         # Parse current tool data
         tools, prefix, suffix = self.parse_tool_data()
         initial_count = len(tools)
@@ -288,7 +258,7 @@ class ToolReplacementProcessor:
         self.generate_report(changes_made, initial_count, final_count)
 
         print(f"\n✨ Done! Applied {len(changes_made['replaced'])} replacements")
-        print(f"🔄 To revert: restore from {backup_path}")
+        print("🔄 To revert: python tool_journal.py --rollback")
 
 
 if __name__ == "__main__":
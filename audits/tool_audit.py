@@ -1,18 +1,36 @@
 # tool_audit.py
+import hashlib
 import json
 import requests
-import time
 import os
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import concurrent.futures
 from urllib.parse import urlparse
 
+from near_duplicates import NearDuplicateDetector
+from probe import ProbeStats, probe
+from rate_limiter import host_key, shared_limiter
+from tool_catalog import ToolCatalog
+from tool_data import ToolDataParseError, load_tool_data
+from url_cache import UrlCache
+from url_health import USER_AGENT, AsyncHealthEngine, classify_response
+
+URL_STATUSES = ('healthy', 'redirected', 'notFound', 'error')
+STATE_PATH = Path(__file__).parent / '.cache' / 'audit-fingerprints.json'
+REPORT_PATH = Path(__file__).parent / 'audit-report.json'
+
+
+def tool_fingerprint(tool: Dict) -> str:
+    """Content hash of a tool entry, ignoring its id (ids are re-numbered by edits)"""
+    content = {key: value for key, value in tool.items() if key != 'id'}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
 
 class ToolAuditor:
-    def __init__(self, tool_data_path: str = None):
+    def __init__(self, tool_data_path: str = None, use_cache: bool = True):
         # Auto-detect the correct path
         if tool_data_path is None:
             # Get the directory where this script is located
@@ -40,71 +58,57 @@ class ToolAuditor:
 
         self.tool_data_path = tool_data_path
         self.tools = self._load_tool_data()
+        self.catalog = ToolCatalog(self.tools)
         self.results = {
             'healthy': [],
             'redirected': [],
             'notFound': [],
             'error': [],
             'outdated': [],
-            'duplicate': []
+            'duplicate': [],
+            'near_duplicate': []
         }
         self.category_gaps = {}
+        self.incremental_summary = None
+        self.limiter = shared_limiter()
+        self.url_cache = UrlCache() if use_cache else None
+        self.session = requests.Session()
+        self.probe_stats = ProbeStats()
 
     def _load_tool_data(self) -> List[Dict]:
         """Load tool data from JavaScript file"""
         print(f"Loading tool data from: {self.tool_data_path}")
 
-        with open(self.tool_data_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Extract JSON data from JS file
-        # Handle both toolData.js and the export format
-        if 'TOOL_DATA = [' in content:
-            start = content.find('TOOL_DATA = [') + len('TOOL_DATA = ')
-        elif 'export const TOOL_DATA = [' in content:
-            start = content.find('export const TOOL_DATA = [') + len('export const TOOL_DATA = ')
-        else:
-            start = content.find('[')
+        try:
+            tools = load_tool_data(self.tool_data_path).tools
+        except ToolDataParseError as e:
+            print(f"Error parsing toolData.js: {e}")
+            raise
 
-        end = content.rfind(']') + 1
-        json_str = content[start:end]
+        print(f"Successfully loaded {len(tools)} tools")
+        return tools
 
-        # Clean up any JavaScript syntax
-        json_str = json_str.strip()
-        if json_str.endswith(';'):
-            json_str = json_str[:-1]
+    def check_url_health(self, tool: Dict, max_age: float = None) -> Dict:
+        """Check if URL is still valid, revalidating against the URL cache"""
+        url = tool['source_url']
+        headers = {'User-Agent': USER_AGENT}
 
-        try:
-            tools = json.loads(json_str)
-            print(f"Successfully loaded {len(tools)} tools")
-            return tools
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON: {e}")
-            print(f"JSON string start: {json_str[:100]}...")
-            raise
+        if self.url_cache:
+            cached_result, conditional_headers = self.url_cache.lookup(url, max_age)
+            if cached_result:
+                return cached_result
+            headers.update(conditional_headers)
 
-    def check_url_health(self, tool: Dict) -> Dict:
-        """Check if URL is still valid"""
         try:
-            response = requests.head(
-                tool['source_url'],
-                timeout=5,
-                headers={'User-Agent': 'Mozilla/5.0 (compatible; ToolCurator/1.0)'},
-                allow_redirects=False
+            response = self.limiter.call_with_backoff(
+                host_key(url),
+                lambda: probe(self.session, url, headers=headers, timeout=5, stats=self.probe_stats)
             )
 
-            if response.status_code == 200:
-                return {'status': 'healthy', 'code': 200}
-            elif 300 <= response.status_code < 400:
-                return {
-                    'status': 'redirected',
-                    'code': response.status_code,
-                    'location': response.headers.get('Location', '')
-                }
-            elif response.status_code == 404:
-                return {'status': 'notFound', 'code': 404}
-            else:
-                return {'status': 'error', 'code': response.status_code}
+            result = classify_response(response.status_code, response.headers)
+            if self.url_cache:
+                result = self.url_cache.record(url, response.status_code, response.headers, result)
+            return result
 
         except requests.exceptions.Timeout:
             return {'status': 'error', 'message': 'Timeout'}
@@ -112,43 +116,20 @@ class ToolAuditor:
             return {'status': 'error', 'message': str(e)}
 
     def find_duplicates(self):
-        """Check for duplicate tools"""
-        name_map = {}
-        url_map = {}
-
-        for tool in self.tools:
-            # Check duplicate names
-            normalized_name = tool['name'].lower().replace(' ', '')
-            if normalized_name in name_map:
-                self.results['duplicate'].append({
-                    'tool1': name_map[normalized_name],
-                    'tool2': tool,
-                    'reason': 'duplicate_name'
-                })
-            else:
-                name_map[normalized_name] = tool
-
-            # Check duplicate URLs
-            normalized_url = tool['source_url'].lower().rstrip('/')
-            if normalized_url in url_map:
-                self.results['duplicate'].append({
-                    'tool1': url_map[normalized_url],
-                    'tool2': tool,
-                    'reason': 'duplicate_url'
-                })
-            else:
-                url_map[normalized_url] = tool
+        """Check for duplicate and near-duplicate tools"""
+        found = NearDuplicateDetector().find(self.catalog)
+        self.results['duplicate'].extend(found['exact'])
+        self.results['near_duplicate'].extend(found['near'])
 
     def analyze_category_gaps(self):
         """Analyze category distribution"""
-        personal_categories = defaultdict(int)
+        personal_categories = self.catalog.count_by('category', within=self.catalog.of_type('personal'))
         enterprise_categories = defaultdict(int)
 
-        for tool in self.tools:
-            if tool['type'] == 'personal':
-                personal_categories[tool['category']] += 1
-            else:
-                enterprise_categories[tool.get('sector', 'Unknown')] += 1
+        for tool_type, records in self.catalog.groups('type').items():
+            if tool_type != 'personal':
+                for record in records:
+                    enterprise_categories[record.get('sector', 'Unknown')] += 1
 
         # Identify categories with few tools
         for category, count in personal_categories.items():
@@ -167,7 +148,7 @@ class ToolAuditor:
                     'needs_more': 3 - count
                 }
 
-    def check_outdated_tools(self):
+    def check_outdated_tools(self, tools: List[Dict] = None):
         """Check for known outdated tools"""
         known_changes = {
             'Jasper': {'status': 'rebranded', 'note': 'Check if still Jasper.ai or changed'},
@@ -178,47 +159,72 @@ class ToolAuditor:
             'DeepSeek': {'status': 'check', 'note': 'Verify current status and capabilities'},
         }
 
-        for tool in self.tools:
+        for tool in self.tools if tools is None else tools:
             if tool['name'] in known_changes:
                 self.results['outdated'].append({
                     'tool': tool,
                     **known_changes[tool['name']]
                 })
 
-    def check_urls_parallel(self, max_workers: int = 10):
-        """Check URLs in parallel with rate limiting"""
+    def _record_url_result(self, index: int, tool: Dict, result: Dict):
+        """Store a URL check result and print progress"""
+        self.results[result['status']].append({'tool': tool, **result})
+
+        # Show progress with status indicator
+        status_emoji = {
+            'healthy': '✅',
+            'redirected': '🔄',
+            'notFound': '❌',
+            'error': '⚠️'
+        }
+        print(
+            f"{status_emoji.get(result['status'], '❓')} [{index + 1}/{self._url_check_total}] {tool['name']} - {result['status']}")
+
+    def check_urls_parallel(self, max_workers: int = 10, engine: str = 'thread',
+                            max_concurrency: int = 100, per_host_limit: int = 4,
+                            max_age: float = None, tools: List[Dict] = None):
+        """Check URLs in parallel, rate limited per host by the shared limiter
+
+        URLs verified less than `max_age` seconds ago are answered from the
+        URL cache without a request. Checks every tool unless `tools` is given.
+        """
+        tools = self.tools if tools is None else tools
+        self._url_check_total = len(tools)
+
         print("\nChecking URL health...")
         print("This may take a few minutes...\n")
 
+        if engine == 'async':
+            async_engine = AsyncHealthEngine(max_concurrency=max_concurrency, per_host_limit=per_host_limit,
+                                             limiter=self.limiter, url_cache=self.url_cache,
+                                             probe_stats=self.probe_stats)
+            async_engine.check_all(tools, on_result=self._record_url_result, max_age=max_age)
+        else:
+            self._check_urls_threaded(tools, max_workers, max_age)
+
+        print(f"\n{self.probe_stats.summary()}")
+
+        if self.url_cache:
+            evicted = self.url_cache.evict()
+            stats = self.url_cache.stats
+            print(f"\n💾 URL cache: {stats['fresh']} skipped (fresh), {stats['revalidated']} revalidated (304), "
+                  f"{stats['stored']} stored, {evicted} evicted")
+
+    def _check_urls_threaded(self, tools: List[Dict], max_workers: int, max_age: float = None):
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_tool = {
-                executor.submit(self.check_url_health, tool): tool
-                for tool in self.tools
+                executor.submit(self.check_url_health, tool, max_age): tool
+                for tool in tools
             }
 
             for i, future in enumerate(concurrent.futures.as_completed(future_to_tool)):
                 tool = future_to_tool[future]
                 try:
-                    result = future.result()
-                    self.results[result['status']].append({'tool': tool, **result})
-
-                    # Show progress with status indicator
-                    status_emoji = {
-                        'healthy': '✅',
-                        'redirected': '🔄',
-                        'notFound': '❌',
-                        'error': '⚠️'
-                    }
-                    print(
-                        f"{status_emoji.get(result['status'], '❓')} [{i + 1}/{len(self.tools)}] {tool['name']} - {result['status']}")
-
+                    self._record_url_result(i, tool, future.result())
                 except Exception as e:
                     print(f"❌ Error checking {tool['name']}: {e}")
                     self.results['error'].append({'tool': tool, 'error': str(e)})
 
-                # Rate limiting
-                time.sleep(0.1)
-
     def generate_report(self) -> Dict:
         """Generate comprehensive audit report"""
         report = {
@@ -230,22 +236,72 @@ class ToolAuditor:
                 'not_found': len(self.results['notFound']),
                 'errors': len(self.results['error']),
                 'duplicates': len(self.results['duplicate']),
+                'near_duplicates': len(self.results['near_duplicate']),
                 'outdated': len(self.results['outdated'])
             },
             'category_analysis': self.category_gaps,
             'details': self.results,
             'recommendations': self._generate_recommendations()
         }
+        if self.incremental_summary:
+            report['incremental'] = self.incremental_summary
 
         # Save report in the same directory as the script
-        report_path = Path(__file__).parent / 'audit-report.json'
-        with open(report_path, 'w', encoding='utf-8') as f:
+        with open(REPORT_PATH, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
 
-        print(f"\nReport saved to: {report_path}")
+        print(f"\nReport saved to: {REPORT_PATH}")
 
         return report
 
+    def _load_previous_state(self) -> Optional[Dict]:
+        """Load the last report and tool fingerprints, or None if there is no usable state"""
+        if not STATE_PATH.exists() or not REPORT_PATH.exists():
+            return None
+        try:
+            with open(STATE_PATH, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            with open(REPORT_PATH, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Could not read previous audit state: {e}")
+            return None
+        return {'tools': state.get('tools', {}), 'report': report}
+
+    def _save_state(self, fingerprints: List[str], url_checked: set):
+        """Store the fingerprint of every audited tool for the next incremental run"""
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'timestamp': datetime.now().isoformat(),
+            'tools': {fp: {'url_checked': fp in url_checked} for fp in fingerprints}
+        }
+        with open(STATE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    def _merge_previous_results(self, previous_report: Dict, fingerprints: List[str],
+                                url_rechecked: set, changed: set) -> int:
+        """Carry over URL and outdated results for tools that did not change
+
+        Reused entries point at the current tool dict, so re-numbered ids
+        stay correct. Returns the number of entries carried over.
+        """
+        current_tools = defaultdict(list)
+        for tool, fp in zip(self.tools, fingerprints):
+            current_tools[fp].append(tool)
+
+        reused = 0
+        previous_details = previous_report.get('details', {})
+        for bucket in URL_STATUSES + ('outdated',):
+            skip = changed if bucket == 'outdated' else url_rechecked
+            unclaimed = {fp: list(tools) for fp, tools in current_tools.items()}
+            for entry in previous_details.get(bucket, []):
+                fp = tool_fingerprint(entry['tool'])
+                if fp in skip or not unclaimed.get(fp):
+                    continue
+                self.results[bucket].append({**entry, 'tool': unclaimed[fp].pop(0)})
+                reused += 1
+        return reused
+
     def _generate_recommendations(self) -> List[str]:
         """Generate actionable recommendations based on audit results"""
         recommendations = []
@@ -253,6 +309,9 @@ class ToolAuditor:
         if self.results['duplicate']:
             recommendations.append(f"Remove {len(self.results['duplicate'])} duplicate tools")
 
+        if self.results['near_duplicate']:
+            recommendations.append(f"Review {len(self.results['near_duplicate'])} possible near-duplicate tools")
+
         if self.results['notFound']:
             recommendations.append(f"Fix or remove {len(self.results['notFound'])} tools with 404 errors")
 
@@ -267,12 +326,42 @@ class ToolAuditor:
 
         return recommendations
 
-    def run_audit(self, skip_url_check: bool = False):
-        """Run full audit"""
+    def run_audit(self, skip_url_check: bool = False, engine: str = 'thread',
+                  max_concurrency: int = 100, per_host_limit: int = 4, max_age: float = None,
+                  incremental: bool = False):
+        """Run full audit
+
+        With `incremental`, only tools added or changed since the last run
+        get URL and outdated checks; results for the rest are merged in from
+        the previous audit-report.json. Duplicate and gap analysis always
+        cover the whole catalog since they are in-memory and cheap.
+        """
         print("🔍 Starting AI Tools Audit...\n")
         print(f"Total tools to audit: {len(self.tools)}")
         print("=" * 50)
 
+        fingerprints = [tool_fingerprint(tool) for tool in self.tools]
+        previous = self._load_previous_state() if incremental else None
+        if incremental and previous is None:
+            print("\nℹ️  No previous audit state found, running a full audit")
+
+        if previous:
+            previous_tools = previous['tools']
+            changed = {fp for fp in fingerprints if fp not in previous_tools}
+            changed_tools = [tool for tool, fp in zip(self.tools, fingerprints) if fp in changed]
+            url_tools = [] if skip_url_check else [
+                tool for tool, fp in zip(self.tools, fingerprints)
+                if fp in changed or not previous_tools[fp]['url_checked']
+            ]
+            removed = len(set(previous_tools) - set(fingerprints))
+            print(f"\n♻️  Incremental audit: {len(changed_tools)} added or changed, {removed} removed, "
+                  f"{len(self.tools) - len(changed_tools)} unchanged")
+        else:
+            previous_tools = {}
+            changed = set(fingerprints)
+            changed_tools = self.tools
+            url_tools = [] if skip_url_check else self.tools
+
         # Check duplicates
         print("\n📋 Checking for duplicates...")
         self.find_duplicates()
@@ -283,17 +372,36 @@ class ToolAuditor:
             for dup in self.results['duplicate'][:3]:  # Show first 3
                 print(
                     f"  - {dup['tool1']['name']} (ID: {dup['tool1']['id']}) vs {dup['tool2']['name']} (ID: {dup['tool2']['id']})")
-                print(f"    Reason: {dup['reason']}")
+                print(f"    Reason: {', '.join(dup['reasons'])}")
+
+        print(f"Found {len(self.results['near_duplicate'])} possible near-duplicates")
+        for dup in self.results['near_duplicate'][:3]:  # Show first 3
+            print(f"  - {dup['tool1']['name']} vs {dup['tool2']['name']} ({', '.join(dup['reasons'])}, score {dup['score']})")
 
         # Check URLs (optional)
         if not skip_url_check:
-            self.check_urls_parallel()
+            self.check_urls_parallel(engine=engine, max_concurrency=max_concurrency,
+                                     per_host_limit=per_host_limit, max_age=max_age, tools=url_tools)
         else:
             print("\n⏭️  Skipping URL health check (use --check-urls to enable)")
 
         # Check outdated
         print("\n🔄 Checking for outdated tools...")
-        self.check_outdated_tools()
+        self.check_outdated_tools(changed_tools)
+
+        url_checked_fps = {tool_fingerprint(tool) for tool in url_tools}
+        if previous:
+            url_rechecked = changed | url_checked_fps
+            reused = self._merge_previous_results(previous['report'], fingerprints, url_rechecked, changed)
+            url_checked_fps |= {
+                fp for fp in fingerprints
+                if fp not in changed and previous_tools[fp]['url_checked']
+            }
+            self.incremental_summary = {
+                'changed': len(changed_tools),
+                'removed': removed,
+                'reused_results': reused
+            }
         print(f"Found {len(self.results['outdated'])} potentially outdated tools")
 
         if self.results['outdated']:
@@ -312,6 +420,7 @@ class ToolAuditor:
 
         # Generate report
         report = self.generate_report()
+        self._save_state(fingerprints, url_checked_fps)
 
         print("\n" + "=" * 50)
         print("✅ Audit Complete!")
@@ -338,12 +447,27 @@ if __name__ == "__main__":
                         help='Check URL health (takes longer)')
     parser.add_argument('--path', type=str,
                         help='Path to toolData.js file')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread',
+                        help='URL check engine: thread pool or single asyncio event loop')
+    parser.add_argument('--concurrency', type=int, default=100,
+                        help='Max concurrent connections for the async engine')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='Max concurrent connections per host for the async engine')
+    parser.add_argument('--max-age', type=float,
+                        help='Skip URLs verified within this many hours (uses the URL cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the on-disk URL cache')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-audit tools added or changed since the last run')
 
     args = parser.parse_args()
 
     try:
-        auditor = ToolAuditor(tool_data_path=args.path)
-        auditor.run_audit(skip_url_check=not args.check_urls)
+        auditor = ToolAuditor(tool_data_path=args.path, use_cache=not args.no_cache)
+        max_age = args.max_age * 3600 if args.max_age is not None else None
+        auditor.run_audit(skip_url_check=not args.check_urls, engine=args.engine,
+                          max_concurrency=args.concurrency, per_host_limit=args.per_host,
+                          max_age=max_age, incremental=args.incremental)
     except FileNotFoundError as e:
         print(f"❌ Error: {e}")
         print("\nPlease specify the correct path to toolData.js using --path")
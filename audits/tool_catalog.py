@@ -0,0 +1,201 @@
+# tool_catalog.py
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+FIELDS = ('id', 'name', 'source_url', 'short_description', 'screenshot_url', 'category', 'type', 'sector')
+
+# Public suffixes with two labels that show up in tool URLs; everything else
+# is treated as a single-label TLD
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'com.au', 'net.au', 'org.au', 'co.nz', 'co.jp',
+    'co.in', 'co.kr', 'com.br', 'com.cn', 'com.mx', 'com.sg', 'com.tr', 'co.za', 'com.hk',
+}
+
+
+def normalize_name(name: str) -> str:
+    return (name or '').lower().replace(' ', '')
+
+
+def normalize_url(url: str) -> str:
+    return (url or '').lower().rstrip('/')
+
+
+def registrable_domain(url: str) -> str:
+    """Registrable domain of a URL, e.g. https://app.foo.co.uk/x -> foo.co.uk"""
+    host = urlparse(url if '//' in (url or '') else f"//{url}").hostname or ''
+    labels = host.split('.')
+    if len(labels) > 2 and '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+class ToolRecord:
+    """One catalog entry; fields outside FIELDS are kept in `extra`"""
+    __slots__ = FIELDS + ('extra', 'absent')
+
+    def __init__(self, data: Dict):
+        for field in FIELDS:
+            setattr(self, field, data.get(field))
+        self.extra = {key: value for key, value in data.items() if key not in FIELDS}
+        # Fields missing from the source dict are left out again by to_dict()
+        self.absent = {field for field in FIELDS if field not in data}
+
+    def get(self, key: str, default=None):
+        if key in FIELDS:
+            return default if key in self.absent else getattr(self, key)
+        return self.extra.get(key, default)
+
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in FIELDS if field not in self.absent}
+        data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"ToolRecord(id={self.id!r}, name={self.name!r})"
+
+
+class ToolCatalog:
+    """Tool list with secondary indexes kept in sync on every mutation.
+
+    Each index maps a key to an insertion-ordered set of records, so
+    lookups, inserts, updates and removals are O(1) per affected key.
+    """
+
+    INDEXES: Dict[str, Tuple[str, Callable[[str], str]]] = {
+        'name': ('name', normalize_name),
+        'url': ('source_url', normalize_url),
+        'domain': ('source_url', registrable_domain),
+        'category': ('category', lambda value: value or ''),
+        'sector': ('sector', lambda value: value or ''),
+        'type': ('type', lambda value: value or ''),
+    }
+
+    def __init__(self, tools: Iterable[Dict] = ()):
+        self._records: Dict[ToolRecord, None] = {}
+        self._by_id: Dict[str, ToolRecord] = {}
+        self._indexes: Dict[str, Dict[str, Dict[ToolRecord, None]]] = {
+            name: defaultdict(dict) for name in self.INDEXES
+        }
+        self.add_many(tools)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[ToolRecord]:
+        return iter(list(self._records))
+
+    # Index maintenance
+
+    def _index(self, record: ToolRecord, fields: Optional[Iterable[str]] = None):
+        for index_name, (field, key_fn) in self.INDEXES.items():
+            if fields is None or field in fields:
+                self._indexes[index_name][key_fn(getattr(record, field))][record] = None
+
+    def _unindex(self, record: ToolRecord, fields: Optional[Iterable[str]] = None):
+        for index_name, (field, key_fn) in self.INDEXES.items():
+            if fields is None or field in fields:
+                index = self._indexes[index_name]
+                key = key_fn(getattr(record, field))
+                index[key].pop(record, None)
+                if not index[key]:
+                    del index[key]
+
+    def _lookup(self, index_name: str, key: str) -> List[ToolRecord]:
+        bucket = self._indexes[index_name].get(key)
+        return list(bucket) if bucket else []
+
+    # Lookups
+
+    def get(self, tool_id: str) -> Optional[ToolRecord]:
+        return self._by_id.get(str(tool_id))
+
+    def find_by_name(self, name: str, exact: bool = False) -> List[ToolRecord]:
+        """Records whose normalized name matches; `exact` also requires identical names"""
+        records = self._lookup('name', normalize_name(name))
+        return [record for record in records if record.name == name] if exact else records
+
+    def find_by_url(self, url: str) -> List[ToolRecord]:
+        return self._lookup('url', normalize_url(url))
+
+    def find_by_domain(self, url_or_domain: str) -> List[ToolRecord]:
+        return self._lookup('domain', registrable_domain(url_or_domain))
+
+    def in_category(self, category: str) -> List[ToolRecord]:
+        return self._lookup('category', category)
+
+    def in_sector(self, sector: str) -> List[ToolRecord]:
+        return self._lookup('sector', sector)
+
+    def of_type(self, tool_type: str) -> List[ToolRecord]:
+        return self._lookup('type', tool_type)
+
+    def groups(self, index_name: str) -> Dict[str, List[ToolRecord]]:
+        """All keys of an index with their records"""
+        return {key: list(bucket) for key, bucket in self._indexes[index_name].items()}
+
+    def count_by(self, index_name: str, within: Optional[Iterable[ToolRecord]] = None) -> Dict[str, int]:
+        """Records per key of an index, optionally restricted to `within`"""
+        if within is None:
+            return {key: len(bucket) for key, bucket in self._indexes[index_name].items()}
+        field, key_fn = self.INDEXES[index_name]
+        counts = defaultdict(int)
+        for record in within:
+            counts[key_fn(getattr(record, field))] += 1
+        return dict(counts)
+
+    # Mutations
+
+    def add(self, tool: Dict) -> ToolRecord:
+        record = ToolRecord(tool)
+        self._records[record] = None
+        if record.id is not None:
+            self._by_id[str(record.id)] = record
+        self._index(record)
+        return record
+
+    def add_many(self, tools: Iterable[Dict]) -> List[ToolRecord]:
+        return [self.add(tool) for tool in tools]
+
+    def remove(self, record: ToolRecord):
+        self._unindex(record)
+        self._records.pop(record, None)
+        if self._by_id.get(str(record.id)) is record:
+            del self._by_id[str(record.id)]
+
+    def remove_many(self, records: Iterable[ToolRecord]):
+        for record in list(records):
+            self.remove(record)
+
+    def update(self, record: ToolRecord, **changes):
+        """Change fields on a record, re-indexing only the affected keys"""
+        core = {field: value for field, value in changes.items() if field in FIELDS}
+        self._unindex(record, core)
+        if 'id' in core and self._by_id.get(str(record.id)) is record:
+            del self._by_id[str(record.id)]
+
+        for field, value in changes.items():
+            if field in FIELDS:
+                setattr(record, field, value)
+                record.absent.discard(field)
+            else:
+                record.extra[field] = value
+
+        if 'id' in core:
+            self._by_id[str(record.id)] = record
+        self._index(record, core)
+
+    def update_many(self, updates: Iterable[Tuple[ToolRecord, Dict]]):
+        for record, changes in updates:
+            self.update(record, **changes)
+
+    def reindex_ids(self):
+        """Renumber ids 1..n in catalog order"""
+        self._by_id = {}
+        for position, record in enumerate(self._records, start=1):
+            record.id = str(position)
+            record.absent.discard('id')
+            self._by_id[record.id] = record
+
+    def to_list(self) -> List[Dict]:
+        return [record.to_dict() for record in self._records]
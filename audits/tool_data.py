@@ -0,0 +1,350 @@
+# tool_data.py
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CACHE_DIR = Path(__file__).parent / '.cache'
+CACHE_VERSION = 1
+
+EXPORT_PATTERN = re.compile(r'(?:export\s+)?(?:const|let|var)\s+TOOL_DATA\s*=\s*')
+
+
+class ToolDataParseError(ValueError):
+    """Raised when toolData.js does not contain a parseable tool array"""
+
+
+class ToolDataFile:
+    """Parsed toolData.js: the tool list plus the source text around the array"""
+
+    def __init__(self, path: Path, tools: List[Dict], prefix: str, suffix: str):
+        self.path = path
+        self.tools = tools
+        self.prefix = prefix
+        self.suffix = suffix
+
+
+class _JSLiteralParser:
+    """Parser for the JavaScript literal subset used in data modules.
+
+    Accepts everything JSON does plus comments, trailing commas,
+    single-quoted and backtick strings (without interpolation), unquoted
+    keys, `undefined` and hex numbers.
+    """
+
+    ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+    NUMBER = re.compile(r'[+-]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+    IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+    CONSTANTS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str):
+        line = self.text.count('\n', 0, self.pos) + 1
+        column = self.pos - self.text.rfind('\n', 0, self.pos)
+        raise ToolDataParseError(f"{message} at line {line}, column {column}")
+
+    def skip_whitespace(self):
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char.isspace():
+                self.pos += 1
+            elif text.startswith('//', self.pos):
+                end = text.find('\n', self.pos)
+                self.pos = len(text) if end == -1 else end + 1
+            elif text.startswith('/*', self.pos):
+                end = text.find('*/', self.pos + 2)
+                if end == -1:
+                    self.error("Unterminated comment")
+                self.pos = end + 2
+            else:
+                break
+
+    def parse_value(self) -> Any:
+        self.skip_whitespace()
+        if self.pos >= len(self.text):
+            self.error("Unexpected end of input")
+
+        char = self.text[self.pos]
+        if char == '[':
+            return self.parse_array()
+        if char == '{':
+            return self.parse_object()
+        if char in '"\'`':
+            return self.parse_string()
+
+        match = self.NUMBER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            literal = match.group()
+            if literal.lstrip('+-')[:2].lower() == '0x':
+                return int(literal, 16)
+            number = float(literal)
+            return int(number) if number.is_integer() and not re.search(r'[.eE]', literal) else number
+
+        match = self.IDENTIFIER.match(self.text, self.pos)
+        if match and match.group() in self.CONSTANTS:
+            self.pos = match.end()
+            return self.CONSTANTS[match.group()]
+
+        self.error(f"Unexpected character {char!r}")
+
+    def parse_array(self) -> List:
+        self.pos += 1
+        items = []
+        while True:
+            self.skip_whitespace()
+            if self.text.startswith(']', self.pos):
+                self.pos += 1
+                return items
+            items.append(self.parse_value())
+            self.skip_whitespace()
+            if self.text.startswith(',', self.pos):
+                self.pos += 1
+            elif not self.text.startswith(']', self.pos):
+                self.error("Expected ',' or ']'")
+
+    def parse_object(self) -> Dict:
+        self.pos += 1
+        obj = {}
+        while True:
+            self.skip_whitespace()
+            if self.text.startswith('}', self.pos):
+                self.pos += 1
+                return obj
+
+            if self.pos < len(self.text) and self.text[self.pos] in '"\'`':
+                key = self.parse_string()
+            else:
+                match = self.IDENTIFIER.match(self.text, self.pos) or self.NUMBER.match(self.text, self.pos)
+                if not match:
+                    self.error("Expected property name")
+                key = match.group()
+                self.pos = match.end()
+
+            self.skip_whitespace()
+            if not self.text.startswith(':', self.pos):
+                self.error("Expected ':'")
+            self.pos += 1
+            obj[key] = self.parse_value()
+
+            self.skip_whitespace()
+            if self.text.startswith(',', self.pos):
+                self.pos += 1
+            elif not self.text.startswith('}', self.pos):
+                self.error("Expected ',' or '}'")
+
+    def parse_string(self) -> str:
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        chunks = []
+        start = self.pos
+        while True:
+            if self.pos >= len(text):
+                self.error("Unterminated string")
+            char = text[self.pos]
+            if char == quote:
+                chunks.append(text[start:self.pos])
+                self.pos += 1
+                return ''.join(chunks)
+            if quote == '`' and text.startswith('${', self.pos):
+                self.error("Template literal interpolation is not supported")
+            if char == '\n' and quote != '`':
+                self.error("Unterminated string")
+            if char != '\\':
+                self.pos += 1
+                continue
+
+            chunks.append(text[start:self.pos])
+            escape = text[self.pos + 1:self.pos + 2]
+            self.pos += 2
+            if escape in self.ESCAPES:
+                chunks.append(self.ESCAPES[escape])
+            elif escape == 'x':
+                chunks.append(chr(int(text[self.pos:self.pos + 2], 16)))
+                self.pos += 2
+            elif escape == 'u' and text.startswith('{', self.pos):
+                end = text.index('}', self.pos)
+                chunks.append(chr(int(text[self.pos + 1:end], 16)))
+                self.pos = end + 1
+            elif escape == 'u':
+                code = int(text[self.pos:self.pos + 4], 16)
+                self.pos += 4
+                # Combine UTF-16 surrogate pairs the way JSON does
+                if 0xD800 <= code < 0xDC00 and text.startswith('\\u', self.pos):
+                    low = int(text[self.pos + 2:self.pos + 6], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        self.pos += 6
+                chunks.append(chr(code))
+            elif escape == '\n':
+                pass  # line continuation
+            else:
+                chunks.append(escape)
+            start = self.pos
+
+
+def parse_tool_data(content: str) -> Tuple[List[Dict], str, str]:
+    """Extract the exported tool array from toolData.js source
+
+    Returns (tools, prefix, suffix) where prefix + array + suffix is the
+    original file. Plain JSON arrays take the C json fast path; anything
+    else goes through the JavaScript literal parser.
+    """
+    match = EXPORT_PATTERN.search(content)
+    start = content.find('[', match.end() if match else 0)
+    if start == -1:
+        raise ToolDataParseError("No tool array found in toolData.js")
+
+    try:
+        tools, end = json.JSONDecoder().raw_decode(content, start)
+    except json.JSONDecodeError:
+        parser = _JSLiteralParser(content)
+        parser.pos = start
+        tools = parser.parse_value()
+        end = parser.pos
+
+    if not isinstance(tools, list):
+        raise ToolDataParseError("TOOL_DATA is not an array")
+    return tools, content[:start], content[end:]
+
+
+def _cache_path(path: Path) -> Path:
+    digest = hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f"tooldata-{digest}.pickle"
+
+
+def load_tool_data(path) -> ToolDataFile:
+    """Load toolData.js, reusing the compiled pickle sidecar when it is current
+
+    The sidecar is trusted when the file's mtime and size are unchanged.
+    Otherwise the file is hashed, and it is only re-parsed when the
+    content hash differs too.
+    """
+    path = Path(path)
+    cache_path = _cache_path(path)
+    stat = path.stat()
+
+    cached = None
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            cached = None
+        if cached is not None and cached.get('version') != CACHE_VERSION:
+            cached = None
+
+    if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+        return ToolDataFile(path, cached['tools'], cached['prefix'], cached['suffix'])
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if cached and cached['sha256'] == digest:
+        tools, prefix, suffix = cached['tools'], cached['prefix'], cached['suffix']
+    else:
+        tools, prefix, suffix = parse_tool_data(raw.decode('utf-8'))
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({
+            'version': CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'tools': tools,
+            'prefix': prefix,
+            'suffix': suffix
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+    return ToolDataFile(path, tools, prefix, suffix)
+
+
+def iter_tool_data_chunks(tools: List[Dict], prefix: str, suffix: str) -> Iterator[str]:
+    """Yield the file text piece by piece, identical to prefix + json.dumps(tools, indent=2) + suffix"""
+    yield prefix
+    if not tools:
+        yield '[]'
+    else:
+        yield '['
+        for i, tool in enumerate(tools):
+            entry = json.dumps(tool, indent=2).replace('\n', '\n  ')
+            yield ('\n  ' if i == 0 else ',\n  ') + entry
+        yield '\n]'
+    yield suffix
+
+
+def save_tool_data(path, tools: List[Dict], prefix: str, suffix: str, reason: str = '',
+                   journal: bool = True) -> str:
+    """Atomically write toolData.js and journal the change; returns the new sha256
+
+    The file is streamed to a temp file in the same directory, fsynced and
+    renamed over the original, so readers see either the old or the new
+    catalog, never a partial one. The journal entry is appended before the
+    rename, and rollback checks file hashes, so a crash between the two
+    steps is detected rather than replayed.
+    """
+    # Imported here because the journal itself loads tool data through this module
+    from tool_journal import ChangeJournal
+
+    path = Path(path)
+    previous = load_tool_data(path) if journal and path.exists() else None
+
+    digest = hashlib.sha256()
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            for chunk in iter_tool_data_chunks(tools, prefix, suffix):
+                f.write(chunk)
+                digest.update(chunk.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        new_sha256 = digest.hexdigest()
+        if previous is not None:
+            ChangeJournal.for_tool_data(path).record(previous, tools, prefix, suffix, new_sha256, reason)
+
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+    _fsync_directory(path.parent)
+    return new_sha256
+
+
+def _fsync_directory(directory: Path):
+    """Persist a rename; not supported on Windows, where it is skipped"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def file_sha256(path) -> Optional[str]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
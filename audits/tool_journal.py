@@ -0,0 +1,202 @@
+# tool_journal.py
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tool_data import file_sha256, load_tool_data, save_tool_data
+
+DEFAULT_TOOL_DATA = Path(__file__).parent.parent / 'frontend' / 'src' / 'app' / 'utils' / 'toolData.js'
+
+
+def diff_tools(before: List[Dict], after: List[Dict]) -> List[Dict]:
+    """Compact per-index diff between two tool lists
+
+    Tools whose keys are unchanged are stored as changed fields only
+    ({'i', 'before': {...}, 'after': {...}}); anything else (inserted,
+    deleted or reshaped tools) is stored whole, with None for a missing side.
+    """
+    ops = []
+    for i in range(max(len(before), len(after))):
+        old = before[i] if i < len(before) else None
+        new = after[i] if i < len(after) else None
+        if old == new:
+            continue
+        if old is not None and new is not None and list(old) == list(new):
+            fields = [key for key in old if old[key] != new[key]]
+            ops.append({
+                'i': i,
+                'before': {key: old[key] for key in fields},
+                'after': {key: new[key] for key in fields}
+            })
+        else:
+            ops.append({'i': i, 'old': old, 'new': new})
+    return ops
+
+
+def apply_ops(tools: List[Dict], ops: List[Dict], reverse: bool = False) -> List[Dict]:
+    """Apply journal ops to a tool list; `reverse` undoes them"""
+    tools = [dict(tool) for tool in tools]
+    side = 'before' if reverse else 'after'
+    whole = 'old' if reverse else 'new'
+
+    for op in ops:
+        if side in op:
+            tools[op['i']].update(op[side])
+        else:
+            while len(tools) <= op['i']:
+                tools.append(None)
+            tools[op['i']] = op[whole]
+
+    # Whole-tool ops only ever add or remove at the tail
+    while tools and tools[-1] is None:
+        tools.pop()
+    return tools
+
+
+class ChangeJournal:
+    """Append-only JSONL journal of edits to toolData.js.
+
+    Each entry holds the hashes of the file before and after the edit plus
+    the per-tool diff, so any entry can be undone as long as the file still
+    matches its `sha256`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @classmethod
+    def for_tool_data(cls, tool_data_path) -> 'ChangeJournal':
+        tool_data_path = Path(tool_data_path)
+        return cls(tool_data_path.with_name(tool_data_path.name + '.journal.jsonl'))
+
+    def entries(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append
+                    break
+        return entries
+
+    def _append(self, entry: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _next_seq(self) -> int:
+        return max((entry.get('seq', 0) for entry in self.entries()), default=0) + 1
+
+    def record(self, previous, tools: List[Dict], prefix: str, suffix: str,
+               new_sha256: str, reason: str = '') -> Optional[Dict]:
+        """Journal the change from `previous` (a ToolDataFile) to the new content"""
+        base_sha256 = file_sha256(previous.path)
+        if base_sha256 == new_sha256:
+            return None
+
+        entry = {
+            'seq': self._next_seq(),
+            'ts': datetime.now().isoformat(),
+            'reason': reason,
+            'base_sha256': base_sha256,
+            'sha256': new_sha256,
+            'ops': diff_tools(previous.tools, tools)
+        }
+        if prefix != previous.prefix:
+            entry['prefix'] = [previous.prefix, prefix]
+        if suffix != previous.suffix:
+            entry['suffix'] = [previous.suffix, suffix]
+
+        self._append(entry)
+        return entry
+
+    def applied(self, tool_data_path) -> List[Dict]:
+        """Entries still in effect, oldest first
+
+        Entries whose write never landed (a crash between journaling and
+        rename) and entries already rolled back are left out.
+        """
+        entries = self.entries()
+        rolled_back = {entry['rolled_back'] for entry in entries if 'rolled_back' in entry}
+        edits = [entry for entry in entries if 'ops' in entry and entry['seq'] not in rolled_back]
+
+        # Walk back from the current file hash to find which edits are live
+        current = file_sha256(tool_data_path)
+        live = []
+        for entry in reversed(edits):
+            if entry['sha256'] == current:
+                live.append(entry)
+                current = entry['base_sha256']
+        return list(reversed(live))
+
+    def rollback(self, tool_data_path, seq: Optional[int] = None) -> List[int]:
+        """Undo the newest live edit, or every live edit back to and including `seq`"""
+        live = self.applied(tool_data_path)
+        if not live:
+            raise ValueError("No journaled changes to roll back")
+        if seq is None:
+            seq = live[-1]['seq']
+        if seq not in {entry['seq'] for entry in live}:
+            raise ValueError(f"Change {seq} is not the current state of the file and cannot be rolled back")
+
+        undone = []
+        for entry in reversed(live):
+            if entry['seq'] < seq:
+                break
+            data = load_tool_data(tool_data_path)
+            tools = apply_ops(data.tools, entry['ops'], reverse=True)
+            prefix = entry['prefix'][0] if 'prefix' in entry else data.prefix
+            suffix = entry['suffix'][0] if 'suffix' in entry else data.suffix
+
+            new_sha256 = save_tool_data(tool_data_path, tools, prefix, suffix, journal=False)
+            if new_sha256 != entry['base_sha256']:
+                print(f"⚠️  Change {entry['seq']}: restored content differs from the original bytes")
+            self._append({
+                'seq': self._next_seq(),
+                'ts': datetime.now().isoformat(),
+                'rolled_back': entry['seq'],
+                'sha256': new_sha256
+            })
+            undone.append(entry['seq'])
+        return undone
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or roll back journaled toolData.js edits')
+    parser.add_argument('--file', default=str(DEFAULT_TOOL_DATA), help='Path to toolData.js')
+    parser.add_argument('--list', action='store_true', help='List changes still in effect')
+    parser.add_argument('--rollback', nargs='?', type=int, const=0, metavar='SEQ',
+                        help='Undo the latest change, or every change back to SEQ')
+    args = parser.parse_args()
+
+    journal = ChangeJournal.for_tool_data(args.file)
+
+    if args.rollback is not None:
+        try:
+            undone = journal.rollback(args.file, args.rollback or None)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"✅ Rolled back change(s): {', '.join(map(str, undone))}")
+        return
+
+    live = journal.applied(args.file)
+    if not live:
+        print("No journaled changes in effect")
+    for entry in live:
+        print(f"#{entry['seq']}  {entry['ts']}  {len(entry['ops'])} tool(s)  {entry.get('reason', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# url_cache.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / '.cache' / 'url_cache.sqlite3'
+
+# Entries not re-checked within the TTL are evicted; the table is also capped
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class UrlCache:
+    """On-disk cache of URL health results with HTTP validators.
+
+    Each row keeps the last classified result plus the ETag/Last-Modified
+    the server sent, so the next run can send a conditional request and
+    reuse the stored result on `304 Not Modified`. Safe to share between
+    threads.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'fresh': 0, 'revalidated': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS url_results (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                code INTEGER,
+                location TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_checked_at ON url_results (checked_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, code, location, etag, last_modified, checked_at FROM url_results WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, code, location, etag, last_modified, checked_at = row
+        return {
+            'status': status,
+            'code': code,
+            'location': location,
+            'etag': etag,
+            'last_modified': last_modified,
+            'checked_at': checked_at
+        }
+
+    @staticmethod
+    def to_result(entry: Dict) -> Dict:
+        """Rebuild an audit result dict from a cache entry"""
+        result = {'status': entry['status']}
+        if entry['code'] is not None:
+            result['code'] = entry['code']
+        if entry['location']:
+            result['location'] = entry['location']
+        return result
+
+    def lookup(self, url: str, max_age: Optional[float] = None):
+        """Return (fresh_result, conditional_headers) for a URL
+
+        `fresh_result` is set when the entry was checked within `max_age`
+        seconds and no request is needed at all. Otherwise the headers
+        carry If-None-Match/If-Modified-Since for revalidation.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return None, {}
+
+        if max_age is not None and time.time() - entry['checked_at'] <= max_age:
+            with self._lock:
+                self.stats['fresh'] += 1
+            return {**self.to_result(entry), 'cached': True}, {}
+
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return None, headers
+
+    def record(self, url: str, status_code: int, headers, result: Dict) -> Dict:
+        """Store a response and return the result to report
+
+        On `304 Not Modified` the cached result is reused and only its
+        timestamp is refreshed.
+        """
+        if status_code == 304:
+            entry = self.get(url)
+            if entry is not None:
+                with self._lock:
+                    self._conn.execute("UPDATE url_results SET checked_at = ? WHERE url = ?", (time.time(), url))
+                    self._conn.commit()
+                    self.stats['revalidated'] += 1
+                return {**self.to_result(entry), 'revalidated': True}
+
+        # Validators only make sense for a final 200 response
+        etag = headers.get('ETag') if status_code == 200 else None
+        last_modified = headers.get('Last-Modified') if status_code == 200 else None
+
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO url_results
+                   (url, status, code, location, etag, last_modified, checked_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (url, result['status'], result.get('code'), result.get('location'),
+                 etag, last_modified, time.time())
+            )
+            self._conn.commit()
+            self.stats['stored'] += 1
+        return result
+
+    def evict(self) -> int:
+        """Drop entries older than the TTL, then the oldest beyond max_entries"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM url_results WHERE checked_at < ?", (time.time() - self.ttl,)
+            )
+            removed = cursor.rowcount
+            cursor = self._conn.execute(
+                """DELETE FROM url_results WHERE url IN (
+                       SELECT url FROM url_results ORDER BY checked_at DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+            removed += cursor.rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,110 @@
+# url_health.py
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from probe import ProbeStats, probe_async
+from rate_limiter import RateLimiter, host_key, shared_limiter
+from url_cache import UrlCache
+
+USER_AGENT = 'Mozilla/5.0 (compatible; ToolCurator/1.0)'
+
+
+def classify_response(status_code: int, headers) -> Dict:
+    """Map an HTTP status to the audit result buckets"""
+    if status_code == 200:
+        return {'status': 'healthy', 'code': 200}
+    elif 300 <= status_code < 400:
+        return {
+            'status': 'redirected',
+            'code': status_code,
+            'location': headers.get('Location', '')
+        }
+    elif status_code == 404:
+        return {'status': 'notFound', 'code': 404}
+    else:
+        return {'status': 'error', 'code': status_code}
+
+
+class AsyncHealthEngine:
+    """Check many URLs from a single event loop over one pooled session.
+
+    The connector enforces both caps: `max_concurrency` bounds the total
+    number of open connections and `per_host_limit` bounds connections to
+    any single host, so one slow vendor cannot starve the rest of the run.
+    Request rate per host comes from the shared token-bucket limiter.
+    """
+
+    def __init__(self, max_concurrency: int = 100, per_host_limit: int = 4, timeout: float = 5,
+                 limiter: Optional[RateLimiter] = None, max_retries: int = 3,
+                 url_cache: Optional[UrlCache] = None, probe_stats: Optional[ProbeStats] = None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.limiter = limiter or shared_limiter()
+        self.max_retries = max_retries
+        self.url_cache = url_cache
+        self.probe_stats = probe_stats or ProbeStats()
+
+    async def check_url(self, session: aiohttp.ClientSession, url: str, max_age: Optional[float] = None) -> Dict:
+        """Check a single URL, mirroring ToolAuditor.check_url_health"""
+        headers = {}
+        if self.url_cache:
+            cached_result, headers = self.url_cache.lookup(url, max_age)
+            if cached_result:
+                return cached_result
+
+        key = host_key(url)
+        try:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.wait_async(key)
+                response = await probe_async(session, url, headers=headers, stats=self.probe_stats)
+                throttled = self.limiter.is_throttled(response.status_code, response.headers)
+                if not throttled or attempt == self.max_retries:
+                    result = classify_response(response.status_code, response.headers)
+                    if self.url_cache:
+                        result = self.url_cache.record(url, response.status_code, response.headers, result)
+                    return result
+                self.limiter.throttle(key, response.headers.get('Retry-After'))
+        except asyncio.TimeoutError:
+            return {'status': 'error', 'message': 'Timeout'}
+        except (aiohttp.ClientError, ValueError) as e:
+            return {'status': 'error', 'message': str(e)}
+
+    async def _run(self, tools: List[Dict], on_result: Optional[Callable],
+                   max_age: Optional[float]) -> List[Tuple[Dict, Dict]]:
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        # Per-socket limits, like requests' timeout; a total would also count
+        # the time a request spends queued for a connector slot
+        session_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        results = []
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=session_timeout,
+            headers={'User-Agent': USER_AGENT}
+        ) as session:
+            async def check_tool(tool):
+                return tool, await self.check_url(session, tool['source_url'], max_age)
+
+            tasks = [asyncio.ensure_future(check_tool(tool)) for tool in tools]
+            for i, task in enumerate(asyncio.as_completed(tasks)):
+                tool, result = await task
+                results.append((tool, result))
+                if on_result:
+                    on_result(i, tool, result)
+
+        return results
+
+    def check_all(self, tools: List[Dict], on_result: Optional[Callable] = None,
+                  max_age: Optional[float] = None) -> List[Tuple[Dict, Dict]]:
+        """Check every tool's source_url and return (tool, result) pairs
+
+        `on_result(index, tool, result)` is called as each check completes.
+        """
+        return asyncio.run(self._run(tools, on_result, max_age))
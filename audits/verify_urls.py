@@ -3,6 +3,8 @@ import json
 import requests
 from pathlib import Path
 
+from probe import ProbeStats, probe
+
 
 def quick_verify():
     # Load the fix report
@@ -12,14 +14,19 @@ def quick_verify():
     print("🔍 Verifying updated URLs...")
     print("=" * 60)
 
+    session = requests.Session()
+    stats = ProbeStats()
+
     for update in report['url_updates']:
         try:
-            response = requests.head(update['new_url'], timeout=5, allow_redirects=True)
+            response = probe(session, update['new_url'], timeout=5, allow_redirects=True, stats=stats)
             status = "✅" if response.status_code == 200 else f"⚠️  {response.status_code}"
             print(f"{status} {update['name']}: {update['new_url']}")
         except Exception as e:
             print(f"❌ {update['name']}: Error - {str(e)}")
 
+    print(f"\n{stats.summary()}")
+
     print("\n🏷️  Rebranded tools:")
     for rebrand in report['rebrands']:
         print(f"  • {rebrand}")
@@ -0,0 +1,336 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageDraw
+
+# Shared helpers live alongside the audit scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'audits'))
+from rate_limiter import api_key, parse_retry_after, shared_limiter
+
+SCREENSHOT_API_URL = "https://api.screenshotone.com/take"
+
+
+# Environment defaults are read when a backend is built, not at import:
+# the scripts load .env.local after importing this module
+def default_backend():
+    """Which backend captures run on unless a script asks for another (env CAPTURE_BACKEND)"""
+    return os.getenv("CAPTURE_BACKEND", "screenshotone")
+
+
+def default_browsers():
+    """Warm browsers kept by the browser backend (env CAPTURE_BROWSERS)"""
+    return int(os.getenv("CAPTURE_BROWSERS", "4"))
+
+
+class CaptureError(Exception):
+    """A capture that failed; retry_after is the delay the service asked for, if any"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CaptureBackend:
+    """
+    Turns a URL into PNG bytes.
+
+    Backends are shared by the engine's fetch threads, so `capture` must be
+    thread-safe. `problem()` is checked once before a run starts.
+
+    Args:
+        params (dict): Capture parameters; viewport_width and viewport_height are honoured by every backend
+        timeout (int): Per-capture timeout in seconds
+    """
+
+    name = None
+
+    def __init__(self, params=None, timeout=60):
+        self.params = dict(params or {})
+        self.timeout = timeout
+        self.viewport = (int(self.params.get('viewport_width', 1280)), int(self.params.get('viewport_height', 800)))
+
+    def problem(self):
+        """Why this backend cannot run, or None"""
+        return None
+
+    def capture(self, url):
+        """
+        Capture one page.
+
+        Args:
+            url (str): Page to capture
+
+        Returns:
+            bytes: PNG image
+
+        Raises:
+            CaptureError: The capture failed
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ScreenshotOneBackend(CaptureBackend):
+    """Captures through the ScreenshotOne API, paced by the shared rate limiter"""
+
+    name = 'screenshotone'
+
+    def __init__(self, params=None, timeout=60):
+        super().__init__(params, timeout)
+        self.limiter = shared_limiter()
+        self._local = threading.local()
+
+    def _access_key(self):
+        # Read at capture time; scripts load .env.local after building their engine
+        return os.getenv("SCREENSHOTONE_API_KEY")
+
+    def problem(self):
+        if not self._access_key():
+            return "SCREENSHOTONE_API_KEY not found in .env.local"
+        return None
+
+    def _session(self):
+        """One HTTP session per fetch thread, so connections are reused"""
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def capture(self, url):
+        params = dict(self.params, access_key=self._access_key(), url=url)
+        try:
+            response = self.limiter.call_with_backoff(
+                api_key('screenshotone'),
+                lambda: self._session().get(SCREENSHOT_API_URL, params=params, timeout=self.timeout)
+            )
+        except requests.RequestException as e:
+            raise CaptureError(f"Exception while taking screenshot: {e}")
+        if response.status_code != 200:
+            raise CaptureError(f"HTTP {response.status_code}: {response.text[:200]}",
+                               parse_retry_after(response.headers.get('Retry-After')))
+        return response.content
+
+
+class BrowserPoolBackend(CaptureBackend):
+    """
+    Captures with a pool of warm local headless Chrome instances.
+
+    Each browser is started once and reused for many pages, so a capture
+    costs a page load rather than a browser launch plus an API round trip.
+    A WebDriver session drives one tab at a time, so parallel captures come
+    from `browsers` sessions running side by side; pair it with an engine
+    concurrency of the same size. Browsers are restarted after
+    `pages_per_browser` pages to keep memory in check, and replaced when
+    they crash.
+
+    Args:
+        params (dict): viewport_width/viewport_height set the page viewport
+        timeout (int): Page load timeout in seconds
+        browsers (int): Browser instances kept warm, defaults to env CAPTURE_BROWSERS or 4
+        settle (float): Seconds to wait after load for late content and fonts
+        pages_per_browser (int): Pages captured before a browser is recycled
+        stealth (bool): Use undetected-chromedriver for sites that block automation
+    """
+
+    name = 'browser'
+
+    def __init__(self, params=None, timeout=60, browsers=None, settle=1.5,
+                 pages_per_browser=200, stealth=False):
+        super().__init__(params, timeout)
+        self.browsers = max(1, browsers or default_browsers())
+        self.settle = settle
+        self.pages_per_browser = pages_per_browser
+        self.stealth = stealth
+        self._idle = []
+        self._started = 0
+        self._all = []
+        self._lock = threading.Lock()
+        # Signalled whenever a browser goes idle or a launch slot frees up
+        self._available = threading.Condition(self._lock)
+
+    def problem(self):
+        try:
+            import selenium  # noqa: F401
+            if self.stealth:
+                import undetected_chromedriver  # noqa: F401
+        except ImportError as e:
+            return f"Browser backend needs selenium (pip install -r requirements.txt): {e}"
+        return None
+
+    def _options(self, options):
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--hide-scrollbars')
+        options.add_argument(f'--window-size={self.viewport[0]},{self.viewport[1]}')
+        return options
+
+    def _launch(self):
+        if self.stealth:
+            import undetected_chromedriver as uc
+            driver = uc.Chrome(options=self._options(uc.ChromeOptions()))
+        else:
+            from selenium import webdriver
+            driver = webdriver.Chrome(options=self._options(webdriver.ChromeOptions()))
+        driver.set_page_load_timeout(self.timeout)
+        # Window size includes browser chrome; pin the layout viewport exactly
+        driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {
+            'width': self.viewport[0], 'height': self.viewport[1], 'deviceScaleFactor': 1, 'mobile': False
+        })
+        driver.pages_captured = 0
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def _acquire(self):
+        with self._available:
+            while not self._idle and self._started >= self.browsers:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return self._launch()
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+
+    def _discard(self, driver):
+        with self._available:
+            self._started -= 1
+            if driver in self._all:
+                self._all.remove(driver)
+            # A waiter can now launch a replacement
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def capture(self, url):
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
+        try:
+            driver = self._acquire()
+        except WebDriverException as e:
+            raise CaptureError(f"Could not start browser: {e.msg}")
+
+        try:
+            driver.get(url)
+            deadline = time.monotonic() + self.timeout
+            while driver.execute_script('return document.readyState') != 'complete' and time.monotonic() < deadline:
+                time.sleep(0.1)
+            time.sleep(self.settle)
+            driver.execute_script('window.scrollTo(0, 0)')
+            content = driver.get_screenshot_as_png()
+        except TimeoutException:
+            self._release(driver)
+            raise CaptureError(f"Page load timed out after {self.timeout}s")
+        except WebDriverException as e:
+            # A crashed or wedged browser is replaced rather than reused
+            self._discard(driver)
+            raise CaptureError(f"Browser error: {e.msg}")
+
+        driver.pages_captured += 1
+        self._release(driver)
+        return content
+
+    def _release(self, driver):
+        if driver.pages_captured >= self.pages_per_browser:
+            self._discard(driver)
+            return
+        try:
+            # Leave the tab on a blank page so the next capture starts clean
+            driver.get('about:blank')
+            driver.delete_all_cookies()
+        except Exception:
+            self._discard(driver)
+            return
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def close(self):
+        with self._available:
+            drivers, self._all = self._all, []
+            self._idle = []
+            self._started = 0
+            self._available.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+class StubBackend(CaptureBackend):
+    """
+    Offline backend that draws a PNG from the URL, for tests and dry runs.
+
+    The image is deterministic per URL, so re-captures look unchanged.
+
+    Args:
+        params (dict): viewport_width/viewport_height set the image size
+        timeout (int): Unused
+        delay (float): Seconds each capture takes, to mimic latency
+        fail_every (int): Fail every Nth capture with an HTTP 429-style error, 0 to never fail
+    """
+
+    name = 'stub'
+
+    def __init__(self, params=None, timeout=60, delay=0.0, fail_every=0):
+        super().__init__(params, timeout)
+        self.delay = delay
+        self.fail_every = fail_every
+        self.captures = 0
+        self._lock = threading.Lock()
+
+    def capture(self, url):
+        with self._lock:
+            self.captures += 1
+            count = self.captures
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_every and count % self.fail_every == 0:
+            raise CaptureError("HTTP 429: stub backend throttled this capture", retry_after=1.0)
+
+        digest = hashlib.sha256(url.encode('utf-8')).digest()
+        width, height = self.viewport
+        img = Image.new('RGB', (width, height), tuple(digest[:3]))
+        draw = ImageDraw.Draw(img)
+        # A few blocks in URL-derived spots, so different URLs hash differently
+        for i in range(3, 27, 4):
+            x, y = digest[i] * width // 256, digest[i + 1] * height // 256
+            draw.rectangle([x, y, x + width // 5, y + height // 6], fill=tuple(digest[i + 1:i + 4]))
+        draw.text((20, 20), url, fill=(255, 255, 255))
+        buffer = BytesIO()
+        img.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+BACKENDS = {backend.name: backend for backend in (ScreenshotOneBackend, BrowserPoolBackend, StubBackend)}
+
+
+def get_backend(name=None, **kwargs):
+    """
+    Build a capture backend by name.
+
+    Args:
+        name (str): One of BACKENDS, defaults to env CAPTURE_BACKEND or 'screenshotone'
+        **kwargs: Passed to the backend, e.g. params, timeout, browsers
+
+    Returns:
+        CaptureBackend: The backend
+    """
+    name = (name or default_backend()).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,285 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from capture_backends import CaptureBackend, CaptureError, get_backend
+from screenshot_phash import PerceptualIndex
+from screenshot_store import ScreenshotStore
+
+DEFAULT_CAPTURE_PARAMS = {
+    'viewport_width': 1280,
+    'viewport_height': 800,
+    'format': 'png',
+}
+
+
+# Environment defaults are read when a run starts, not at import: the
+# scripts load .env.local after importing this module
+def default_concurrency():
+    """Captures in flight at once (env CAPTURE_CONCURRENCY); the shared limiter still caps API request rates"""
+    return int(os.getenv("CAPTURE_CONCURRENCY", "4"))
+
+
+def default_variants():
+    """Extra image formats written next to each PNG, e.g. SCREENSHOT_VARIANTS=webp,avif"""
+    return tuple(name for name in os.getenv("SCREENSHOT_VARIANTS", "").split(',') if name.strip())
+
+
+class CaptureJob:
+    """
+    One screenshot to take.
+
+    Args:
+        name (str): Tool name, used for logging
+        url (str): Page to capture
+        filename (str): File name inside the screenshots directory
+        row_index (int): Google Sheets row to update afterwards, or None
+    """
+
+    def __init__(self, name, url, filename=None, row_index=None):
+        self.name = name
+        self.url = url
+        self.filename = filename or f"{name.replace(' ', '_').lower()}.png"
+        self.row_index = row_index
+
+        # Filled in as the job moves through the pipeline
+        self.content = None
+        self.screenshot_path = None
+        self.error = None
+        self.retry_after = None
+        self.bytes_written = 0
+        self.fetch_seconds = 0.0
+        self.encode_seconds = 0.0
+        # Handed to the write-back callable; batched writers confirm the row later
+        self.writeback_queued = False
+        self.unchanged = False
+        self.warnings = []
+
+    @property
+    def ok(self):
+        return self.screenshot_path is not None and self.error is None
+
+
+class CaptureEngine:
+    """
+    Three-stage screenshot pipeline: fetch -> store -> Sheets write-back.
+
+    Fetches run on a thread pool of `concurrency` workers against a capture
+    backend (see capture_backends): the ScreenshotOne API, paced by the
+    shared rate limiter, a pool of local headless browsers, or an offline
+    stub. The store stage writes the API's PNG bytes straight to disk;
+    optional PNG optimization and WebP/AVIF variants run in the store's
+    worker processes. Write-back runs on a single worker so Sheets updates
+    stay ordered and within quota.
+
+    With `dedupe` on, each capture is compared against a perceptual-hash
+    index of the screenshots directory first: near-identical captures skip
+    the write, blank captures never replace an existing screenshot, and
+    captures that match another tool's screenshot are flagged.
+
+    Args:
+        screenshots_dir (str): Directory the PNG files are written to
+        concurrency (int): Number of captures in flight at once, defaults to env CAPTURE_CONCURRENCY or 4
+        encode_workers (int): Threads used for writing images to disk
+        writeback (callable): Called as writeback(job) for successful jobs with a row_index
+        on_result (callable): Called as on_result(job) on the run's thread as each job finishes
+        extra_params (dict): Additional capture parameters, e.g. ScreenshotOne options
+        backend (str|CaptureBackend): Backend name or instance, defaults to env CAPTURE_BACKEND
+        optimize (bool): Losslessly re-compress saved PNGs in a worker process
+        variants (tuple): Extra formats to emit next to each PNG, e.g. ('webp', 'avif'); defaults to env SCREENSHOT_VARIANTS
+        dedupe (bool): Check captures against the perceptual-hash index before writing
+        timeout (int): Per-capture timeout in seconds
+    """
+
+    def __init__(self, screenshots_dir, concurrency=None, encode_workers=2,
+                 writeback=None, on_result=None, extra_params=None, backend=None, optimize=False,
+                 variants=None, dedupe=True, timeout=60):
+        self.screenshots_dir = screenshots_dir
+        self._concurrency = concurrency
+        self.encode_workers = max(1, encode_workers)
+        self.writeback = writeback
+        self.on_result = on_result
+        self.params = dict(DEFAULT_CAPTURE_PARAMS, **(extra_params or {}))
+        self.backend = backend
+        self.optimize = optimize
+        self._variants = variants
+        self.dedupe = dedupe
+        self.index = None
+        self.timeout = timeout
+
+    @property
+    def concurrency(self):
+        return max(1, self._concurrency or default_concurrency())
+
+    @property
+    def variants(self):
+        return default_variants() if self._variants is None else self._variants
+
+    def fetch(self, job, backend):
+        """Stage 1: capture the page with the backend"""
+        started = time.monotonic()
+        try:
+            job.content = backend.capture(job.url)
+        except CaptureError as e:
+            job.error = str(e)
+            job.retry_after = e.retry_after
+        except Exception as e:
+            job.error = f"Exception while taking screenshot: {e}"
+        job.fetch_seconds = time.monotonic() - started
+        return job
+
+    def check(self, job):
+        """Compare a capture with the index; returns the hashes to record, or None to skip the write"""
+        try:
+            result = self.index.check_capture(job.filename, job.content)
+        except Exception as e:
+            # An undecodable capture must not overwrite the screenshot we have
+            job.error = f"Could not decode capture; kept the existing screenshot: {e}"
+            return None
+
+        if result['blank']:
+            if result['distance'] is not None:
+                job.error = "Capture looks blank; kept the existing screenshot"
+                return None
+            job.warnings.append("capture looks mostly blank")
+        if result['duplicates']:
+            job.warnings.append(f"looks identical to {', '.join(result['duplicates'][:3])}")
+        if result['unchanged']:
+            job.unchanged = True
+            job.screenshot_path = f"/screenshots/{job.filename}"
+            return None
+        return result['hashes']
+
+    def encode(self, job):
+        """Stage 2: write the image bytes to disk; transforms are queued on the store's processes"""
+        started = time.monotonic()
+        try:
+            hashes = self.check(job) if self.index else {}
+            if hashes is not None:
+                save_path = self.store.save(job.filename, job.content)
+                job.bytes_written = os.path.getsize(save_path)
+                job.screenshot_path = f"/screenshots/{job.filename}"
+                if hashes:
+                    self.index.record(job.filename, hashes)
+        except Exception as e:
+            job.error = f"Failed to save image: {e}"
+        job.content = None
+        job.encode_seconds = time.monotonic() - started
+        return job
+
+    def write_back(self, job):
+        """Stage 3: hand the screenshot path to the Google Sheets writer"""
+        try:
+            self.writeback(job)
+            job.writeback_queued = True
+        except Exception as e:
+            print(f"❌ Error updating Google Sheet for {job.name}: {e}")
+        return job
+
+    def run(self, jobs):
+        """
+        Capture every job and return them with their results filled in.
+
+        Args:
+            jobs (list): CaptureJob instances
+
+        Returns:
+            list: The same jobs, with screenshot_path or error set
+        """
+        # A backend passed in stays open for the caller to reuse; one built here is closed after the run
+        backend = self.backend
+        owned = not isinstance(backend, CaptureBackend)
+        if owned:
+            backend = get_backend(backend, params=self.params, timeout=self.timeout)
+        self.backend_name = backend.name
+        self.store = None
+        self.index = None
+        started = time.monotonic()
+
+        try:
+            problem = backend.problem()
+            if problem:
+                print(f"ERROR: {problem}")
+                return jobs
+
+            os.makedirs(self.screenshots_dir, exist_ok=True)
+            self.store = ScreenshotStore(self.screenshots_dir, variants=self.variants, optimize_png=self.optimize)
+            self.index = PerceptualIndex(self.screenshots_dir) if self.dedupe else None
+            jobs = [job for job in jobs if job.url and job.url.strip()]
+            total = len(jobs)
+            finished = 0
+
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix='capture-fetch') as fetch_pool, \
+                    ThreadPoolExecutor(self.encode_workers, thread_name_prefix='capture-encode') as encode_pool, \
+                    ThreadPoolExecutor(1, thread_name_prefix='capture-writeback') as writeback_pool:
+
+                pending = {fetch_pool.submit(self.fetch, job, backend): 'fetch' for job in jobs}
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = pending.pop(future)
+                        job = future.result()
+
+                        if stage == 'fetch' and job.error is None:
+                            pending[encode_pool.submit(self.encode, job)] = 'encode'
+                            continue
+                        if stage == 'encode' and job.ok and self.writeback and job.row_index:
+                            pending[writeback_pool.submit(self.write_back, job)] = 'writeback'
+
+                        if stage != 'writeback':
+                            finished += 1
+                            if self.on_result:
+                                self.on_result(job)
+                            self._print_progress(finished, total, job, time.monotonic() - started)
+        finally:
+            # Also on errors: keep the hashes of captures already written and stop the worker processes
+            if self.index:
+                self.index.save()
+            if self.store is not None:
+                self.store.close()
+            if owned:
+                backend.close()
+        self.print_summary(jobs, time.monotonic() - started)
+        return jobs
+
+    def _print_progress(self, finished, total, job, elapsed):
+        rate = finished / elapsed * 60 if elapsed > 0 else 0.0
+        if job.unchanged:
+            print(f"[{finished}/{total}] 💤 {job.name}: unchanged, kept {job.screenshot_path} - {rate:.1f}/min")
+        elif job.ok:
+            print(f"[{finished}/{total}] 🖼️ {job.name}: {job.screenshot_path} "
+                  f"({job.bytes_written // 1024}KB, fetch {job.fetch_seconds:.1f}s) - {rate:.1f}/min")
+        else:
+            print(f"[{finished}/{total}] ❌ {job.name}: {job.error}")
+        for warning in job.warnings:
+            print(f"    ⚠️ {job.name}: {warning}")
+
+    def print_summary(self, jobs, elapsed):
+        """Print the per-run throughput summary"""
+        succeeded = [job for job in jobs if job.ok]
+        failed = [job for job in jobs if not job.ok]
+        fetch_times = [job.fetch_seconds for job in jobs if job.fetch_seconds]
+        encode_times = [job.encode_seconds for job in succeeded]
+
+        print("\n" + "=" * 50)
+        print("CAPTURE SUMMARY")
+        print("=" * 50)
+        print(f"Captured: {len(succeeded)}/{len(jobs)} ({len(failed)} failed)")
+        print(f"Wall time: {elapsed:.1f}s with {self.concurrency} concurrent captures ({self.backend_name})")
+        if elapsed > 0:
+            print(f"Throughput: {len(succeeded) / elapsed * 60:.1f} screenshots/min")
+        if fetch_times:
+            print(f"Average fetch: {sum(fetch_times) / len(fetch_times):.1f}s")
+        if encode_times:
+            print(f"Average save: {sum(encode_times) / len(encode_times):.3f}s")
+        print(f"Written: {sum(job.bytes_written for job in succeeded) // 1024}KB ({self.store.summary()})")
+        if self.index:
+            print(f"Unchanged (write skipped): {sum(job.unchanged for job in jobs)}")
+            flagged = [job for job in jobs if job.warnings]
+            if flagged:
+                print(f"Flagged for review: {', '.join(job.name for job in flagged)}")
+        if self.writeback:
+            print(f"Sheets updates queued: {sum(job.writeback_queued for job in jobs)}")
+        if failed:
+            print(f"Failed: {', '.join(job.name for job in failed)}")
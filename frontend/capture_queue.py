@@ -0,0 +1,250 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+from capture_engine import CaptureJob
+
+QUEUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "capture-queue.sqlite3")
+
+# Retry schedule for failed captures: BASE_DELAY * 2^(attempts - 1), capped, with jitter
+BASE_DELAY = 60
+MAX_DELAY = 6 * 60 * 60
+MAX_ATTEMPTS = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    filename        TEXT PRIMARY KEY,
+    name            TEXT NOT NULL,
+    url             TEXT NOT NULL,
+    row_index       INTEGER,
+    priority        INTEGER NOT NULL DEFAULT 3,
+    state           TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    next_eligible   REAL NOT NULL DEFAULT 0,
+    screenshot_path TEXT,
+    needs_writeback INTEGER NOT NULL DEFAULT 0,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_eligible ON jobs (state, priority, next_eligible);
+"""
+
+# pending -> running -> done, or -> failed (retried after a backoff) -> ... -> dead
+STATES = ('pending', 'running', 'failed', 'done', 'dead')
+
+
+def retry_delay(attempts, retry_after=None):
+    """
+    Seconds to wait before the next attempt of a job that has failed `attempts` times.
+
+    Args:
+        attempts (int): Failed attempts so far, including the one just made
+        retry_after (float): Server-requested delay, used as a floor
+    """
+    delay = min(MAX_DELAY, BASE_DELAY * 2 ** (attempts - 1))
+    delay *= random.uniform(0.8, 1.2)
+    return max(delay, retry_after or 0)
+
+
+class CaptureQueue:
+    """
+    Persistent screenshot job queue backed by SQLite.
+
+    Each tool (keyed by screenshot filename) carries its capture state,
+    attempt count, last error and next-eligible time. Every state change
+    is committed at once, so a crashed or interrupted run resumes where it
+    stopped: finished captures are not repeated, failed ones wait out their
+    backoff, and captures whose Sheets write-back never landed are replayed.
+
+    Args:
+        path (str): SQLite database file
+        max_attempts (int): Failed attempts before a job is marked dead
+    """
+
+    def __init__(self, path=QUEUE_PATH, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        # Jobs left running by a crashed run go back in line without counting as a failure
+        with self.db:
+            self.db.execute("UPDATE jobs SET state = 'pending' WHERE state = 'running'")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, name, url, row_index=None, priority=3, filename=None):
+        """
+        Add a tool to the queue, or refresh its URL, row and priority.
+
+        A job that is done and fully written back is re-opened, since being
+        asked for again means its screenshot went missing. Failed jobs keep
+        their backoff and dead jobs stay dead (see `retry_dead`).
+
+        Args:
+            name (str): Tool name
+            url (str): Page to capture
+            row_index (int): Google Sheets row for the write-back
+            priority (int): 1 (highest) to 3 (lowest)
+            filename (str): Screenshot file name, derived from the name if omitted
+        """
+        filename = filename or CaptureJob(name, url).filename
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                """
+                INSERT INTO jobs (filename, name, url, row_index, priority, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (filename) DO UPDATE SET
+                    name = excluded.name,
+                    url = excluded.url,
+                    row_index = COALESCE(excluded.row_index, row_index),
+                    priority = excluded.priority,
+                    updated_at = excluded.updated_at,
+                    state = CASE WHEN state = 'done' AND needs_writeback = 0 THEN 'pending' ELSE state END,
+                    attempts = CASE WHEN state = 'done' AND needs_writeback = 0 THEN 0 ELSE attempts END
+                """,
+                (filename, name, url, row_index, priority, now, now)
+            )
+
+    def claim(self, limit=None, only=None, now=None):
+        """
+        Take the jobs that are eligible now, highest priority first, and mark them running.
+
+        Args:
+            limit (int): Maximum number of jobs, or None for all
+            only (set): Restrict to these filenames, e.g. the tools still missing screenshots
+            now (float): Current time, for tests
+
+        Returns:
+            list: CaptureJob instances
+        """
+        now = time.time() if now is None else now
+        with self.db:
+            rows = self.db.execute(
+                """
+                SELECT * FROM jobs
+                WHERE state IN ('pending', 'failed') AND next_eligible <= ?
+                ORDER BY priority, next_eligible, created_at
+                """,
+                (now,)
+            ).fetchall()
+            if only is not None:
+                rows = [row for row in rows if row['filename'] in only]
+            rows = rows[:limit]
+            self.db.executemany(
+                "UPDATE jobs SET state = 'running', updated_at = ? WHERE filename = ?",
+                [(now, row['filename']) for row in rows]
+            )
+        return [CaptureJob(row['name'], row['url'], row['filename'], row['row_index']) for row in rows]
+
+    def record(self, job):
+        """Store the outcome of a finished CaptureJob"""
+        now = time.time()
+        with self.db:
+            if job.ok:
+                self.db.execute(
+                    """
+                    UPDATE jobs SET state = 'done', last_error = NULL, screenshot_path = ?,
+                        needs_writeback = ?, updated_at = ?
+                    WHERE filename = ?
+                    """,
+                    (job.screenshot_path, 1 if job.row_index else 0, now, job.filename)
+                )
+                return
+
+            attempts = self.db.execute(
+                "SELECT attempts FROM jobs WHERE filename = ?", (job.filename,)
+            ).fetchone()['attempts'] + 1
+            state = 'dead' if attempts >= self.max_attempts else 'failed'
+            self.db.execute(
+                """
+                UPDATE jobs SET state = ?, attempts = ?, last_error = ?, next_eligible = ?, updated_at = ?
+                WHERE filename = ?
+                """,
+                (state, attempts, job.error, now + retry_delay(attempts, job.retry_after), now, job.filename)
+            )
+
+    def state(self, filename):
+        """Current state of a job, or None if it was never queued"""
+        row = self.db.execute("SELECT state FROM jobs WHERE filename = ?", (filename,)).fetchone()
+        return row['state'] if row else None
+
+    def pending_writebacks(self):
+        """Captured jobs whose Sheets write-back has not been confirmed, as (row_index, screenshot_path)"""
+        rows = self.db.execute(
+            "SELECT row_index, screenshot_path FROM jobs WHERE state = 'done' AND needs_writeback = 1"
+        ).fetchall()
+        return [(row['row_index'], row['screenshot_path']) for row in rows]
+
+    def confirm_writebacks(self, row_indexes):
+        """Mark write-backs for these sheet rows as landed"""
+        with self.db:
+            self.db.executemany(
+                "UPDATE jobs SET needs_writeback = 0 WHERE needs_writeback = 1 AND row_index = ?",
+                [(row_index,) for row_index in row_indexes]
+            )
+
+    def retry_dead(self):
+        """Give dead jobs a fresh set of attempts; returns how many were revived"""
+        with self.db:
+            cursor = self.db.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, next_eligible = 0 WHERE state = 'dead'"
+            )
+        return cursor.rowcount
+
+    def counts(self):
+        """Jobs per state, plus how many failed ones are waiting out their backoff"""
+        counts = {state: 0 for state in STATES}
+        for row in self.db.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row['state']] = row['n']
+        counts['waiting'] = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = 'failed' AND next_eligible > ?", (time.time(),)
+        ).fetchone()[0]
+        return counts
+
+    def rows(self, states=None):
+        query = "SELECT * FROM jobs"
+        params = ()
+        if states:
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+            params = tuple(states)
+        return self.db.execute(query + " ORDER BY state, priority, name", params).fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Inspect or reset the persistent screenshot job queue')
+    parser.add_argument('--db', default=QUEUE_PATH, help='Queue database file')
+    parser.add_argument('--list', nargs='*', metavar='STATE', help='List jobs, optionally only in these states')
+    parser.add_argument('--retry-dead', action='store_true', help='Re-queue jobs that ran out of attempts')
+    args = parser.parse_args()
+
+    with CaptureQueue(args.db) as queue:
+        if args.retry_dead:
+            print(f"🔄 Re-queued {queue.retry_dead()} dead jobs")
+
+        if args.list is not None:
+            now = time.time()
+            for row in queue.rows(args.list):
+                line = f"{row['state']:<8} {row['name']} (attempts {row['attempts']})"
+                if row['state'] == 'failed' and row['next_eligible'] > now:
+                    line += f", retry in {(row['next_eligible'] - now) / 60:.0f}min"
+                if row['last_error']:
+                    line += f" - {row['last_error'][:100]}"
+                print(line)
+
+        counts = queue.counts()
+        print(f"Queue: {counts['pending']} pending, {counts['failed']} failed ({counts['waiting']} backing off), "
+              f"{counts['done']} done, {counts['dead']} dead")
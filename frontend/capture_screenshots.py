@@ -1,12 +1,13 @@
-import requests
+import argparse
 import os
-import urllib.parse
-import time
-from PIL import Image
-from io import BytesIO
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+
+from capture_backends import BACKENDS
+from capture_engine import CaptureEngine
+from capture_queue import CaptureQueue
+from sheet_snapshot import load_sheet_snapshot
+from sheets_client import get_sheets_service
+from sheets_writeback import SheetsWriteBuffer
 
 # Load environment variables
 load_dotenv('.env.local')
@@ -50,38 +51,6 @@ SECTORS = [
 ]
 
 
-def get_sheets_service():
-    """
-    Create and return a Google Sheets service object using credentials from env variables
-    """
-    # Get credentials from environment variables
-    account_email = os.getenv("GOOGLE_SERVICE_ACCOUNT_EMAIL")
-    private_key = os.getenv("GOOGLE_PRIVATE_KEY").replace("\\n", "\n")  # Replace literal '\n' with newline
-
-    # Create credentials
-    credentials_dict = {
-        "type": "service_account",
-        "project_id": "sports-innovation-lab-ai",
-        "private_key_id": "key-id",
-        "private_key": private_key,
-        "client_email": account_email,
-        "client_id": "client-id",
-        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-        "token_uri": "https://oauth2.googleapis.com/token",
-        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-        "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{urllib.parse.quote(account_email)}"
-    }
-
-    credentials = service_account.Credentials.from_service_account_info(
-        credentials_dict,
-        scopes=['https://www.googleapis.com/auth/spreadsheets']
-    )
-
-    # Build and return the service
-    service = build('sheets', 'v4', credentials=credentials)
-    return service
-
-
 def screenshot_exists(tool_name):
     """
     Check if a screenshot exists for a given tool name.
@@ -100,23 +69,21 @@ def screenshot_exists(tool_name):
     return os.path.exists(file_path) and os.path.getsize(file_path) > 0
 
 
-def get_tools_without_screenshots():
+def get_tools_without_screenshots(service=None):
     """
     Retrieve tools from Google Sheets that do not have existing screenshots.
 
+    Args:
+        service: Google Sheets service, the shared one if omitted
+
     Returns:
         list: Tools without screenshots [(name, url, row_index, priority)]
     """
-    service = get_sheets_service()
+    service = service or get_sheets_service()
     sheet_id = os.getenv("SHEET_ID")
 
-    # Get all tools from the Sheet1 tab
-    result = service.spreadsheets().values().get(
-        spreadsheetId=sheet_id,
-        range='Sheet1!A2:H'  # Assuming headers are in row 1
-    ).execute()
-
-    rows = result.get('values', [])
+    # Get all tools from the Sheet1 tab (headers are in row 1)
+    rows = load_sheet_snapshot(service, sheet_id).rows
 
     # Process rows into tools with their URLs
     # Assuming columns are: A:id, B:name, C:source_url, D:description, E:screenshot_url, F:category, G:type, H:sector
@@ -165,94 +132,17 @@ def get_tools_without_screenshots():
     return all_tools
 
 
-def save_screenshot(url, name):
-    """
-    Save a screenshot for a given tool.
-
-    Args:
-        url (str): URL of the tool
-        name (str): Name of the tool
-
-    Returns:
-        str or None: Path to saved screenshot, or None if failed
+def process_all_screenshots(concurrency=None, limit=None, backend=None):
     """
-    try:
-        filename = f"{name.replace(' ', '_').lower()}.png"
-        save_path = os.path.join(SCREENSHOTS_DIR, filename)
+    Process screenshots for all tools that need them.
 
-        if not url or url.strip() == "":
-            print(f"No URL provided for {name}, skipping...")
-            return None
-
-        api_key = os.getenv("SCREENSHOTONE_API_KEY")
-        if not api_key:
-            print("ERROR: SCREENSHOTONE_API_KEY not found in .env.local")
-            return None
-
-        screenshot_url = f"https://api.screenshotone.com/take?access_key={api_key}&url={url}&viewport_width=1280&viewport_height=800&format=png"
-
-        print(f"Requesting screenshot from: {url}")
-        response = requests.get(screenshot_url)
-
-        print(f"Response status: {response.status_code}")
-
-        if response.status_code == 200:
-            print(f"Successfully got image, size: {len(response.content)} bytes")
-            img = Image.open(BytesIO(response.content))
-            print(f"Image size: {img.size}")
-
-            # Ensure screenshots directory exists
-            if not os.path.exists(SCREENSHOTS_DIR):
-                print(f"Creating screenshots directory: {SCREENSHOTS_DIR}")
-                os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-
-            img.save(save_path)
-            print(f"Saved image to: {save_path}")
-
-            # Verify the file was saved
-            if os.path.exists(save_path):
-                print(f"✅ Confirmed file exists at: {save_path}")
-                return f"/screenshots/{filename}"
-            else:
-                print(f"❌ Failed to save file to: {save_path}")
-                return None
-        else:
-            print(f"Error taking screenshot: HTTP {response.status_code}")
-            if response.status_code == 429:
-                print("Rate limit hit - you may need to wait before trying more screenshots")
-            print(f"Response content: {response.text[:200]}...")  # Show first 200 chars of error
-            return None
-    except Exception as e:
-        print(f"Exception while taking screenshot: {e}")
-        return None
-
-
-def update_screenshot_url_in_sheets(service, sheet_id, row_index, screenshot_url):
-    """
-    Update the screenshot URL for a tool in Google Sheets.
+    Progress is kept in the persistent capture queue, so an interrupted run
+    picks up where it stopped and failed captures are retried with backoff.
 
     Args:
-        service: Google Sheets service
-        sheet_id: ID of the spreadsheet
-        row_index: Row index (1-based) to update
-        screenshot_url: Path to the screenshot
-    """
-    try:
-        # Update the screenshot URL in column E
-        service.spreadsheets().values().update(
-            spreadsheetId=sheet_id,
-            range=f'Sheet1!E{row_index}',
-            valueInputOption='RAW',
-            body={'values': [[screenshot_url]]}
-        ).execute()
-        print(f"✅ Updated screenshot URL in Google Sheets for row {row_index}")
-    except Exception as e:
-        print(f"❌ Error updating Google Sheet: {e}")
-
-
-def process_all_screenshots():
-    """
-    Process screenshots for all tools that need them.
+        concurrency (int): Number of screenshots captured at once, defaults to env CAPTURE_CONCURRENCY
+        limit (int): Maximum number of captures this run, or None for all eligible
+        backend (str): Capture backend name, see capture_backends.BACKENDS
     """
     print("=" * 50)
     print("STARTING FULL SCREENSHOT GENERATOR")
@@ -268,46 +158,70 @@ def process_all_screenshots():
     else:
         print(f"Screenshots directory already exists at: {SCREENSHOTS_DIR}")
 
+    # Setup Google Sheets service, shared by the sheet read and the updates
+    service = get_sheets_service()
+    sheet_id = os.getenv("SHEET_ID")
+
     # Get all tools that need screenshots
-    tools_to_process = get_tools_without_screenshots()
+    tools_to_process = get_tools_without_screenshots(service)
 
     print(f"\nFound {len(tools_to_process)} tools that need screenshots")
 
-    # Setup Google Sheets service for updates
-    service = get_sheets_service()
-    sheet_id = os.getenv("SHEET_ID")
-
     if not sheet_id:
         print("ERROR: SHEET_ID not found in .env.local")
         return
 
-    # Process screenshots with rate limiting
-    for i, (name, url, row_index, priority) in enumerate(tools_to_process):
-        print("\n" + "-" * 50)
-        print(f"Processing tool {i + 1}/{len(tools_to_process)}: {name} (Priority: {priority})")
-        print(f"URL: {url}")
-        print(f"Row index: {row_index}")
-
-        # Take the screenshot
-        screenshot_path = save_screenshot(url, name)
-
-        if screenshot_path:
-            print(f"🖼️ Saved Screenshot: {screenshot_path}")
-            # Update the screenshot URL in Google Sheets
-            update_screenshot_url_in_sheets(service, sheet_id, row_index, screenshot_path)
-        else:
-            print(f"❌ Failed to generate screenshot for {name}")
-
-        # Rate limiting to avoid overloading the screenshot API
-        if i < len(tools_to_process) - 1:  # Don't sleep after the last item
-            sleep_time = 2  # 2 seconds between requests
-            print(f"Waiting {sleep_time} seconds before next screenshot...")
-            time.sleep(sleep_time)
+    with CaptureQueue() as queue:
+        for name, url, row_index, priority in tools_to_process:
+            queue.enqueue(name, url, row_index=row_index, priority=priority)
+
+        # Only tools still missing screenshots that are not done or backing off after a failure
+        jobs = queue.claim(limit, only={f"{name.replace(' ', '_').lower()}.png" for name, *_ in tools_to_process})
+        counts = queue.counts()
+        print(f"Capture queue: {len(jobs)} eligible now, {counts['waiting']} backing off, {counts['dead']} dead")
+        for job in jobs:
+            print(f"Queued: {job.name} (row {job.row_index}) - {job.url}")
+
+        # Screenshot URLs go to column E in batched writes rather than one request per row
+        with SheetsWriteBuffer(service, sheet_id) as sheet_writes:
+            # Captures from an earlier run whose write-back never landed
+            replayed = queue.pending_writebacks()
+            for row_index, screenshot_path in replayed:
+                sheet_writes.add(row_index, screenshot_path)
+            if replayed:
+                print(f"Replaying {len(replayed)} Google Sheets updates from an interrupted run")
+
+            # Capture concurrently; the shared limiter paces calls to the screenshot API
+            engine = CaptureEngine(
+                SCREENSHOTS_DIR,
+                concurrency=concurrency,
+                writeback=lambda job: sheet_writes.add(job.row_index, job.screenshot_path),
+                on_result=queue.record,
+                backend=backend
+            )
+            engine.run(jobs)
+            sheet_writes.flush()
+
+            # Queued rows only count as written once the flush did not report them failed
+            queued = [row_index for row_index, _ in replayed] + [job.row_index for job in jobs if job.writeback_queued]
+            queue.confirm_writebacks([row_index for row_index in queued if row_index not in sheet_writes.failed])
+
+        counts = queue.counts()
 
     print("\n" + "=" * 50)
-    print(f"COMPLETED PROCESSING {len(tools_to_process)} TOOLS")
+    print(f"COMPLETED PROCESSING {len(jobs)} TOOLS")
+    print(f"Queue: {counts['failed']} failed ({counts['waiting']} backing off), {counts['dead']} dead "
+          f"- re-run to resume, or see python capture_queue.py --list")
     print("=" * 50)
 
 
 if __name__ == "__main__":
-    process_all_screenshots()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Capture screenshots for tools missing them')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Number of screenshots captured at once (default: CAPTURE_CONCURRENCY or 4)')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum number of captures this run')
+    parser.add_argument('--backend', default=None, choices=sorted(BACKENDS),
+                        help='Capture backend (default: CAPTURE_BACKEND or screenshotone)')
+    args = parser.parse_args()
+
+    process_all_screenshots(concurrency=args.concurrency, limit=args.limit, backend=args.backend)
\ No newline at end of file
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+# Shared helpers live alongside the audit scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'audits'))
+from tool_data import load_tool_data
+
+TOOL_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "app", "utils", "toolData.js")
+
+HEADER = ['id', 'name', 'source_url', 'short_description', 'screenshot_url', 'category', 'type', 'sector']
+
+A1_PATTERN = re.compile(r'^(?:(?P<sheet>[^!]+)!)?(?P<c1>[A-Z]+)?(?P<r1>\d+)?(?::(?P<c2>[A-Z]+)?(?P<r2>\d+)?)?$')
+
+
+def column_index(letters):
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+class FakeSpreadsheet:
+    """
+    In-memory single-tab spreadsheet with a Drive-style version counter.
+
+    Args:
+        rows (list): Rows including the header row
+    """
+
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+        self.version = 1
+        self.lock = threading.Lock()
+
+    def _bounds(self, cell_range):
+        match = A1_PATTERN.match(cell_range)
+        if not match:
+            raise ValueError(f"Unable to parse range: {cell_range}")
+        c1 = column_index(match['c1']) if match['c1'] else 0
+        r1 = int(match['r1']) - 1 if match['r1'] else 0
+        has_end = ':' in cell_range
+        c2 = column_index(match['c2']) if match['c2'] else (c1 if not has_end and match['c1'] else None)
+        r2 = int(match['r2']) - 1 if match['r2'] else (r1 if not has_end and match['r1'] else None)
+        return r1, c1, r2, c2
+
+    def read(self, cell_range):
+        with self.lock:
+            r1, c1, r2, c2 = self._bounds(cell_range)
+            rows = []
+            for row in self.rows[r1:None if r2 is None else r2 + 1]:
+                values = row[c1:None if c2 is None else c2 + 1]
+                while values and values[-1] == '':
+                    values.pop()
+                rows.append(values)
+            while rows and not rows[-1]:
+                rows.pop()
+            return rows
+
+    def write(self, cell_range, values):
+        with self.lock:
+            r1, c1, _, _ = self._bounds(cell_range)
+            for dr, row_values in enumerate(values):
+                while len(self.rows) <= r1 + dr:
+                    self.rows.append([])
+                row = self.rows[r1 + dr]
+                for dc, value in enumerate(row_values):
+                    while len(row) <= c1 + dc:
+                        row.append('')
+                    row[c1 + dc] = value
+            return sum(len(row_values) for row_values in values)
+
+    def bump_version(self):
+        """One version per write request, like Drive"""
+        with self.lock:
+            self.version += 1
+
+
+class FakeSheetsHandler(BaseHTTPRequestHandler):
+    """Implements the Sheets values.get/update/batchUpdate and Drive files.get calls the scripts use"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _throttled(self, method):
+        self.server.calls[method] += 1
+        if random.random() < self.server.fail_rate:
+            self.server.calls['throttled'] += 1
+            self._send(429, {'error': {'code': 429, 'message': 'Quota exceeded', 'status': 'RESOURCE_EXHAUSTED'}})
+            return True
+        return False
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        sheet = self.server.sheet
+
+        match = re.match(r'^/drive/v3/files/([^/]+)$', path)
+        if match:
+            if not self._throttled('drive.files.get'):
+                self._send(200, {'version': str(sheet.version)})
+            return
+
+        match = re.match(r'^/v4/spreadsheets/([^/]+)/values/(.+)$', path)
+        if match:
+            if self._throttled('values.get'):
+                return
+            cell_range = unquote(match.group(2))
+            self._send(200, {'range': cell_range, 'majorDimension': 'ROWS', 'values': sheet.read(cell_range)})
+            return
+
+        self._send(404, {'error': {'code': 404, 'message': f'Unknown path {path}'}})
+
+    def do_PUT(self):
+        path = urlparse(self.path).path
+        match = re.match(r'^/v4/spreadsheets/([^/]+)/values/(.+)$', path)
+        if not match:
+            self._send(404, {'error': {'code': 404, 'message': f'Unknown path {path}'}})
+            return
+        body = self._body()
+        if self._throttled('values.update'):
+            return
+        cell_range = unquote(match.group(2))
+        updated = self.server.sheet.write(cell_range, body.get('values', []))
+        self.server.sheet.bump_version()
+        self._send(200, {'updatedRange': cell_range, 'updatedCells': updated})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if not re.match(r'^/v4/spreadsheets/([^/]+)/values:batchUpdate$', path):
+            self._send(404, {'error': {'code': 404, 'message': f'Unknown path {path}'}})
+            return
+        body = self._body()
+        if self._throttled('values.batchUpdate'):
+            return
+        updated = sum(self.server.sheet.write(item['range'], item.get('values', [])) for item in body.get('data', []))
+        self.server.sheet.bump_version()
+        self.server.calls['cells_written'] += updated
+        self._send(200, {'totalUpdatedCells': updated, 'responses': []})
+
+
+def tool_rows(path=TOOL_DATA_PATH):
+    """Sheet rows (header first) built from toolData.js, matching the real sheet's column layout"""
+    rows = [HEADER]
+    for tool in load_tool_data(path).tools:
+        rows.append([str(tool.get(field) or '') for field in HEADER])
+    return rows
+
+
+def start_server(rows=None, port=0, fail_rate=0.0):
+    """
+    Start the fake server on a background thread.
+
+    Args:
+        rows (list): Sheet rows including the header; defaults to toolData.js
+        port (int): Port to bind on 127.0.0.1, 0 for any free port
+        fail_rate (float): Fraction of requests answered with 429
+
+    Returns:
+        ThreadingHTTPServer: Running server; its `sheet` and `calls` attributes expose state
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeSheetsHandler)
+    server.sheet = FakeSpreadsheet(rows if rows is not None else tool_rows())
+    server.calls = Counter()
+    server.fail_rate = fail_rate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local fake of the Sheets/Drive endpoints used by the screenshot scripts')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    server = start_server(port=args.port, fail_rate=args.fail_rate)
+    print(f"Fake Sheets server with {len(server.sheet.rows) - 1} tools on http://127.0.0.1:{args.port}/")
+    print(f"Run the scripts with SHEETS_API_ENDPOINT=http://127.0.0.1:{args.port}/ and any SHEET_ID")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\nCalls: {dict(server.calls)}")
@@ -0,0 +1,371 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from html import unescape
+
+import requests
+from dotenv import load_dotenv
+
+# Shared helpers live alongside the audit scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'audits'))
+from rate_limiter import host_key, shared_limiter
+from tool_data import load_tool_data
+from url_cache import DEFAULT_CACHE_PATH, UrlCache
+from url_health import USER_AGENT
+
+from capture_backends import BACKENDS
+from capture_engine import CaptureEngine
+from capture_queue import CaptureQueue
+
+load_dotenv('.env.local')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOTS_DIR = os.path.join(current_dir, "public", "screenshots")
+TOOL_DATA_PATH = os.path.join(current_dir, "src", "app", "utils", "toolData.js")
+SIGNALS_PATH = os.path.join(current_dir, ".cache", "refresh-signals.sqlite3")
+
+# Paid captures the scheduler may queue per UTC day
+DAILY_BUDGET = int(os.getenv("SCREENSHOT_DAILY_BUDGET", "25"))
+
+# Screenshots older than this are refreshed even if nothing else changed
+MAX_SCREENSHOT_AGE_DAYS = 90
+
+# Pages are re-checked at most this often; checks are free but not instant
+CHECK_INTERVAL_HOURS = 20
+
+# Only the start of a page is hashed; enough to see a redesign
+MAX_HTML_BYTES = 512 * 1024
+
+# Why a tool is due, most urgent first; also its capture queue priority
+REASONS = {
+    'missing': 1,
+    'redirect changed': 1,
+    'content changed': 2,
+    'stale': 3,
+}
+
+STRIP_BLOCKS = re.compile(r'<(script|style|noscript|svg|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+STRIP_TAGS = re.compile(r'<[^>]+>')
+TITLE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    filename        TEXT PRIMARY KEY,
+    url             TEXT NOT NULL,
+    etag            TEXT,
+    last_modified   TEXT,
+    content_hash    TEXT,
+    redirect_target TEXT,
+    checked_at      REAL NOT NULL DEFAULT 0,
+    scheduled_at    REAL
+);
+CREATE TABLE IF NOT EXISTS budget (
+    day  TEXT PRIMARY KEY,
+    used INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def content_fingerprint(html):
+    """
+    Hash of a page's title and visible text.
+
+    Scripts, styles and markup are dropped first, so nonces, build hashes
+    and analytics snippets that change on every request do not count as
+    a change; copy and layout text do.
+
+    Args:
+        html (str): Page source
+
+    Returns:
+        str: Hex digest
+    """
+    title = TITLE.search(html)
+    text = STRIP_TAGS.sub(' ', STRIP_BLOCKS.sub(' ', html))
+    text = ' '.join(unescape(text).split())
+    return hashlib.sha256(f"{title.group(1).strip() if title else ''}\n{text}".encode('utf-8')).hexdigest()
+
+
+def today():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class RefreshScheduler:
+    """
+    Decides which tool screenshots need re-capturing and queues them within a daily budget.
+
+    Signals, cheapest first:
+        - the screenshot file is missing
+        - the redirect target recorded by the URL audit (audits/.cache) moved
+        - the page's ETag/Last-Modified changed and its visible-text hash did too
+        - the screenshot is older than `max_age_days`
+
+    The first time a page is seen its signals are only recorded, so adopting
+    the scheduler does not re-capture the whole catalog at once.
+
+    Args:
+        screenshots_dir (str): Directory holding the screenshots
+        queue (CaptureQueue): Queue that due tools are added to
+        path (str): SQLite file for page signals and budget usage
+        daily_budget (int): Captures that may be queued per UTC day
+        max_age_days (float): Screenshot age that triggers a refresh on its own
+        check_interval_hours (float): Minimum time between checks of one page
+        workers (int): Pages checked at once; the shared limiter paces each host
+    """
+
+    def __init__(self, screenshots_dir=SCREENSHOTS_DIR, queue=None, path=SIGNALS_PATH,
+                 daily_budget=DAILY_BUDGET, max_age_days=MAX_SCREENSHOT_AGE_DAYS,
+                 check_interval_hours=CHECK_INTERVAL_HOURS, workers=8):
+        self.screenshots_dir = screenshots_dir
+        self.queue = queue or CaptureQueue()
+        self.daily_budget = daily_budget
+        self.max_age = max_age_days * 86400
+        self.check_interval = check_interval_hours * 3600
+        self.workers = workers
+        self.limiter = shared_limiter()
+        self.stats = {'checked': 0, 'not_modified': 0, 'errors': 0, 'skipped_recent': 0}
+        self._stats_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    # Budget
+
+    def remaining_budget(self):
+        row = self.db.execute("SELECT used FROM budget WHERE day = ?", (today(),)).fetchone()
+        return max(0, self.daily_budget - (row['used'] if row else 0))
+
+    def _spend(self, count):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO budget (day, used) VALUES (?, ?) ON CONFLICT (day) DO UPDATE SET used = used + excluded.used",
+                (today(), count)
+            )
+
+    # Signals
+
+    def _fetch_page(self, url, previous):
+        """Conditional GET of the start of a page; returns the new signal values, or None on failure"""
+        headers = {'User-Agent': USER_AGENT}
+        if previous and previous['etag']:
+            headers['If-None-Match'] = previous['etag']
+        if previous and previous['last_modified']:
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        def request():
+            return requests.get(url, headers=headers, timeout=15, stream=True)
+
+        try:
+            response = self.limiter.call_with_backoff(host_key(url), request)
+            try:
+                if response.status_code == 304:
+                    self._count('not_modified')
+                    return {'etag': previous['etag'], 'last_modified': previous['last_modified'],
+                            'content_hash': previous['content_hash']}
+                if response.status_code != 200:
+                    self._count('errors')
+                    return None
+                body = response.raw.read(MAX_HTML_BYTES, decode_content=True)
+            finally:
+                response.close()
+        except (requests.RequestException, OSError) as e:
+            self._count('errors')
+            print(f"  ⚠️ Could not check {url}: {e}")
+            return None
+
+        html = body.decode(response.encoding or 'utf-8', errors='replace')
+        return {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_fingerprint(html)
+        }
+
+    def _redirect_target(self, url_cache, url):
+        """Return (known, target): whether the audit cache has the URL, and where it redirects"""
+        entry = url_cache.get(url) if url_cache else None
+        if entry is None:
+            return False, None
+        if entry['status'] == 'redirected':
+            return True, entry['location'] or None
+        return True, None
+
+    def _last_refreshed(self, path, previous):
+        """When a screenshot was last refreshed: its file time, or when it was last queued if later.
+
+        An unchanged re-capture skips the write and leaves the file time alone,
+        so the queue time is what stops it looking stale again the next day.
+        """
+        scheduled_at = previous['scheduled_at'] if previous else None
+        return max(os.path.getmtime(path), scheduled_at or 0)
+
+    def _evaluate(self, tool, previous, url_cache, now):
+        """Return (reason or None, signal row to store or None) for one tool"""
+        url = tool['source_url']
+        path = os.path.join(self.screenshots_dir, tool['filename'])
+        if not os.path.exists(path):
+            return 'missing', None
+        refreshed_at = self._last_refreshed(path, previous)
+
+        # Signals recorded for a different URL say nothing about this one
+        if previous is not None and previous['url'] != url:
+            previous = None
+
+        known, redirect_target = self._redirect_target(url_cache, url)
+        reason = None
+        if not known:
+            # No audit result for this URL says nothing about its redirect; keep what we had
+            redirect_target = previous['redirect_target'] if previous else None
+        elif previous and previous['redirect_target'] != redirect_target:
+            reason = 'redirect changed'
+
+        signals = None
+        if previous and now - previous['checked_at'] < self.check_interval:
+            self._count('skipped_recent')
+            if reason:
+                signals = dict(previous, redirect_target=redirect_target)
+        else:
+            page = self._fetch_page(url, previous)
+            self._count('checked')
+            if page is None:
+                # Keep the old page signals, but do not report the same redirect change again
+                page = {key: previous[key] for key in ('etag', 'last_modified', 'content_hash')} if previous \
+                    else {'etag': None, 'last_modified': None, 'content_hash': None}
+            elif previous and previous['content_hash'] and previous['content_hash'] != page['content_hash']:
+                reason = reason or 'content changed'
+            signals = dict(page, url=url, redirect_target=redirect_target, checked_at=now)
+
+        if reason is None and now - refreshed_at > self.max_age:
+            reason = 'stale'
+        return reason, signals
+
+    def _store_signals(self, filename, signals):
+        with self.db:
+            self.db.execute(
+                """
+                INSERT INTO signals (filename, url, etag, last_modified, content_hash, redirect_target, checked_at)
+                VALUES (:filename, :url, :etag, :last_modified, :content_hash, :redirect_target, :checked_at)
+                ON CONFLICT (filename) DO UPDATE SET
+                    url = excluded.url, etag = excluded.etag, last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash, redirect_target = excluded.redirect_target,
+                    checked_at = excluded.checked_at
+                """,
+                {key: signals[key] for key in ('url', 'etag', 'last_modified', 'content_hash',
+                                               'redirect_target', 'checked_at')} | {'filename': filename}
+            )
+
+    # Scheduling
+
+    def schedule(self, tools, dry_run=False):
+        """
+        Check every tool's signals and queue the most urgent ones the budget allows.
+
+        Args:
+            tools (list): Tool dicts with name, source_url and screenshot_url
+            dry_run (bool): Report what would be queued without queueing or spending budget
+
+        Returns:
+            list: (tool, reason) pairs that were queued
+        """
+        now = time.time()
+        candidates = []
+        for tool in tools:
+            url = (tool.get('source_url') or '').strip()
+            if not url:
+                continue
+            filename = os.path.basename(tool.get('screenshot_url') or '') or \
+                f"{tool['name'].replace(' ', '_').lower()}.png"
+            # Already waiting in the capture queue (or given up on): leave it to the queue
+            if self.queue.state(filename) in ('pending', 'running', 'failed', 'dead'):
+                continue
+            candidates.append(dict(tool, source_url=url, filename=filename))
+
+        previous = {row['filename']: row for row in self.db.execute("SELECT * FROM signals")}
+        # Redirect targets come from the last URL audit, when one has run
+        url_cache = UrlCache() if DEFAULT_CACHE_PATH.exists() else None
+
+        due = []
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='refresh-check') as pool:
+            results = pool.map(
+                lambda tool: self._evaluate(tool, previous.get(tool['filename']), url_cache, now),
+                candidates
+            )
+            for tool, (reason, signals) in zip(candidates, results):
+                if reason:
+                    path = os.path.join(self.screenshots_dir, tool['filename'])
+                    age = now - self._last_refreshed(path, previous.get(tool['filename'])) \
+                        if reason != 'missing' else float('inf')
+                    due.append((REASONS[reason], -age, tool, reason, signals))
+                elif signals is not None and not dry_run:
+                    self._store_signals(tool['filename'], signals)
+
+        if url_cache:
+            url_cache.close()
+
+        due.sort(key=lambda item: item[:2])
+        budget = self.remaining_budget()
+        selected = [(tool, reason) for _, _, tool, reason, _ in due[:budget]]
+        if not dry_run and selected:
+            # Tools left for another day keep their old signals, so the change is still seen next run
+            for _, _, tool, _, signals in due[:budget]:
+                if signals is not None:
+                    self._store_signals(tool['filename'], signals)
+            for tool, reason in selected:
+                self.queue.enqueue(tool['name'], tool['source_url'], priority=REASONS[reason], filename=tool['filename'])
+            self._spend(len(selected))
+            with self.db:
+                self.db.executemany(
+                    "UPDATE signals SET scheduled_at = ? WHERE filename = ?",
+                    [(now, tool['filename']) for tool, _ in selected]
+                )
+
+        print(f"Checked {self.stats['checked']} pages ({self.stats['not_modified']} not modified, "
+              f"{self.stats['errors']} unreachable, {self.stats['skipped_recent']} checked recently)")
+        print(f"{len(due)} tools due for a refresh; {'would queue' if dry_run else 'queued'} {len(selected)} "
+              f"(daily budget {self.daily_budget}, {budget} left today)")
+        for tool, reason in selected:
+            print(f"  📅 {tool['name']}: {reason}")
+        if len(due) > len(selected):
+            print(f"  ... {len(due) - len(selected)} more wait for tomorrow's budget")
+        return selected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Queue screenshot refreshes for tools whose pages changed')
+    parser.add_argument('--budget', type=int, default=DAILY_BUDGET, help='Captures that may be queued per day')
+    parser.add_argument('--max-age', type=float, default=MAX_SCREENSHOT_AGE_DAYS,
+                        help='Refresh screenshots older than this many days')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be queued without queueing it')
+    parser.add_argument('--capture', action='store_true', help='Capture the queued refreshes right away')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Number of screenshots captured at once with --capture (default: CAPTURE_CONCURRENCY or 4)')
+    parser.add_argument('--backend', default=None, choices=sorted(BACKENDS),
+                        help='Capture backend (default: CAPTURE_BACKEND or screenshotone)')
+    args = parser.parse_args()
+
+    tools = load_tool_data(TOOL_DATA_PATH).tools
+    with CaptureQueue() as queue:
+        scheduler = RefreshScheduler(queue=queue, daily_budget=args.budget, max_age_days=args.max_age)
+        selected = scheduler.schedule(tools, dry_run=args.dry_run)
+        scheduler.close()
+
+        if args.capture and selected and not args.dry_run:
+            # Screenshot paths do not change on a refresh, so the sheet needs no write-back
+            jobs = queue.claim(only={tool['filename'] for tool, _ in selected})
+            CaptureEngine(SCREENSHOTS_DIR, concurrency=args.concurrency, on_result=queue.record,
+                          backend=args.backend).run(jobs)
@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image
+
+from screenshot_store import save_variant, supported_variants
+
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "screenshots")
+
+# Card widths used by ToolGrid, CategoryCard and MobileToolCarousel, at 1x and 2x
+DEFAULT_WIDTHS = (320, 640, 960)
+DEFAULT_FORMATS = ('webp', 'jpeg')
+
+DERIVED_DIRNAME = "derived"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def derivative_name(stem, width, fmt):
+    return f"{stem}-{width}w.{fmt}"
+
+
+def build_derivatives(source_path, derived_dir, widths, formats):
+    """
+    Worker-process build of every width/format variant for one screenshot.
+
+    Args:
+        source_path (str): Full-size PNG
+        derived_dir (str): Directory derivatives are written to
+        widths (tuple): Target widths in pixels; widths at or above the source width are skipped
+        formats (tuple): Variant formats, see screenshot_store.VARIANT_OPTIONS
+
+    Returns:
+        dict: {'width', 'height', 'variants': [{'file', 'width', 'height', 'format', 'bytes'}]}
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    variants = []
+    with Image.open(source_path) as img:
+        img.load()
+        source_width, source_height = img.size
+        for width in sorted(set(widths)):
+            if width >= source_width:
+                continue
+            height = max(1, round(source_height * width / source_width))
+            # reducing_gap does a fast integer downscale first, then a Lanczos pass
+            resized = img.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+            for fmt in formats:
+                filename = derivative_name(stem, width, fmt)
+                size = save_variant(resized, os.path.join(derived_dir, filename), fmt)
+                variants.append({'file': filename, 'width': width, 'height': height, 'format': fmt, 'bytes': size})
+    return {'width': source_width, 'height': source_height, 'variants': variants}
+
+
+class DerivativeBuilder:
+    """
+    Builds resized thumbnails for public/screenshots plus a manifest.
+
+    The manifest maps each screenshot_url (e.g. /screenshots/chatgpt.png) to
+    its dimensions and variants. A screenshot is rebuilt only when its size
+    or mtime changed and its content hash differs too, or when the requested
+    widths/formats changed or a derivative file is missing.
+
+    Args:
+        screenshots_dir (str): Directory holding the source PNGs
+        widths (tuple): Target widths in pixels
+        formats (tuple): Output formats, e.g. ('avif', 'webp', 'jpeg')
+        workers (int): Worker processes, defaults to the CPU count
+    """
+
+    def __init__(self, screenshots_dir=SCREENSHOTS_DIR, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, workers=None):
+        self.screenshots_dir = screenshots_dir
+        self.derived_dir = os.path.join(screenshots_dir, DERIVED_DIRNAME)
+        self.manifest_path = os.path.join(screenshots_dir, MANIFEST_NAME)
+        self.widths = tuple(sorted(set(widths)))
+        self.formats = supported_variants(formats)
+        self.workers = workers
+        self.stats = {'built': 0, 'unchanged': 0, 'touched': 0, 'removed': 0, 'failed': 0, 'bytes': 0}
+
+    def url_for(self, filename):
+        return f"/screenshots/{filename}"
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('screenshots', {})
+
+    def save_manifest(self, entries):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'widths': list(self.widths),
+            'formats': list(self.formats),
+            'screenshots': dict(sorted(entries.items()))
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _is_current(self, entry, stat, source_path):
+        """True if the manifest entry still describes the source; may refresh its mtime"""
+        if not entry or entry.get('widths') != list(self.widths) or entry.get('formats') != list(self.formats):
+            return False
+        for variant in entry.get('variants', []):
+            if not os.path.exists(os.path.join(self.derived_dir, os.path.basename(variant['url']))):
+                return False
+        if entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('bytes') == stat.st_size:
+            return True
+        # Touched but not changed (e.g. a fresh checkout): keep the derivatives
+        if entry.get('sha256') == file_sha256(source_path):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['bytes'] = stat.st_size
+            self.stats['touched'] += 1
+            return True
+        return False
+
+    def _remove_derivatives(self, entry):
+        for variant in entry.get('variants', []):
+            path = os.path.join(self.derived_dir, os.path.basename(variant['url']))
+            if os.path.exists(path):
+                os.remove(path)
+
+    def build(self, force=False):
+        """
+        Bring derivatives and the manifest up to date.
+
+        Args:
+            force (bool): Rebuild every screenshot regardless of the manifest
+
+        Returns:
+            dict: The manifest's screenshot entries
+        """
+        os.makedirs(self.derived_dir, exist_ok=True)
+        # Read even when forcing, so derivatives the rebuild no longer writes are cleaned up
+        previous = self.load_manifest()
+        entries = {}
+        todo = []
+
+        sources = sorted(name for name in os.listdir(self.screenshots_dir) if name.lower().endswith('.png'))
+        for name in sources:
+            url = self.url_for(name)
+            path = os.path.join(self.screenshots_dir, name)
+            stat = os.stat(path)
+            entry = previous.get(url)
+            if not force and self._is_current(entry, stat, path):
+                entries[url] = entry
+                self.stats['unchanged'] += 1
+            else:
+                todo.append((url, path, stat))
+
+        # Screenshots that no longer exist lose their derivatives
+        for url, entry in previous.items():
+            if url not in entries and url not in {item[0] for item in todo}:
+                self._remove_derivatives(entry)
+                self.stats['removed'] += 1
+
+        if todo:
+            print(f"Building derivatives for {len(todo)} of {len(sources)} screenshots "
+                  f"({', '.join(map(str, self.widths))}px as {'/'.join(self.formats)})")
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(build_derivatives, path, self.derived_dir, self.widths, self.formats): (url, path, stat)
+                for url, path, stat in todo
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                url, path, stat = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ [{done}/{len(todo)}] {url}: {e}")
+                    self.stats['failed'] += 1
+                    # Keep serving the old derivatives; the stale entry is retried on the next run
+                    if previous.get(url):
+                        entries[url] = previous[url]
+                    continue
+
+                if previous.get(url):
+                    # Drop derivatives that the new build did not rewrite (e.g. a removed width)
+                    written = {variant['file'] for variant in result['variants']}
+                    stale = [v for v in previous[url].get('variants', []) if os.path.basename(v['url']) not in written]
+                    self._remove_derivatives({'variants': stale})
+
+                entries[url] = {
+                    'width': result['width'],
+                    'height': result['height'],
+                    'bytes': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha256': file_sha256(path),
+                    'widths': list(self.widths),
+                    'formats': list(self.formats),
+                    'variants': [
+                        {
+                            'url': f"/screenshots/{DERIVED_DIRNAME}/{variant['file']}",
+                            'width': variant['width'],
+                            'height': variant['height'],
+                            'format': variant['format'],
+                            'bytes': variant['bytes']
+                        }
+                        for variant in result['variants']
+                    ]
+                }
+                self.stats['built'] += 1
+                self.stats['bytes'] += sum(variant['bytes'] for variant in result['variants'])
+                print(f"🖼️ [{done}/{len(todo)}] {url}: {len(result['variants'])} derivatives")
+
+        self.save_manifest(entries)
+        return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate responsive screenshot derivatives and manifest.json')
+    parser.add_argument('--dir', default=SCREENSHOTS_DIR, help='Screenshots directory')
+    parser.add_argument('--widths', default=','.join(map(str, DEFAULT_WIDTHS)), help='Comma-separated widths in px')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS), help='Comma-separated formats (avif, webp, jpeg)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Rebuild everything, ignoring the manifest')
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    builder = DerivativeBuilder(
+        args.dir,
+        widths=[int(width) for width in args.widths.split(',') if width.strip()],
+        formats=args.formats.split(','),
+        workers=args.workers
+    )
+    builder.build(force=args.force)
+
+    stats = builder.stats
+    print(f"\nDone in {time.monotonic() - started:.1f}s: {stats['built']} built, {stats['unchanged']} unchanged "
+          f"({stats['touched']} only touched), {stats['removed']} removed, {stats['failed']} failed")
+    if stats['built']:
+        print(f"New derivatives: {stats['bytes'] // 1024}KB")
+    print(f"Manifest: {builder.manifest_path}")
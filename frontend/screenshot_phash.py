@@ -0,0 +1,355 @@
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "screenshots")
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "phash-index.json")
+INDEX_VERSION = 1
+
+# Hashes are 64 bits split into BANDS exact-match buckets. Two hashes within
+# Hamming distance BANDS - 1 must agree on at least one band (pigeonhole),
+# so bucket lookups find every near match without pairwise comparisons.
+BANDS = 8
+BAND_BITS = 64 // BANDS
+
+# Distance at or below which a new capture counts as "looks the same"
+UNCHANGED_DISTANCE = 4
+# Distance at or below which two different tools' screenshots are flagged
+DUPLICATE_DISTANCE = 6
+
+# A capture is "mostly blank" when this share of pixels sits near one grey level
+BLANK_DOMINANCE = 0.97
+BLANK_STDDEV = 4.0
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+DCT_32 = _dct_matrix(32)
+
+
+def _bits_to_uint64(bits):
+    """Pack an (N, 64) boolean array into N uint64 values, first bit most significant"""
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return packed.view('>u8').astype(np.uint64).ravel()
+
+
+def popcount(values):
+    values = np.asarray(values, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def hamming(a, b):
+    """Hamming distance between uint64 hashes (broadcasts)"""
+    return popcount(np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64)))
+
+
+def load_thumbnail(source, size=64):
+    """
+    Decode an image (path or bytes) into a size x size greyscale float array.
+
+    Uses PIL's reduce() for a cheap integer downscale before the final resize.
+    """
+    with Image.open(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source) as img:
+        img = img.convert('L')
+        factor = min(img.width, img.height) // (size * 2)
+        if factor > 1:
+            img = img.reduce(factor)
+        return np.asarray(img.resize((size, size), Image.BILINEAR), dtype=np.float32)
+
+
+def compute_hashes(thumbnails):
+    """
+    Vectorized pHash, dHash and blank statistics for a batch of thumbnails.
+
+    Args:
+        thumbnails (np.ndarray): (N, 64, 64) greyscale arrays from load_thumbnail
+
+    Returns:
+        dict: 'phash' and 'dhash' as uint64 arrays, 'stddev' and 'dominance' as float arrays
+    """
+    thumbs = np.asarray(thumbnails, dtype=np.float32)
+    n = thumbs.shape[0]
+
+    # pHash: 32x32 block means -> 2D DCT -> low 8x8 frequencies (minus DC) vs their median
+    small = thumbs.reshape(n, 32, 2, 32, 2).mean(axis=(2, 4))
+    dct = np.einsum('ij,njk,lk->nil', DCT_32, small, DCT_32)
+    low = dct[:, :8, :8].reshape(n, 64)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    phash = _bits_to_uint64(low > median)
+
+    # dHash: 8 rows x 9 columns of block means, compare horizontal neighbours
+    rows = thumbs.reshape(n, 8, 8, 64).mean(axis=2)
+    cols = np.stack([rows[:, :, round(c * 64 / 9):round((c + 1) * 64 / 9)].mean(axis=2) for c in range(9)], axis=2)
+    dhash = _bits_to_uint64((cols[:, :, 1:] > cols[:, :, :-1]).reshape(n, 64))
+
+    # Blank detection: share of pixels within a few levels of the most common one
+    flat = thumbs.reshape(n, -1)
+    levels = np.clip(flat // 8, 0, 31).astype(np.int64)
+    counts = np.apply_along_axis(np.bincount, 1, levels, minlength=32)
+    dominance = counts.max(axis=1) / flat.shape[1]
+
+    return {'phash': phash, 'dhash': dhash, 'stddev': flat.std(axis=1), 'dominance': dominance}
+
+
+def is_blank(stddev, dominance):
+    return bool(stddev < BLANK_STDDEV or dominance > BLANK_DOMINANCE)
+
+
+class PerceptualIndex:
+    """
+    pHash/dHash index over the screenshots directory, cached in frontend/.cache.
+
+    Entries are keyed by filename and refreshed when a file's size or mtime
+    changes. Near-match lookups use BANDS exact-match buckets on the pHash
+    (multi-index hashing), so a query touches only the few entries sharing
+    a band instead of every image.
+
+    Args:
+        screenshots_dir (str): Directory holding the screenshots
+        path (str): Where the index is persisted
+    """
+
+    def __init__(self, screenshots_dir=SCREENSHOTS_DIR, path=INDEX_PATH):
+        self.screenshots_dir = screenshots_dir
+        self.path = path
+        self.entries = {}
+        self._buckets = [defaultdict(set) for _ in range(BANDS)]
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._load()
+
+    # Persistence
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        for filename, entry in data.get('entries', {}).items():
+            entry['phash'] = int(entry['phash'], 16)
+            entry['dhash'] = int(entry['dhash'], 16)
+            self._put(filename, entry)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = {
+                filename: dict(entry, phash=f"{entry['phash']:016x}", dhash=f"{entry['dhash']:016x}")
+                for filename, entry in sorted(self.entries.items())
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': INDEX_VERSION, 'entries': entries}, f, indent=1)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    # Bucket maintenance
+
+    @staticmethod
+    def _bands(value):
+        return [(value >> (BAND_BITS * band)) & ((1 << BAND_BITS) - 1) for band in range(BANDS)]
+
+    def _put(self, filename, entry):
+        self._drop(filename)
+        self.entries[filename] = entry
+        for band, key in enumerate(self._bands(entry['phash'])):
+            self._buckets[band][key].add(filename)
+
+    def _drop(self, filename):
+        entry = self.entries.pop(filename, None)
+        if entry is None:
+            return
+        for band, key in enumerate(self._bands(entry['phash'])):
+            bucket = self._buckets[band][key]
+            bucket.discard(filename)
+            if not bucket:
+                del self._buckets[band][key]
+
+    # Building
+
+    def refresh(self, workers=8, batch_size=256):
+        """
+        Hash new or changed files in the directory and drop deleted ones.
+
+        Returns:
+            int: Number of files (re)hashed
+        """
+        names = sorted(name for name in os.listdir(self.screenshots_dir) if name.lower().endswith('.png'))
+        stale = []
+        with self._lock:
+            for name in set(self.entries) - set(names):
+                self._drop(name)
+                self._dirty = True
+            for name in names:
+                stat = os.stat(os.path.join(self.screenshots_dir, name))
+                entry = self.entries.get(name)
+                if not entry or entry['mtime_ns'] != stat.st_mtime_ns or entry['bytes'] != stat.st_size:
+                    stale.append((name, stat))
+
+        # Decoding dominates; PIL releases the GIL while it decodes
+        with ThreadPoolExecutor(workers) as pool:
+            for start in range(0, len(stale), batch_size):
+                batch = stale[start:start + batch_size]
+                thumbs = list(pool.map(lambda item: load_thumbnail(os.path.join(self.screenshots_dir, item[0])), batch))
+                hashes = compute_hashes(np.stack(thumbs))
+                with self._lock:
+                    for i, (name, stat) in enumerate(batch):
+                        self._put(name, self._entry(hashes, i, stat.st_mtime_ns, stat.st_size))
+                    self._dirty = True
+        return len(stale)
+
+    @staticmethod
+    def _entry(hashes, i, mtime_ns, size):
+        return {
+            'phash': int(hashes['phash'][i]),
+            'dhash': int(hashes['dhash'][i]),
+            'stddev': round(float(hashes['stddev'][i]), 2),
+            'dominance': round(float(hashes['dominance'][i]), 4),
+            'mtime_ns': mtime_ns,
+            'bytes': size
+        }
+
+    def entry_for(self, filename):
+        """Index entry for a file, hashing it first if it is missing or outdated"""
+        path = os.path.join(self.screenshots_dir, filename)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.entries.get(filename)
+            if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['bytes'] == stat.st_size:
+                return entry
+        hashes = compute_hashes(load_thumbnail(path)[None])
+        entry = self._entry(hashes, 0, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            self._put(filename, entry)
+            self._dirty = True
+        return entry
+
+    # Queries
+
+    def near(self, phash, max_distance=DUPLICATE_DISTANCE, exclude=None):
+        """
+        Filenames whose pHash is within `max_distance` bits, nearest first.
+
+        Exact for max_distance < BANDS; larger distances may miss matches.
+        """
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._bands(phash)):
+                candidates |= self._buckets[band].get(key, set())
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+            names = sorted(candidates)
+            distances = hamming(phash, [self.entries[name]['phash'] for name in names])
+        return sorted(
+            ((name, int(distance)) for name, distance in zip(names, distances) if distance <= max_distance),
+            key=lambda item: item[1]
+        )
+
+    def duplicate_groups(self, max_distance=DUPLICATE_DISTANCE):
+        """Groups of files whose screenshots look alike (connected by near matches)"""
+        parent = {}
+
+        def find(name):
+            while parent.setdefault(name, name) != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        with self._lock:
+            for name, entry in self.entries.items():
+                for other, _ in self.near(entry['phash'], max_distance, exclude=name):
+                    parent[find(other)] = find(name)
+
+        groups = defaultdict(list)
+        for name in parent:
+            groups[find(name)].append(name)
+        return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+    def blank_files(self):
+        with self._lock:
+            return sorted(name for name, entry in self.entries.items() if is_blank(entry['stddev'], entry['dominance']))
+
+    # Capture-time check
+
+    def check_capture(self, filename, content):
+        """
+        Compare a fresh capture against the current file and the rest of the index.
+
+        Args:
+            filename (str): Destination file name
+            content (bytes): Captured image bytes
+
+        Returns:
+            dict: 'unchanged' (bool, close enough to the file on disk to skip
+            the write), 'blank' (bool), 'duplicates' (list of other files that
+            look the same), 'distance' (to the current file, or None) and
+            'hashes' (entry to record once the file is written)
+        """
+        hashes = compute_hashes(load_thumbnail(content)[None])
+        candidate = self._entry(hashes, 0, None, len(content))
+        current = self.entry_for(filename)
+        distance = None
+        if current is not None:
+            distance = int(hamming(current['phash'], candidate['phash']))
+        return {
+            'unchanged': distance is not None and distance <= UNCHANGED_DISTANCE,
+            'blank': is_blank(candidate['stddev'], candidate['dominance']),
+            'duplicates': [name for name, _ in self.near(candidate['phash'], exclude=filename)],
+            'distance': distance,
+            'hashes': candidate
+        }
+
+    def record(self, filename, entry):
+        """Store the hashes of a file just written, stamped with its new mtime/size"""
+        stat = os.stat(os.path.join(self.screenshots_dir, filename))
+        with self._lock:
+            self._put(filename, dict(entry, mtime_ns=stat.st_mtime_ns, bytes=stat.st_size))
+            self._dirty = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Index screenshots by perceptual hash and report duplicates and blank captures')
+    parser.add_argument('--dir', default=SCREENSHOTS_DIR, help='Screenshots directory')
+    parser.add_argument('--distance', type=int, default=DUPLICATE_DISTANCE,
+                        help=f'Max pHash distance for duplicates (exact below {BANDS})')
+    args = parser.parse_args()
+
+    index = PerceptualIndex(args.dir)
+    hashed = index.refresh()
+    index.save()
+    print(f"Indexed {len(index.entries)} screenshots ({hashed} hashed this run)")
+
+    groups = index.duplicate_groups(args.distance)
+    print(f"\n🔁 {len(groups)} groups of near-identical screenshots:")
+    for group in groups:
+        print(f"  - {', '.join(group)}")
+
+    blank = index.blank_files()
+    print(f"\n⬜ {len(blank)} mostly blank screenshots:")
+    for name in blank:
+        print(f"  - {name}")
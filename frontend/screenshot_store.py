@@ -0,0 +1,271 @@
+import argparse
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, features
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SIGNATURE = b'\xff\xd8\xff'
+
+# Encoder settings per variant format; screenshots are mostly flat UI, so
+# lossy WebP/AVIF at these qualities is visually indistinguishable
+VARIANT_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60, 'speed': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# Pillow feature names where they differ from the format name
+FEATURE_NAMES = {'jpeg': 'jpg'}
+
+
+def supported_variants(requested):
+    """
+    Filter variant formats down to those this Pillow build can encode.
+
+    Args:
+        requested (iterable): Format names, e.g. ['webp', 'avif']
+
+    Returns:
+        tuple: The supported subset, in the requested order
+    """
+    supported = []
+    for name in requested:
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in VARIANT_OPTIONS:
+            print(f"WARNING: Unknown screenshot variant '{name}', skipping")
+            continue
+        try:
+            available = features.check(FEATURE_NAMES.get(name, name))
+        except ValueError:
+            available = False
+        if available:
+            supported.append(name)
+        else:
+            print(f"WARNING: Pillow {Image.__version__} cannot encode {name.upper()}, skipping that variant")
+    return tuple(supported)
+
+
+def validate_image(content):
+    """
+    Check that a capture payload is a complete PNG, JPEG or WebP image.
+
+    The capture API answers some failures with an HTML or JSON body, and a
+    dropped connection can leave a truncated image; neither should replace
+    a good screenshot on disk.
+
+    Args:
+        content (bytes): Image bytes as returned by the capture API
+
+    Raises:
+        ValueError: If the payload is not a recognised, intact image
+    """
+    is_webp = content[:4] == b'RIFF' and content[8:12] == b'WEBP'
+    if not (content.startswith(PNG_SIGNATURE) or content.startswith(JPEG_SIGNATURE) or is_webp):
+        raise ValueError(f"payload is not a PNG, JPEG or WebP image ({len(content)} bytes)")
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            img.verify()
+    except Exception as e:
+        raise ValueError(f"corrupt image payload: {e}") from e
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def save_variant(img, path, name):
+    """
+    Encode an image in one of the VARIANT_OPTIONS formats, atomically.
+
+    Args:
+        img (PIL.Image.Image): Source image
+        path (str): Destination file
+        name (str): Variant format name, e.g. 'webp'
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    # AVIF/WebP have no palette mode and JPEG has no alpha
+    if name == 'jpeg':
+        source = img if img.mode == 'RGB' else img.convert('RGB')
+    else:
+        source = img if img.mode in ('RGB', 'RGBA') else img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    tmp_path = f"{path}.tmp"
+    source.save(tmp_path, **VARIANT_OPTIONS[name])
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def transform_screenshot(path, variants=(), optimize_png=False):
+    """
+    Worker-process transform: optimized PNG in place plus sibling variants.
+
+    Runs in a ProcessPoolExecutor, so it only takes and returns plain data.
+
+    Args:
+        path (str): PNG file already written to disk
+        variants (tuple): Variant formats to emit next to it, e.g. ('webp',)
+        optimize_png (bool): Re-encode the PNG with optimize=True when that is smaller
+
+    Returns:
+        dict: {'path', 'png_before', 'png_after', 'variants': {format: bytes}}
+    """
+    result = {'path': path, 'png_before': os.path.getsize(path), 'variants': {}}
+    with Image.open(path) as img:
+        img.load()
+
+        if optimize_png or img.format != 'PNG':
+            tmp_path = f"{path}.opt.tmp"
+            img.save(tmp_path, 'PNG', optimize=True)
+            # A non-PNG payload is always converted; an existing PNG only if we won
+            if img.format != 'PNG' or os.path.getsize(tmp_path) < result['png_before']:
+                os.replace(tmp_path, path)
+            else:
+                os.remove(tmp_path)
+
+        if variants:
+            base = os.path.splitext(path)[0]
+            for name in variants:
+                variant_path = f"{base}.{name}"
+                result['variants'][name] = save_variant(img, variant_path, name)
+
+    result['png_after'] = os.path.getsize(path)
+    return result
+
+
+class ScreenshotStore:
+    """
+    Writes captured screenshots without decoding them when nothing needs to change.
+
+    PNG payloads are streamed to disk as-is. Optimized PNGs and WebP/AVIF
+    variants, when requested, are produced in a worker process pool after
+    the raw file lands, so capture threads never spend CPU on encoding.
+
+    Args:
+        screenshots_dir (str): Directory screenshots are written to
+        variants (tuple): Extra formats to emit, e.g. ('webp', 'avif')
+        optimize_png (bool): Losslessly re-compress PNGs in the background
+        workers (int): Worker processes for transforms, defaults to the CPU count
+    """
+
+    def __init__(self, screenshots_dir, variants=(), optimize_png=False, workers=None):
+        self.screenshots_dir = screenshots_dir
+        self.variants = supported_variants(variants)
+        self.optimize_png = optimize_png
+        self.workers = workers
+        self._pool = None
+        self._futures = []
+        self._lock = threading.Lock()
+        self.stats = {'raw_writes': 0, 'transforms': 0, 'bytes_saved': 0, 'variant_bytes': 0, 'errors': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def save(self, filename, content):
+        """
+        Write a screenshot and schedule any transforms.
+
+        Args:
+            filename (str): File name inside the screenshots directory
+            content (bytes): Image bytes as returned by the capture API
+
+        Returns:
+            str: Absolute path the screenshot was written to
+
+        Raises:
+            ValueError: If the payload is not a valid image; nothing is written
+        """
+        validate_image(content)
+        os.makedirs(self.screenshots_dir, exist_ok=True)
+        path = os.path.join(self.screenshots_dir, filename)
+        _atomic_write(path, content)
+        with self._lock:
+            self.stats['raw_writes'] += 1
+
+        # Anything that is not already a PNG must be converted to match its .png name
+        needs_transform = self.optimize_png or self.variants or not content.startswith(PNG_SIGNATURE)
+        if needs_transform:
+            self.submit(path)
+        return path
+
+    def submit(self, path):
+        """Queue a transform for a file already on disk"""
+        with self._lock:
+            future = self._executor().submit(transform_screenshot, path, self.variants, self.optimize_png)
+            self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Block until queued transforms finish; returns their results"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        results = []
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"❌ Screenshot transform failed: {e}")
+                continue
+            self.stats['transforms'] += 1
+            self.stats['bytes_saved'] += result['png_before'] - result['png_after']
+            self.stats['variant_bytes'] += sum(result['variants'].values())
+            results.append(result)
+        return results
+
+    def close(self):
+        """Finish outstanding transforms and shut the worker pool down"""
+        results = self.wait()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        return results
+
+    def summary(self):
+        parts = [f"{self.stats['raw_writes']} written as-is"] if self.stats['raw_writes'] else []
+        if self.stats['transforms']:
+            parts.append(f"{self.stats['transforms']} transformed")
+            parts.append(f"PNG savings {self.stats['bytes_saved'] // 1024}KB")
+        if self.variants:
+            parts.append(f"{'/'.join(self.variants).upper()} variants {self.stats['variant_bytes'] // 1024}KB")
+        if self.stats['errors']:
+            parts.append(f"{self.stats['errors']} failed")
+        return ", ".join(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Optimize existing screenshots and emit WebP/AVIF variants')
+    parser.add_argument('--dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "public", "screenshots"))
+    parser.add_argument('--variants', default='webp', help='Comma-separated formats to emit (webp, avif), or empty')
+    parser.add_argument('--optimize-png', action='store_true', help='Losslessly re-compress the PNGs in place')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    with ScreenshotStore(args.dir, args.variants.split(','), args.optimize_png, args.workers) as store:
+        files = sorted(name for name in os.listdir(args.dir) if name.lower().endswith('.png'))
+        before = sum(os.path.getsize(os.path.join(args.dir, name)) for name in files)
+        for name in files:
+            store.submit(os.path.join(args.dir, name))
+        store.wait()
+
+    print(f"Processed {len(files)} screenshots in {time.monotonic() - started:.1f}s")
+    print(f"PNG total: {before // 1024}KB -> {(before - store.stats['bytes_saved']) // 1024}KB")
+    print(store.summary())
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+from googleapiclient.errors import HttpError
+
+from sheets_client import get_service
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# Columns A:id, B:name, C:source_url, D:description, E:screenshot_url, F:category, G:type, H:sector
+DEFAULT_RANGE = 'Sheet1!A2:H'
+
+# First sheet row covered by DEFAULT_RANGE (row 1 is the header)
+FIRST_DATA_ROW = 2
+
+# Snapshots already loaded in this process, keyed by (sheet_id, range)
+_loaded = {}
+
+
+class SheetSnapshot:
+    """
+    Rows of the tool sheet as of one Drive revision, with a name -> row index.
+
+    Args:
+        rows (list): Row values as returned by values().get
+        revision (str): Drive file version the rows were read at, or None if unknown
+    """
+
+    def __init__(self, rows, revision=None):
+        self.rows = rows
+        self.revision = revision
+        self.by_name = {}
+        for i, row in enumerate(rows):
+            if len(row) > 1:
+                # Keep the first row for a name, like a top-down scan would
+                self.by_name.setdefault(row[1].strip(), i)
+
+    def row_index(self, tool_name):
+        """
+        Sheet row (1-based) for a tool name, or None.
+
+        Args:
+            tool_name (str): Tool name as written in column B
+        """
+        i = self.by_name.get(tool_name)
+        return None if i is None else i + FIRST_DATA_ROW
+
+    def find(self, tool_name):
+        """
+        Look up a tool by name.
+
+        Args:
+            tool_name (str): Tool name as written in column B
+
+        Returns:
+            tuple: (url, row_index) or (None, None) if not found
+        """
+        i = self.by_name.get(tool_name)
+        if i is None:
+            return None, None
+        row = self.rows[i]
+        return (row[2] if len(row) > 2 else None), i + FIRST_DATA_ROW
+
+
+def _cache_path(sheet_id, cell_range):
+    digest = hashlib.sha1(f"{sheet_id}:{cell_range}".encode('utf-8')).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"sheet-{digest}.json")
+
+
+def get_sheet_revision(sheet_id):
+    """
+    Current Drive version of the spreadsheet, or None if it cannot be read.
+
+    The version increases on every edit, so it tells us whether a cached
+    snapshot is still current without downloading the sheet.
+
+    Args:
+        sheet_id (str): ID of the spreadsheet
+    """
+    try:
+        drive = get_service('drive', 'v3')
+        metadata = drive.files().get(fileId=sheet_id, fields='version', supportsAllDrives=True).execute()
+        return metadata.get('version')
+    except (HttpError, OSError) as e:
+        print(f"WARNING: Could not read sheet revision, snapshot cache disabled: {e}")
+        return None
+
+
+def load_sheet_snapshot(service, sheet_id, cell_range=DEFAULT_RANGE, check_revision=True):
+    """
+    Load the sheet once per run, reusing the on-disk snapshot while the revision is unchanged.
+
+    Args:
+        service: Google Sheets service
+        sheet_id (str): ID of the spreadsheet
+        cell_range (str): A1 range to read
+        check_revision (bool): Compare the Drive revision with the on-disk
+            snapshot; when False the sheet is read fresh (once per process)
+
+    Returns:
+        SheetSnapshot: Rows and name index for the range
+    """
+    key = (sheet_id, cell_range)
+    if key in _loaded:
+        return _loaded[key]
+
+    revision = get_sheet_revision(sheet_id) if check_revision else None
+    cache_path = _cache_path(sheet_id, cell_range)
+
+    if revision is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('revision') == revision:
+                print(f"Using cached sheet snapshot (revision {revision})")
+                _loaded[key] = SheetSnapshot(cached['rows'], revision)
+                return _loaded[key]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    result = service.spreadsheets().values().get(
+        spreadsheetId=sheet_id,
+        range=cell_range
+    ).execute()
+    snapshot = SheetSnapshot(result.get('values', []), revision)
+    print(f"Loaded sheet snapshot: {len(snapshot.rows)} rows" + (f" (revision {revision})" if revision else ""))
+
+    if revision is not None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'revision': revision, 'range': cell_range, 'rows': snapshot.rows}, f)
+        os.replace(tmp_path, cache_path)
+
+    _loaded[key] = snapshot
+    return snapshot
+
+
+def invalidate_snapshots():
+    """Forget snapshots loaded in this process, e.g. after writing to the sheet"""
+    _loaded.clear()
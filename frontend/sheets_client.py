@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import urllib.parse
+
+import requests
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2 import service_account
+from googleapiclient.discovery import build_from_document
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    # Lets the snapshot check the sheet revision before re-reading it
+    'https://www.googleapis.com/auth/drive.metadata.readonly'
+]
+
+DISCOVERY_URLS = {
+    'sheets': "https://sheets.googleapis.com/$discovery/rest?version={version}",
+    'drive': "https://www.googleapis.com/discovery/v1/apis/drive/{version}/rest",
+}
+
+_credentials = None
+_credentials_lock = threading.Lock()
+_documents = {}
+_services = threading.local()
+
+
+def api_endpoint():
+    """
+    Base URL override for Google APIs, e.g. http://127.0.0.1:8765/ for fake_sheets_server.py.
+
+    Set SHEETS_API_ENDPOINT to point every Sheets and Drive call at it.
+    """
+    return os.getenv("SHEETS_API_ENDPOINT") or None
+
+
+def get_credentials():
+    """
+    Service account credentials from env variables, created once per process.
+
+    The same object backs every service, so its access token is minted once
+    and refreshed in place when it expires instead of per service or call.
+    Against a SHEETS_API_ENDPOINT without a private key, anonymous
+    credentials are used.
+    """
+    global _credentials
+    with _credentials_lock:
+        if _credentials is not None:
+            return _credentials
+
+        account_email = os.getenv("GOOGLE_SERVICE_ACCOUNT_EMAIL")
+        private_key = os.getenv("GOOGLE_PRIVATE_KEY")
+        if api_endpoint() and not private_key:
+            _credentials = AnonymousCredentials()
+            return _credentials
+
+        # Replace literal '\n' with newline
+        private_key = private_key.replace("\\n", "\n")
+
+        credentials_dict = {
+            "type": "service_account",
+            "project_id": "sports-innovation-lab-ai",
+            "private_key_id": "key-id",
+            "private_key": private_key,
+            "client_email": account_email,
+            "client_id": "client-id",
+            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+            "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{urllib.parse.quote(account_email)}"
+        }
+
+        _credentials = service_account.Credentials.from_service_account_info(credentials_dict, scopes=SCOPES)
+        return _credentials
+
+
+def get_discovery_document(api, version):
+    """
+    Discovery document for an API, without a network round trip when possible.
+
+    Looks in memory, then frontend/.cache, then the documents bundled with
+    google-api-python-client, and only downloads as a last resort (caching
+    the result on disk for the next run).
+
+    Args:
+        api (str): API name, e.g. 'sheets'
+        version (str): API version, e.g. 'v4'
+
+    Returns:
+        str: The discovery document JSON
+    """
+    key = (api, version)
+    if key in _documents:
+        return _documents[key]
+
+    cache_path = os.path.join(CACHE_DIR, f"discovery-{api}-{version}.json")
+    document = None
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            document = f.read()
+
+    if document is None:
+        try:
+            from googleapiclient.discovery_cache import get_static_doc
+            document = get_static_doc(api, version)
+        except ImportError:
+            document = None
+
+    if document is None:
+        url = DISCOVERY_URLS.get(api, "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest")
+        response = requests.get(url.format(api=api, version=version), timeout=30)
+        response.raise_for_status()
+        document = response.text
+        json.loads(document)  # refuse to cache anything that is not JSON
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(document)
+        os.replace(tmp_path, cache_path)
+
+    _documents[key] = document
+    return document
+
+
+def get_service(api='sheets', version='v4'):
+    """
+    Lazily built API service, reused for the rest of the run.
+
+    Services are cached per thread because the httplib2 transport under
+    googleapiclient is not thread-safe; all of them share one credentials
+    object and one parsed discovery document, so extra threads cost
+    neither a token nor a discovery fetch.
+
+    Args:
+        api (str): API name, e.g. 'sheets' or 'drive'
+        version (str): API version
+
+    Returns:
+        googleapiclient Resource for the API
+    """
+    services = _services.__dict__.setdefault('by_api', {})
+    key = (api, version)
+    if key not in services:
+        endpoint = api_endpoint()
+        client_options = None
+        if endpoint:
+            # Keep the API's service path (e.g. 'drive/v3/') under the override
+            service_path = json.loads(get_discovery_document(api, version)).get('servicePath', '')
+            client_options = {'api_endpoint': urllib.parse.urljoin(endpoint.rstrip('/') + '/', service_path)}
+        services[key] = build_from_document(
+            get_discovery_document(api, version),
+            credentials=get_credentials(),
+            client_options=client_options
+        )
+    return services[key]
+
+
+def get_sheets_service():
+    """
+    Create and return a Google Sheets service object using credentials from env variables
+    """
+    return get_service('sheets', 'v4')
+
+
+def reset():
+    """Drop cached credentials and services, e.g. after changing the environment"""
+    global _credentials
+    with _credentials_lock:
+        _credentials = None
+    _services.__dict__.pop('by_api', None)
@@ -0,0 +1,182 @@
+import atexit
+import os
+import sys
+import threading
+from http.client import HTTPException
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+# Shared helpers live alongside the audit scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'audits'))
+from rate_limiter import api_key, shared_limiter
+
+# Statuses worth retrying; anything else (bad range, permissions) fails the chunk at once
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Network failures below the HTTP status layer (DNS, resets, TLS, token refresh); retried like a 5xx
+TRANSPORT_ERRORS = (OSError, HTTPException, httplib2.HttpLib2Error, TransportError)
+
+
+def coalesce_rows(sheet_name, column, updates):
+    """
+    Turn {row_index: value} into batchUpdate ranges, merging consecutive rows.
+
+    Args:
+        sheet_name (str): Sheet tab name, e.g. 'Sheet1'
+        column (str): Column letter, e.g. 'E'
+        updates (dict): Row index (1-based) to cell value
+
+    Returns:
+        list: ValueRange dicts for values().batchUpdate
+    """
+    data = []
+    rows = sorted(updates)
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or rows[i] != rows[i - 1] + 1:
+            first, last = rows[start], rows[i - 1]
+            cell_range = f"{sheet_name}!{column}{first}" if first == last else f"{sheet_name}!{column}{first}:{column}{last}"
+            data.append({'range': cell_range, 'values': [[updates[row]] for row in rows[start:i]]})
+            start = i
+    return data
+
+
+class SheetsWriteBuffer:
+    """
+    Collects single-cell updates and writes them with values().batchUpdate.
+
+    Updates are flushed when `chunk_size` rows are pending, every
+    `flush_interval` seconds from a background thread, and at interpreter
+    exit. Each chunk is retried on its own, so a transient failure never
+    re-sends rows that were already written. Later updates to the same row
+    replace earlier ones that have not been flushed yet.
+
+    Args:
+        service: Google Sheets service
+        sheet_id (str): ID of the spreadsheet
+        column (str): Column to write, 'E' holds the screenshot URL
+        sheet_name (str): Sheet tab name
+        chunk_size (int): Rows per batchUpdate request
+        flush_interval (float): Seconds between background flushes, or None to disable
+        max_retries (int): Retries per chunk for throttling and server errors
+    """
+
+    def __init__(self, service, sheet_id, column='E', sheet_name='Sheet1', chunk_size=100,
+                 flush_interval=10.0, max_retries=3):
+        self.service = service
+        self.sheet_id = sheet_id
+        self.column = column
+        self.sheet_name = sheet_name
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.limiter = shared_limiter()
+
+        self.pending = {}
+        self.failed = {}
+        self.stats = {'rows_written': 0, 'requests': 0, 'retries': 0}
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._flush_periodically, name='sheets-writeback', daemon=True)
+            self._timer.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, row_index, value):
+        """
+        Queue a cell update.
+
+        Args:
+            row_index (int): Row index (1-based) to update
+            value (str): New cell value
+        """
+        with self._lock:
+            self.pending[row_index] = value
+            full = len(self.pending) >= self.chunk_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every pending update, one batchUpdate request per chunk"""
+        with self._flush_lock:
+            with self._lock:
+                updates, self.pending = self.pending, {}
+
+            rows = sorted(updates)
+            for start in range(0, len(rows), self.chunk_size):
+                chunk = {row: updates[row] for row in rows[start:start + self.chunk_size]}
+                try:
+                    self._write_chunk(chunk)
+                except Exception as e:
+                    # The rest of the buffer has already left `pending`; keep going
+                    self._chunk_failed(chunk, str(e))
+
+    def _write_chunk(self, chunk):
+        body = {
+            'valueInputOption': 'RAW',
+            'data': coalesce_rows(self.sheet_name, self.column, chunk)
+        }
+        key = api_key('sheets')
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.wait(key)
+            self.stats['requests'] += 1
+            try:
+                self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.sheet_id,
+                    body=body
+                ).execute()
+            except HttpError as e:
+                status = e.resp.status
+                if status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return self._chunk_failed(chunk, f"HTTP {status}")
+                retry_after = e.resp.get('retry-after')
+            except TRANSPORT_ERRORS as e:
+                if attempt == self.max_retries:
+                    return self._chunk_failed(chunk, str(e))
+                retry_after = None
+            else:
+                self.limiter.bucket(key).reset_backoff()
+                self.stats['rows_written'] += len(chunk)
+                print(f"✅ Updated screenshot URLs in Google Sheets for {len(chunk)} rows "
+                      f"({len(body['data'])} ranges)")
+                return
+
+            self.stats['retries'] += 1
+            pause = self.limiter.throttle(key, retry_after)
+            print(f"  ⏳ Sheets write failed, retrying chunk of {len(chunk)} rows in {pause:.1f}s")
+
+    def _chunk_failed(self, chunk, reason):
+        self.failed.update(chunk)
+        print(f"❌ Error updating Google Sheet ({reason}): rows {', '.join(map(str, sorted(chunk)))} not written")
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Background Sheets flush failed: {e}")
+
+    def close(self):
+        """Stop the background flusher and write anything still pending"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+        atexit.unregister(self.close)
+        if self.stats['requests']:
+            print(f"Sheets write-back: {self.stats['rows_written']} rows in {self.stats['requests']} "
+                  f"requests ({self.stats['retries']} retries, {len(self.failed)} failed)")
@@ -1,12 +1,67 @@
 import { NextResponse } from 'next/server';
 import path from 'path';
 import fs from 'fs';
+import crypto from 'crypto';
 import Papa from 'papaparse';
 import _ from 'lodash';
 
 // Mock data for development - later replace with Snowflake
 let cachedData = null;
 
+// Precomputed rollup built by analytics/fan_cube.py; false once we know it's unusable
+let cachedCube = null;
+
+// sha256 of a file's size plus its first and last `sample` bytes; matches
+// sample_fingerprint in analytics/fan_columns.py
+function sampleFingerprint(filePath, sample) {
+  const { size } = fs.statSync(filePath);
+  const hash = crypto.createHash('sha256').update(String(size));
+  const fd = fs.openSync(filePath, 'r');
+  try {
+    const read = (position, length) => {
+      const buffer = Buffer.alloc(length);
+      return buffer.subarray(0, fs.readSync(fd, buffer, 0, length, position));
+    };
+    hash.update(read(0, Math.min(sample, size)));
+    if (size > sample) {
+      const start = Math.max(sample, size - sample);
+      hash.update(read(start, size - start));
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+  return hash.digest('hex');
+}
+
+// True when fan-cube.json was built from this CSV. Only the size and a
+// hash of both ends are compared, so a cold start never reads the whole
+// export; mtimes are not trusted because checkouts and copies reset them.
+function cubeMatchesCsv(cube, csvPath) {
+  const source = (cube.sources || []).find(entry => entry.name === path.basename(csvPath));
+  if (!source || !source.sampleBytes || source.size !== fs.statSync(csvPath).size) return false;
+  return source.sampleSha256 === sampleFingerprint(csvPath, source.sampleBytes);
+}
+
+// Load the community x merchant rollup, unless it's missing or was built from a different CSV
+function loadCube() {
+  const cubePath = path.join(process.cwd(), 'public', 'fan-cube.json');
+  const csvPath = path.join(process.cwd(), 'public', '2025-04-04 3_16pm.csv');
+
+  try {
+    if (!fs.existsSync(cubePath)) return false;
+    const cube = JSON.parse(fs.readFileSync(cubePath, 'utf8'));
+    if (fs.existsSync(csvPath) && !cubeMatchesCsv(cube, csvPath)) {
+      console.log("fan-cube.json does not match the CSV, answering from rows instead");
+      return false;
+    }
+    console.log("Loaded fan cube, cells:", cube.cells.rows.length);
+    return cube;
+  } catch (cubeError) {
+    console.error("Error loading fan cube, answering from rows instead:", cubeError);
+    return false;
+  }
+}
+
 export async function POST(request) {
   console.log("API route called - starting processing");
 
@@ -15,6 +70,16 @@ export async function POST(request) {
     const { query } = await request.json();
     console.log("Query received:", query);
 
+    // Answer from the precomputed cube when there is one
+    if (cachedCube === null) {
+      cachedCube = loadCube();
+    }
+    if (cachedCube) {
+      const answer = processCubeQuery(query, cachedCube);
+      console.log("Query answered from cube, answer length:", answer.length);
+      return NextResponse.json({ answer });
+    }
+
     // Load data if not cached
     if (!cachedData) {
       console.log("No cached data found, attempting to load CSV");
@@ -121,6 +186,14 @@ function extractCommunity(query) {
   return null;
 }
 
+// Default response with suggestions
+const HELP_TEXT = "I'm not sure how to answer that question about the OTT fan movement data. You can ask about:\n\n" +
+  "• Popular streaming services overall or for a specific league (NBA, NFL, etc.)\n" +
+  "• Spending by community or average spend for a specific league\n" +
+  "• Fan counts by community or for a specific league\n" +
+  "• Net change in streaming subscriptions\n" +
+  "• Comparison of top streaming services";
+
 // Main question answering function
 function processQuery(query, data) {
   // Convert query to lowercase for easier matching
@@ -319,10 +392,204 @@ function processQuery(query, data) {
   }
 
   // Default response with suggestions
-  return "I'm not sure how to answer that question about the OTT fan movement data. You can ask about:\n\n" +
-         "• Popular streaming services overall or for a specific league (NBA, NFL, etc.)\n" +
-         "• Spending by community or average spend for a specific league\n" +
-         "• Fan counts by community or for a specific league\n" +
-         "• Net change in streaming subscriptions\n" +
-         "• Comparison of top streaming services";
-}
\ No newline at end of file
+  return HELP_TEXT;
+}
+
+// Sum a measure over cube cells into { name: total }, like _.countBy over the rows:
+// keys in first-seen order, groups without rows left out
+function cubeTotals(cube, by, measure = 'rows', include = () => true) {
+  const names = by === 'community' ? cube.communities : cube.merchants;
+  const { cells } = cube;
+  const totals = new Array(names.length).fill(0);
+  const counts = new Array(names.length).fill(0);
+
+  for (let i = 0; i < cells.rows.length; i++) {
+    if (!include(i)) continue;
+    totals[cells[by][i]] += cells[measure][i];
+    counts[cells[by][i]] += cells.rows[i];
+  }
+
+  const result = {};
+  names.forEach((name, code) => {
+    if (counts[code]) result[name] = totals[code];
+  });
+  return result;
+}
+
+// Sum a measure over every cube cell that passes `include`
+function cubeTotal(cube, measure = 'rows', include = () => true) {
+  const { cells } = cube;
+  let total = 0;
+  for (let i = 0; i < cells.rows.length; i++) {
+    if (include(i)) total += cells[measure][i];
+  }
+  return total;
+}
+
+// Same answers as processQuery, read from the precomputed community x merchant cube
+function processCubeQuery(query, cube) {
+  const q = query.toLowerCase();
+  const communityMatch = extractCommunity(q);
+
+  const { cells, communities, merchants } = cube;
+  const communityOf = i => communities[cells.community[i]];
+  const merchantOf = i => merchants[cells.merchant[i]];
+  const isStreaming = i => merchantOf(i) && merchantOf(i) !== '_none_';
+  const inCommunity = i => communityOf(i) === communityMatch;
+  const totalRows = cubeTotal(cube);
+
+  // Popular streaming services (overall)
+  if (q.includes('popular') && q.includes('streaming') && !containsLeague(q)) {
+    const topMerchants = Object.entries(cubeTotals(cube, 'merchant', 'rows', isStreaming))
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, 5);
+
+    let response = "The most popular streaming services among all sports fans are:\n";
+    topMerchants.forEach(([merchant, count], index) => {
+      response += `${index + 1}. ${formatMerchantName(merchant)}: ${count} fans (${(count/totalRows*100).toFixed(1)}%)\n`;
+    });
+
+    return response;
+  }
+
+  // Spending by community
+  if (q.includes('spend') && q.includes('community') && !q.includes('average')) {
+    const primarySpend = cubeTotals(cube, 'community', 'primarySpend', i => communityOf(i));
+    const secondarySpend = cubeTotals(cube, 'community', 'secondarySpend', i => communityOf(i));
+
+    const sortedSpend = Object.entries(primarySpend)
+      .map(([community, spend]) => [community, spend + secondarySpend[community]])
+      .sort((a, b) => b[1] - a[1]);
+
+    let response = "Total streaming spend by sports community:\n";
+    sortedSpend.forEach(([community, spend]) => {
+      response += `${community}: $${spend.toFixed(2)}\n`;
+    });
+
+    return response;
+  }
+
+  // Community with most fans
+  if ((q.includes('which') || q.includes('what')) && q.includes('community') && q.includes('most')) {
+    const topCommunity = Object.entries(cubeTotals(cube, 'community'))
+      .sort((a, b) => b[1] - a[1])[0];
+
+    const percentage = (topCommunity[1] / totalRows * 100).toFixed(1);
+
+    return `${topCommunity[0]} has the most fans in this dataset with ${topCommunity[1]} fans (${percentage}% of the total).`;
+  }
+
+  // Fan counts by community
+  if ((q.includes('fans') && q.includes('each community')) ||
+      (q.includes('how many') && q.includes('fans') && q.includes('community'))) {
+    let response = "Fan counts by sports community:\n";
+
+    Object.entries(cubeTotals(cube, 'community'))
+      .sort((a, b) => b[1] - a[1])
+      .forEach(([community, count]) => {
+        const percentage = (count / totalRows * 100).toFixed(1);
+        response += `${community}: ${count} fans (${percentage}%)\n`;
+      });
+
+    return response;
+  }
+
+  // Fan count for a specific community
+  if (communityMatch && (q.includes('how many') || q.includes('number of') || q.includes('count'))) {
+    const count = cubeTotal(cube, 'rows', inCommunity);
+    const percentage = (count / totalRows * 100).toFixed(1);
+    return `There are ${count} ${communityMatch} fans in the dataset, representing ${percentage}% of all fans.`;
+  }
+
+  // Popular streaming services for a specific community
+  if (communityMatch && q.includes('popular') && q.includes('streaming')) {
+    const communityRows = cubeTotal(cube, 'rows', inCommunity);
+    const topMerchants = Object.entries(cubeTotals(cube, 'merchant', 'rows', i => inCommunity(i) && isStreaming(i)))
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, 5);
+
+    if (topMerchants.length === 0) {
+      return `No streaming services found for ${communityMatch} fans with sufficient data.`;
+    }
+
+    let response = `Top streaming services for ${communityMatch} fans:\n`;
+    topMerchants.forEach(([merchant, count], index) => {
+      const percentage = (count / communityRows * 100).toFixed(1);
+      response += `${index + 1}. ${formatMerchantName(merchant)}: ${count} fans (${percentage}%)\n`;
+    });
+
+    return response;
+  }
+
+  // Average spend for a specific community
+  if (communityMatch && q.includes('average') && q.includes('spend')) {
+    const communityRows = cubeTotal(cube, 'rows', inCommunity);
+
+    // The *SpendN measures count rows with a non-zero spend, which is what the averages divide by
+    const totalPrimarySpend = cubeTotal(cube, 'primarySpend', inCommunity);
+    const primarySpendRows = cubeTotal(cube, 'primarySpendN', inCommunity);
+    const avgPrimarySpend = primarySpendRows > 0 ? totalPrimarySpend / primarySpendRows : 0;
+
+    const totalSecondarySpend = cubeTotal(cube, 'secondarySpend', inCommunity);
+    const secondarySpendRows = cubeTotal(cube, 'secondarySpendN', inCommunity);
+    const avgSecondarySpend = secondarySpendRows > 0 ? totalSecondarySpend / secondarySpendRows : 0;
+
+    const totalSpend = totalPrimarySpend + totalSecondarySpend;
+    const avgTotalSpend = totalSpend / communityRows;
+
+    return `For ${communityMatch} fans (${communityRows} total):\n` +
+           `Average primary streaming spend: $${avgPrimarySpend.toFixed(2)}\n` +
+           `Average secondary streaming spend: $${avgSecondarySpend.toFixed(2)}\n` +
+           `Total average spend per fan: $${avgTotalSpend.toFixed(2)}\n` +
+           `Total community spend: $${totalSpend.toFixed(2)}`;
+  }
+
+  // Net change in streaming subscriptions
+  if (q.includes('net change') || (q.includes('wins') && q.includes('losses'))) {
+    const include = communityMatch ? inCommunity : () => true;
+    const net = cubeTotal(cube, 'net', include);
+    const wins = cubeTotal(cube, 'wins', include);
+    const losses = cubeTotal(cube, 'losses', include);
+
+    const heading = communityMatch
+      ? `Streaming subscription changes for ${communityMatch} fans:`
+      : `Overall streaming subscription changes:`;
+
+    return `${heading}\n` +
+           `New subscriptions (wins): ${wins}\n` +
+           `Canceled subscriptions (losses): ${losses}\n` +
+           `Net change: ${net} (${net > 0 ? 'growth' : 'decline'})`;
+  }
+
+  // Streaming service comparison
+  if (q.includes('compare') && q.includes('streaming')) {
+    const merchantCounts = cubeTotals(cube, 'merchant', 'rows', isStreaming);
+    const streamingRows = cubeTotal(cube, 'rows', isStreaming);
+
+    const topMerchants = Object.entries(merchantCounts)
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, 5);
+
+    let response = "Comparison of top streaming services:\n\n";
+
+    topMerchants.forEach(([merchant, count]) => {
+      const ofMerchant = i => merchantOf(i) === merchant;
+      const avgSpend = cubeTotal(cube, 'primarySpend', ofMerchant) / count;
+
+      const topCommunity = Object.entries(cubeTotals(cube, 'community', 'rows', ofMerchant))
+        .sort((a, b) => b[1] - a[1])[0];
+
+      const percentOfTopCommunity = (topCommunity[1] / count * 100).toFixed(1);
+
+      response += `${formatMerchantName(merchant)}:\n`;
+      response += `- Subscribers: ${count} (${(count/streamingRows*100).toFixed(1)}% of streaming fans)\n`;
+      response += `- Average spend: $${avgSpend.toFixed(2)}\n`;
+      response += `- Most common fan type: ${topCommunity[0]} (${percentOfTopCommunity}%)\n\n`;
+    });
+
+    return response;
+  }
+
+  // Default response with suggestions
+  return HELP_TEXT;
+}
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scripts import their neighbours by module name, the way they run from their own directories
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('audits', 'frontend', 'analytics'):
+    sys.path.insert(0, os.path.join(ROOT, directory))
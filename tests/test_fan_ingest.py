@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fan_columns import CATEGORICAL, COLUMNS, NO_MERCHANT
+from fan_ingest import Ingester, KeySet
+from fan_sketches import source_sketches
+from fan_store import FanStore
+
+HEADER = ','.join(COLUMNS)
+
+
+def export_rows(count, seed=0):
+    """Valid export rows with a few repeated (FAN_ID, DAY_DATE) pairs"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(count):
+        fan = f"fan{rng.integers(0, count // 2)}"
+        day = f"2024-01-{rng.integers(1, 4):02d}"
+        community = ('NBA', 'NFL')[i % 2]
+        merchant = ('netflix', 'hulu', '')[i % 3]
+        rows.append(f"{community},Video Streaming,{fan},{merchant},,{day},1,0,1,{i % 7 + 0.5},")
+    return rows
+
+
+def write_export(path, rows):
+    path.write_text('\n'.join([HEADER] + rows) + '\n', encoding='utf-8')
+    return path
+
+
+def decoded(store):
+    table = store.table()
+    frame = {}
+    for name, column in table.columns.items():
+        frame[name] = table.dictionaries[name].decode(column) if name in CATEGORICAL else column
+    return pd.DataFrame(frame)
+
+
+def test_keyset_finds_keys_across_runs():
+    keys = KeySet(np.array([5, 1, 5], dtype=np.uint64))
+    for batch in ([2, 9], [3], [4, 7, 8], [6]):
+        keys.add(np.array(batch, dtype=np.uint64))
+
+    assert len(keys) == 9
+    assert len(keys.runs) < 5
+    assert all(np.all(np.diff(run.astype(np.int64)) > 0) for run in keys.runs)
+    probe = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 10], dtype=np.uint64)
+    assert keys.contains(probe).tolist() == [True] * 9 + [False, False]
+
+
+def test_empty_keyset_contains_nothing():
+    keys = KeySet()
+    keys.add(np.array([], dtype=np.uint64))
+    assert len(keys) == 0
+    assert not keys.contains(np.array([1], dtype=np.uint64)).any()
+
+
+def test_duplicates_are_dropped_across_chunks_and_exports(tmp_path):
+    rows = export_rows(60)
+    store = FanStore(tmp_path / 'store')
+    ingester = Ingester(store, chunk_rows=7)
+    ingester.ingest(write_export(tmp_path / 'day1.csv', rows[:40]))
+    ingester.ingest(write_export(tmp_path / 'day2.csv', rows[30:]))
+
+    expected = pd.DataFrame([row.split(',') for row in rows], columns=list(COLUMNS))
+    expected = expected.drop_duplicates(['FAN_ID', 'DAY_DATE'])
+    frame = decoded(FanStore(tmp_path / 'store'))
+    assert frame[['FAN_ID', 'COMMUNITY']].values.tolist() == expected[['FAN_ID', 'COMMUNITY']].values.tolist()
+    assert ingester.stats['read'] == 70
+    assert ingester.stats['duplicates'] == 70 - len(expected)
+
+
+def test_per_community_keeps_a_row_in_each_community(tmp_path):
+    rows = [
+        "NBA,Video Streaming,fan1,netflix,,2024-01-01,1,0,1,5,",
+        "NFL,Video Streaming,fan1,netflix,,2024-01-01,1,0,1,5,",
+        "NFL,Video Streaming,fan1,hulu,,2024-01-01,1,0,1,5,",
+    ]
+    export = write_export(tmp_path / 'export.csv', rows)
+
+    default = Ingester(FanStore(tmp_path / 'default'))
+    default.ingest(export)
+    per_community = Ingester(FanStore(tmp_path / 'per-community'), per_community=True)
+    per_community.ingest(export)
+
+    assert len(FanStore(tmp_path / 'default')) == 1
+    assert decoded(FanStore(tmp_path / 'per-community'))['COMMUNITY'].tolist() == ['NBA', 'NFL']
+
+
+def test_invalid_rows_are_rejected_and_bad_spend_coerced(tmp_path):
+    rows = [
+        "NBA,Video Streaming,fan1,,,2024-01-01,1,0,1,abc,",
+        ",Video Streaming,fan2,netflix,,2024-01-01,1,0,1,5,",
+        "NBA,Video Streaming,fan3,netflix,,01/02/2024,1,0,1,5,",
+        "NBA,Video Streaming,fan4,netflix,,2024-01-02,2,0,1,5,",
+        "NBA,Video Streaming,fan5,netflix,,2024-01-02,,,,-3,",
+    ]
+    ingester = Ingester(FanStore(tmp_path / 'store'))
+    ingester.ingest(write_export(tmp_path / 'export.csv', rows))
+
+    frame = decoded(FanStore(tmp_path / 'store'))
+    assert frame['FAN_ID'].tolist() == ['fan1', 'fan5']
+    assert frame['PRIMARY_MERCHANT'].tolist() == [NO_MERCHANT, 'netflix']
+    assert np.isnan(frame['PRIMARY_SPEND']).all()
+    assert frame['WINS'].tolist() == [1, 0]
+    assert ingester.stats['rejected'] == 3
+    assert ingester.stats['coerced'] == 2
+
+
+def test_interrupted_export_resumes_where_it_stopped(tmp_path, monkeypatch):
+    export = write_export(tmp_path / 'export.csv', export_rows(50))
+    Ingester(FanStore(tmp_path / 'clean'), chunk_rows=8).ingest(export)
+
+    append = FanStore.append
+    calls = []
+
+    def crash_on_third_chunk(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return append(self, *args, **kwargs)
+
+    monkeypatch.setattr(FanStore, 'append', crash_on_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        Ingester(FanStore(tmp_path / 'resumed'), chunk_rows=8).ingest(export)
+    monkeypatch.setattr(FanStore, 'append', append)
+
+    store = FanStore(tmp_path / 'resumed')
+    assert store.source('export.csv')['read'] == 16
+    assert not store.source('export.csv')['complete']
+    resumed = Ingester(store, chunk_rows=8)
+    resumed.ingest(export)
+
+    assert resumed.stats['read'] == 34
+    pd.testing.assert_frame_equal(decoded(FanStore(tmp_path / 'resumed')), decoded(FanStore(tmp_path / 'clean')))
+    store = FanStore(tmp_path / 'resumed')
+    assert store.source('export.csv')['complete']
+    assert source_sketches(store, 'export.csv').rows == len(store)
+
+
+def test_changed_export_is_not_resumed(tmp_path):
+    export = write_export(tmp_path / 'export.csv', export_rows(10))
+    store = FanStore(tmp_path / 'store')
+    Ingester(store).ingest(export)
+
+    write_export(export, export_rows(12))
+    with pytest.raises(SystemExit, match='changed since it was loaded'):
+        Ingester(FanStore(tmp_path / 'store')).ingest(export)
@@ -0,0 +1,127 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fan_analytics import FanAnalytics
+from fan_columns import NO_MERCHANT, FanTable
+from fan_sketches import FanSketches, HyperLogLog, SpaceSaving, fan_hashes
+
+
+def fan_table(count, seed=0, fans=None):
+    rng = np.random.default_rng(seed)
+    merchants = np.array(['netflix', 'hulu', 'peacock_tv', 'max', NO_MERCHANT])
+    return FanTable.from_frame(pd.DataFrame({
+        'COMMUNITY': rng.choice(['NBA', 'NFL', 'NHL'], count),
+        'MOVEMENT_GROUP': 'Video Streaming',
+        'FAN_ID': [f"fan{i}" for i in rng.integers(0, fans or count, count)],
+        'PRIMARY_MERCHANT': merchants[np.minimum(rng.geometric(0.4, count) - 1, 4)],
+        'SECONDARY_MERCHANT': NO_MERCHANT,
+        'DAY_DATE': pd.to_datetime('2024-01-01'),
+        'WINS': 1, 'LOSSES': 0, 'NET': 1,
+        'PRIMARY_SPEND': 5.0, 'SECONDARY_SPEND': np.nan,
+    }))
+
+
+def slice_table(table, rows):
+    return FanTable({name: column[rows] for name, column in table.columns.items()}, table.dictionaries)
+
+
+def hll_of(values, precision=12):
+    hll = HyperLogLog(precision)
+    hll.add(['all'], np.zeros(len(values), dtype=np.int64), fan_hashes(values))
+    return hll
+
+
+@pytest.mark.parametrize('count', [10, 1000, 50000])
+def test_hyperloglog_is_within_a_few_percent(count):
+    estimate = hll_of([f"fan{i}" for i in range(count)]).estimate('all')
+    assert estimate == pytest.approx(count, rel=0.05)
+
+
+def test_hyperloglog_merge_counts_the_union_once():
+    left = hll_of([f"fan{i}" for i in range(0, 6000)])
+    right = hll_of([f"fan{i}" for i in range(4000, 10000)])
+    left.merge(right)
+    assert left.estimate('all') == pytest.approx(10000, rel=0.05)
+
+
+def test_hyperloglog_rejects_other_precisions():
+    with pytest.raises(ValueError):
+        hll_of(['a'], precision=12).merge(hll_of(['a'], precision=10))
+
+
+def test_space_saving_is_exact_below_capacity():
+    summary = SpaceSaving(capacity=4)
+    for item in 'aabacab':
+        summary.add(item)
+    assert summary.top(2) == [('a', 4, 0), ('b', 2, 0)]
+
+
+def test_space_saving_keeps_heavy_hitters_and_bounds_errors():
+    stream = ['hot'] * 300 + ['warm'] * 150 + [f"cold{i}" for i in range(200)]
+    np.random.default_rng(1).shuffle(stream)
+    summary = SpaceSaving(capacity=8)
+    for item in stream:
+        summary.add(item)
+
+    truth = Counter(stream)
+    top = {item: (count, error) for item, count, error in summary.top()}
+    assert [item for item, _, _ in summary.top(2)] == ['hot', 'warm']
+    for item, (count, error) in top.items():
+        assert count - error <= truth[item] <= count
+
+
+def test_space_saving_merge_matches_one_pass():
+    first, second = SpaceSaving(capacity=8), SpaceSaving(capacity=8)
+    for item, weight in (('a', 50), ('b', 30), ('c', 5)):
+        first.add(item, weight)
+    for item, weight in (('b', 40), ('d', 20), ('a', 1)):
+        second.add(item, weight)
+    first.merge(second)
+    assert first.top() == [('b', 70, 0), ('a', 51, 0), ('d', 20, 0), ('c', 5, 0)]
+
+
+def test_merged_sketches_match_one_pass():
+    table = fan_table(6000, fans=2500)
+    whole = FanSketches(precision=12)
+    whole.add(table)
+    parts = []
+    for rows in (slice(0, 2000), slice(2000, 4500), slice(4500, 6000)):
+        part = FanSketches(precision=12)
+        part.add(slice_table(table, rows))
+        parts.append(part)
+    merged = FanSketches.merge(parts)
+
+    assert merged.rows == whole.rows == 6000
+    assert np.array_equal(merged.fans.registers, whole.fans.registers)
+    assert merged.communities.estimates() == whole.communities.estimates()
+    assert merged.popular_merchants() == whole.popular_merchants()
+
+
+def test_save_and_load_round_trip(tmp_path):
+    sketches = FanSketches(precision=12)
+    sketches.add(fan_table(500))
+    path = tmp_path / 'sketches' / 'export.npz'
+    sketches.save(path, {'source': 'export.csv'})
+
+    loaded = FanSketches.load(path)
+    assert loaded.rows == 500
+    assert loaded.meta['source'] == 'export.csv'
+    assert loaded.distinct_fans('NBA') == sketches.distinct_fans('NBA')
+    assert loaded.popular_merchants() == sketches.popular_merchants()
+    assert FanSketches.load(tmp_path / 'missing.npz') is None
+
+
+def test_analytics_answers_from_sketches_match_rows():
+    table = fan_table(3000, fans=1200)
+    sketches = FanSketches()
+    sketches.add(table)
+    question = "What are the most popular streaming services?"
+    assert FanAnalytics(table, sketches).answer(question) == FanAnalytics(table).answer(question)
+
+    answer = FanAnalytics(table, sketches).answer("How many unique NBA fans are there?")
+    nba = table.dictionaries['FAN_ID'].decode(table.columns['FAN_ID'][table.mask({'COMMUNITY': 'NBA'})])
+    estimate = float(answer.split('about ')[1].split(' ')[0].replace(',', ''))
+    assert estimate == pytest.approx(len(set(nba)), rel=0.05)
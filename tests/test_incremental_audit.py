@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import tool_audit
+import tool_data
+from tool_audit import ToolAuditor, tool_fingerprint
+
+TOOLS = [
+    {'id': '1', 'name': 'Alpha', 'source_url': 'https://alpha.example/', 'category': 'Writing'},
+    {'id': '2', 'name': 'Jasper', 'source_url': 'https://jasper.example/', 'category': 'Writing'},
+    {'id': '3', 'name': 'Gamma', 'source_url': 'https://gamma.example/', 'category': 'Video'},
+]
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    monkeypatch.setattr(tool_data, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(tool_audit, 'STATE_PATH', tmp_path / 'cache' / 'audit-fingerprints.json')
+    monkeypatch.setattr(tool_audit, 'REPORT_PATH', tmp_path / 'audit-report.json')
+    return tmp_path
+
+
+@pytest.fixture
+def checked(monkeypatch):
+    """URLs requested by the audits, answered healthy without touching the network"""
+    urls = []
+
+    def check_url_health(self, tool, max_age=None):
+        urls.append(tool['source_url'])
+        return {'status': 'healthy', 'code': 200}
+
+    monkeypatch.setattr(ToolAuditor, 'check_url_health', check_url_health)
+    return urls
+
+
+def write_tools(workspace, tools):
+    path = workspace / 'toolData.js'
+    path.write_text(f"export const TOOL_DATA = {json.dumps(tools, indent=2)};\n", encoding='utf-8')
+    return str(path)
+
+
+def audit(path, **kwargs):
+    return ToolAuditor(tool_data_path=path, use_cache=False).run_audit(**kwargs)
+
+
+def test_fingerprint_ignores_ids_but_not_content():
+    tool = dict(TOOLS[0])
+    assert tool_fingerprint(tool) == tool_fingerprint(dict(tool, id='99'))
+    assert tool_fingerprint(tool) != tool_fingerprint(dict(tool, source_url='https://alpha.example/new'))
+
+
+def test_first_incremental_run_audits_everything(workspace, checked):
+    report = audit(write_tools(workspace, TOOLS), incremental=True)
+    assert sorted(checked) == sorted(tool['source_url'] for tool in TOOLS)
+    assert report['summary']['healthy'] == 3
+    assert 'incremental' not in report
+
+
+def test_unchanged_catalog_reuses_every_result(workspace, checked):
+    path = write_tools(workspace, TOOLS)
+    first = audit(path, incremental=True)
+    checked.clear()
+
+    second = audit(path, incremental=True)
+    assert checked == []
+    assert second['summary'] == first['summary']
+    assert second['incremental'] == {'changed': 0, 'removed': 0, 'reused_results': 4}
+
+
+def test_only_changed_tools_are_rechecked(workspace, checked):
+    audit(write_tools(workspace, TOOLS), incremental=True)
+    checked.clear()
+
+    edited = [dict(TOOLS[0], source_url='https://alpha.example/v2'), TOOLS[1], dict(TOOLS[2], id='4')]
+    report = audit(write_tools(workspace, edited), incremental=True)
+    assert checked == ['https://alpha.example/v2']
+    assert report['summary']['healthy'] == 3
+    assert report['summary']['outdated'] == 1
+    assert report['incremental'] == {'changed': 1, 'removed': 1, 'reused_results': 3}
+    # Carried-over entries point at the current tool, with its new id
+    assert {entry['tool']['id'] for entry in report['details']['healthy']} == {'1', '2', '4'}
+
+
+def test_tools_never_url_checked_are_checked_later(workspace, checked):
+    path = write_tools(workspace, TOOLS)
+    audit(path, skip_url_check=True, incremental=True)
+    assert checked == []
+
+    audit(path, incremental=True)
+    assert sorted(checked) == sorted(tool['source_url'] for tool in TOOLS)
+
+
+def test_full_run_ignores_previous_state(workspace, checked):
+    path = write_tools(workspace, TOOLS)
+    audit(path, incremental=True)
+    checked.clear()
+
+    report = audit(path)
+    assert len(checked) == 3
+    assert 'incremental' not in report
@@ -0,0 +1,51 @@
+from near_duplicates import canonical_url, find_near_duplicates, split_name
+
+
+def tool(id, name, url, description=''):
+    return {'id': str(id), 'name': name, 'source_url': url, 'short_description': description}
+
+
+def pairs(found):
+    return {(pair['tool1']['name'], pair['tool2']['name']): pair for pair in found}
+
+
+def test_canonical_url():
+    assert canonical_url('https://www.Example.com:443/app/index.html?utm_source=x&b=2&a=1#top') == \
+        'example.com/app?a=1&b=2'
+    assert canonical_url('example.com/') == 'example.com'
+
+
+def test_split_name_aliases():
+    assert split_name('Windsurf (formerly Codeium)') == ('windsurf', ['codeium'])
+    assert split_name('Jasper AI', strip_stopwords=False) == ('jasperai', [])
+
+
+def test_pairs_keep_every_matching_reason():
+    found = find_near_duplicates([
+        tool(1, 'Acme Writer', 'https://acme.com/writer', 'write blog posts with ai fast'),
+        tool(2, 'Acme Writer', 'https://www.acme.com/writer/', 'write blog posts with ai fast'),
+    ])
+    pair, = found['exact']
+    assert pair['reason'] == 'duplicate_url'
+    assert pair['reasons'] == ['duplicate_url', 'duplicate_name', 'similar_name', 'same_domain',
+                               'similar_description']
+    assert pair['score'] == 1.0
+
+
+def test_same_domain_needs_similar_names():
+    found = find_near_duplicates([
+        tool(1, 'Acme Writer', 'https://acme.com/writer'),
+        tool(2, 'Acme Writer Pro', 'https://acme.com/pro'),
+        tool(3, 'Zebra Voice', 'https://acme.com/voice'),
+    ])
+    near = pairs(found['near'])
+    assert set(near) == {('Acme Writer', 'Acme Writer Pro')}
+    assert near[('Acme Writer', 'Acme Writer Pro')]['reasons'] == ['similar_name', 'same_domain']
+
+
+def test_shared_platform_domains_are_ignored():
+    found = find_near_duplicates([
+        tool(1, 'Acme Writer', 'https://github.com/a/writer'),
+        tool(2, 'Acme Writer Pro', 'https://github.com/b/writer-pro'),
+    ])
+    assert [pair['reasons'] for pair in found['near']] == [['similar_name']]
@@ -0,0 +1,92 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket, api_key, host_key, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; sleeping advances it"""
+    now = [1000.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(time, 'sleep', sleep)
+    return SimpleNamespace(now=now, slept=slept)
+
+
+def response(status_code, headers=None):
+    return SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def test_burst_then_queued_reservations(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+
+    clock.now[0] += 10
+    assert bucket.reserve() == pytest.approx(0.0)
+
+
+def test_pause_blocks_the_bucket(clock):
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    assert bucket.pause(30) == 30
+    assert bucket.reserve() == pytest.approx(30)
+    # Without Retry-After the pause doubles with each strike
+    assert bucket.pause(None) == 4
+    bucket.reset_backoff()
+    assert bucket.pause(None) == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+def test_buckets_are_per_key_with_api_limits(monkeypatch):
+    limiter = RateLimiter(host_limit=(2.0, 4), api_limits={'sheets': (1.0, 10)})
+    assert host_key('https://Example.com/a') == 'example.com'
+    assert limiter.bucket('example.com') is limiter.bucket(host_key('https://example.com/b'))
+    assert limiter.bucket('example.com') is not limiter.bucket('other.com')
+    assert limiter.bucket(api_key('sheets')).capacity == 10
+
+    monkeypatch.setenv('RATE_LIMIT_SCREENSHOTONE', '0.25')
+    assert limiter.bucket(api_key('screenshotone')).rate == 0.25
+
+
+def test_is_throttled():
+    limiter = RateLimiter()
+    assert limiter.is_throttled(429, {})
+    assert limiter.is_throttled(503, {'Retry-After': '5'})
+    assert not limiter.is_throttled(503, {})
+    assert not limiter.is_throttled(404, {})
+
+
+def test_call_with_backoff_honours_retry_after(clock):
+    limiter = RateLimiter(host_limit=(100.0, 10))
+    responses = [response(429, {'Retry-After': '7'}), response(200)]
+
+    result = limiter.call_with_backoff('example.com', lambda: responses.pop(0))
+    assert result.status_code == 200
+    assert clock.slept == [pytest.approx(7)]
+    assert limiter.bucket('example.com').strikes == 0
+
+
+def test_call_with_backoff_gives_up_after_max_retries(clock):
+    limiter = RateLimiter(host_limit=(100.0, 10))
+    calls = []
+
+    def request():
+        calls.append(1)
+        return response(429)
+
+    assert limiter.call_with_backoff('example.com', request, max_retries=2).status_code == 429
+    assert len(calls) == 3
+    assert clock.slept == [pytest.approx(2), pytest.approx(4)]
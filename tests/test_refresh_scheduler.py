@@ -0,0 +1,119 @@
+import os
+import time
+
+import pytest
+
+from capture_queue import CaptureQueue
+from refresh_scheduler import RefreshScheduler
+
+
+@pytest.fixture
+def screenshots(tmp_path):
+    directory = tmp_path / 'screenshots'
+    directory.mkdir()
+    for name in ('alpha', 'beta'):
+        (directory / f'{name}.png').write_bytes(b'png')
+    return directory
+
+
+@pytest.fixture
+def pages(monkeypatch, tmp_path):
+    """Content hash each URL returns, editable by the test"""
+    hashes = {'https://alpha.example': 'a1', 'https://beta.example': 'b1'}
+
+    def fetch_page(self, url, previous):
+        return {'etag': None, 'last_modified': None, 'content_hash': hashes[url]}
+
+    monkeypatch.setattr(RefreshScheduler, '_fetch_page', fetch_page)
+    # No URL audit cache, so redirect signals stay out of these tests
+    monkeypatch.setattr('refresh_scheduler.DEFAULT_CACHE_PATH', tmp_path / 'no-audit-cache.sqlite3')
+    return hashes
+
+
+TOOLS = [
+    {'name': 'Alpha', 'source_url': 'https://alpha.example', 'screenshot_url': '/screenshots/alpha.png'},
+    {'name': 'Beta', 'source_url': 'https://beta.example', 'screenshot_url': '/screenshots/beta.png'},
+]
+
+
+def make_scheduler(tmp_path, screenshots, queue, budget):
+    return RefreshScheduler(str(screenshots), queue=queue, path=str(tmp_path / 'signals.sqlite3'),
+                            daily_budget=budget, check_interval_hours=0)
+
+
+def new_day(scheduler):
+    with scheduler.db:
+        scheduler.db.execute("DELETE FROM budget")
+
+
+def finish(queue):
+    for job in queue.claim():
+        job.screenshot_path = f"/screenshots/{job.filename}"
+        queue.record(job)
+
+
+def test_first_sight_only_records_signals(tmp_path, screenshots, pages):
+    with CaptureQueue(str(tmp_path / 'queue.sqlite3')) as queue:
+        scheduler = make_scheduler(tmp_path, screenshots, queue, budget=5)
+        assert scheduler.schedule(TOOLS) == []
+        rows = scheduler.db.execute("SELECT filename, content_hash FROM signals ORDER BY filename").fetchall()
+        assert [tuple(row) for row in rows] == [('alpha.png', 'a1'), ('beta.png', 'b1')]
+
+
+def test_change_over_budget_is_queued_on_a_later_day(tmp_path, screenshots, pages):
+    with CaptureQueue(str(tmp_path / 'queue.sqlite3')) as queue:
+        scheduler = make_scheduler(tmp_path, screenshots, queue, budget=1)
+        scheduler.schedule(TOOLS)
+
+        pages['https://alpha.example'] = 'a2'
+        pages['https://beta.example'] = 'b2'
+        first = scheduler.schedule(TOOLS)
+        assert [reason for _, reason in first] == ['content changed']
+        finish(queue)
+
+        # The tool that missed the budget must still look changed tomorrow
+        new_day(scheduler)
+        second = scheduler.schedule(TOOLS)
+        waited = ({'Alpha', 'Beta'} - {first[0][0]['name']}).pop()
+        assert [(tool['name'], reason) for tool, reason in second] == [(waited, 'content changed')]
+
+        # And once queued, its new signals are the baseline
+        finish(queue)
+        new_day(scheduler)
+        assert scheduler.schedule(TOOLS) == []
+
+
+def test_dry_run_records_nothing(tmp_path, screenshots, pages):
+    with CaptureQueue(str(tmp_path / 'queue.sqlite3')) as queue:
+        scheduler = make_scheduler(tmp_path, screenshots, queue, budget=5)
+        scheduler.schedule(TOOLS)
+        pages['https://alpha.example'] = 'a2'
+        assert len(scheduler.schedule(TOOLS, dry_run=True)) == 1
+        assert scheduler.remaining_budget() == 5
+        assert len(scheduler.schedule(TOOLS)) == 1
+
+
+def test_stale_unchanged_recapture_is_not_requeued(tmp_path, screenshots, pages):
+    old = time.time() - 120 * 86400
+    for name in ('alpha.png', 'beta.png'):
+        os.utime(screenshots / name, (old, old))
+
+    with CaptureQueue(str(tmp_path / 'queue.sqlite3')) as queue:
+        scheduler = make_scheduler(tmp_path, screenshots, queue, budget=5)
+        stale = scheduler.schedule(TOOLS)
+        assert sorted(reason for _, reason in stale) == ['stale', 'stale']
+
+        # The re-captures came back unchanged, so the files keep their old mtime
+        finish(queue)
+        new_day(scheduler)
+        assert scheduler.schedule(TOOLS) == []
+        assert scheduler.remaining_budget() == 5
+
+
+def test_missing_screenshot_is_most_urgent(tmp_path, screenshots, pages):
+    (screenshots / 'beta.png').unlink()
+    with CaptureQueue(str(tmp_path / 'queue.sqlite3')) as queue:
+        scheduler = make_scheduler(tmp_path, screenshots, queue, budget=1)
+        selected = scheduler.schedule(TOOLS)
+        assert [(tool['name'], reason) for tool, reason in selected] == [('Beta', 'missing')]
+        assert queue.state('beta.png') == 'pending'
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import tool_data
+from tool_data import ToolDataParseError, load_tool_data, parse_tool_data
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(tool_data, 'CACHE_DIR', tmp_path / 'cache')
+    return tmp_path / 'cache'
+
+
+def test_json_array_keeps_the_text_around_it():
+    source = '// header\nexport const TOOL_DATA = [{"id": "1", "name": "A"}];\nexport default TOOL_DATA;\n'
+    tools, prefix, suffix = parse_tool_data(source)
+    assert tools == [{'id': '1', 'name': 'A'}]
+    assert prefix == '// header\nexport const TOOL_DATA = '
+    assert suffix == ';\nexport default TOOL_DATA;\n'
+
+
+def test_javascript_literals():
+    source = """const TOOL_DATA = [
+      // a comment
+      {id: 1, name: 'Single \\'quoted\\'', note: `back
+tick`, hex: 0x1F, ratio: .5, big: 1e3, gone: undefined,},
+      /* block */ {"name": "\\u00e9\\ud83d\\ude00\\x41", flag: true},
+    ];"""
+    tools, _, suffix = parse_tool_data(source)
+    assert tools == [
+        {'id': 1, 'name': "Single 'quoted'", 'note': 'back\ntick', 'hex': 31, 'ratio': 0.5, 'big': 1000.0,
+         'gone': None},
+        {'name': 'é😀A', 'flag': True},
+    ]
+    assert suffix == ';'
+
+
+@pytest.mark.parametrize('source, message', [
+    ('const TOOL_DATA = [{name: "a"}, ', 'Unexpected end of input'),
+    ('const TOOL_DATA = [{name: `${x}`}]', 'interpolation'),
+    ('const TOOL_DATA = [{name: "a" "b"}]', "Expected ',' or '}'"),
+    ('export default {}', 'No tool array'),
+])
+def test_parse_errors(source, message):
+    with pytest.raises(ToolDataParseError, match=message):
+        parse_tool_data(source)
+
+
+def test_error_reports_line_and_column():
+    with pytest.raises(ToolDataParseError, match='line 3, column 3'):
+        parse_tool_data('const TOOL_DATA = [\n  {a: 1},\n  ?\n]')
+
+
+def test_sidecar_is_reused_until_the_file_changes(tmp_path, cache_dir, monkeypatch):
+    path = tmp_path / 'toolData.js'
+    path.write_text('export const TOOL_DATA = [{"name": "A"}];\n', encoding='utf-8')
+    assert load_tool_data(path).tools == [{'name': 'A'}]
+    assert len(list(cache_dir.glob('tooldata-*.pickle'))) == 1
+
+    parses = []
+    monkeypatch.setattr(tool_data, 'parse_tool_data', lambda content: parses.append(content) or ([], '', ''))
+
+    # Same bytes with a new mtime: hashed, not parsed
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_tool_data(path).tools == [{'name': 'A'}]
+    assert parses == []
+
+    path.write_text('export const TOOL_DATA = [{"name": "B"}];\n', encoding='utf-8')
+    load_tool_data(path)
+    assert len(parses) == 1
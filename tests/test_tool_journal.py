@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import tool_data
+from tool_data import file_sha256, iter_tool_data_chunks, load_tool_data, save_tool_data
+from tool_journal import ChangeJournal, apply_ops, diff_tools
+
+REPO_TOOL_DATA = Path(__file__).parent.parent / 'frontend' / 'src' / 'app' / 'utils' / 'toolData.js'
+
+TOOLS = [
+    {'id': '1', 'name': 'Alpha', 'source_url': 'https://alpha.example/'},
+    {'id': '2', 'name': 'Beta', 'source_url': 'https://beta.example/'},
+]
+PREFIX = '// Generated\n\nexport const TOOL_DATA = '
+SUFFIX = ';\n'
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(tool_data, 'CACHE_DIR', tmp_path / 'cache')
+
+
+@pytest.fixture
+def tool_file(tmp_path):
+    path = tmp_path / 'toolData.js'
+    path.write_text(PREFIX + json.dumps(TOOLS, indent=2) + SUFFIX, encoding='utf-8')
+    return path
+
+
+def test_repo_tool_data_round_trips_byte_for_byte():
+    data = load_tool_data(REPO_TOOL_DATA)
+    assert ''.join(iter_tool_data_chunks(data.tools, data.prefix, data.suffix)).encode('utf-8') == \
+        REPO_TOOL_DATA.read_bytes()
+
+
+def test_unchanged_save_is_byte_identical_and_not_journaled(tool_file):
+    original = tool_file.read_bytes()
+    data = load_tool_data(tool_file)
+    save_tool_data(tool_file, data.tools, data.prefix, data.suffix)
+    assert tool_file.read_bytes() == original
+    assert ChangeJournal.for_tool_data(tool_file).entries() == []
+
+
+def test_diff_and_apply_are_inverse():
+    after = [dict(TOOLS[0], name='Alpha 2'), {'id': '3', 'name': 'Gamma'}, {'id': '4', 'name': 'Delta'}]
+    ops = diff_tools(TOOLS, after)
+    assert ops[0] == {'i': 0, 'before': {'name': 'Alpha'}, 'after': {'name': 'Alpha 2'}}
+    assert apply_ops(TOOLS, ops) == after
+    assert apply_ops(after, ops, reverse=True) == TOOLS
+
+
+def test_rollback_restores_the_original_bytes(tool_file):
+    original = tool_file.read_bytes()
+    journal = ChangeJournal.for_tool_data(tool_file)
+
+    data = load_tool_data(tool_file)
+    save_tool_data(tool_file, [dict(TOOLS[0], name='Alpha 2'), TOOLS[1]], data.prefix, data.suffix, reason='rename')
+    data = load_tool_data(tool_file)
+    save_tool_data(tool_file, data.tools[:1], '// Edited\nexport const TOOL_DATA = ', data.suffix, reason='remove')
+    assert [entry['reason'] for entry in journal.applied(tool_file)] == ['rename', 'remove']
+
+    assert journal.rollback(tool_file) == [2]
+    assert [tool['name'] for tool in load_tool_data(tool_file).tools] == ['Alpha 2', 'Beta']
+    assert journal.rollback(tool_file) == [1]
+    assert tool_file.read_bytes() == original
+    with pytest.raises(ValueError, match='No journaled changes'):
+        journal.rollback(tool_file)
+
+
+def test_rollback_to_a_sequence_undoes_everything_after_it(tool_file):
+    original = tool_file.read_bytes()
+    for name in ('One', 'Two', 'Three'):
+        data = load_tool_data(tool_file)
+        save_tool_data(tool_file, [dict(TOOLS[0], name=name), TOOLS[1]], data.prefix, data.suffix)
+
+    assert ChangeJournal.for_tool_data(tool_file).rollback(tool_file, seq=1) == [3, 2, 1]
+    assert tool_file.read_bytes() == original
+
+
+def test_edits_made_outside_the_journal_block_rollback(tool_file):
+    data = load_tool_data(tool_file)
+    save_tool_data(tool_file, data.tools[:1], data.prefix, data.suffix)
+    tool_file.write_text(tool_file.read_text(encoding='utf-8') + '// hand edit\n', encoding='utf-8')
+
+    journal = ChangeJournal.for_tool_data(tool_file)
+    assert journal.applied(tool_file) == []
+    with pytest.raises(ValueError):
+        journal.rollback(tool_file, seq=1)
+
+
+def test_torn_final_line_is_ignored(tool_file):
+    data = load_tool_data(tool_file)
+    sha256 = save_tool_data(tool_file, data.tools[:1], data.prefix, data.suffix)
+    journal = ChangeJournal.for_tool_data(tool_file)
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 2, "ops": [')
+
+    assert [entry['sha256'] for entry in journal.entries()] == [sha256]
+    assert file_sha256(tool_file) == sha256
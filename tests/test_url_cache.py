@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from url_cache import UrlCache
+
+URL = 'https://example.com'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = UrlCache(tmp_path / 'url_cache.sqlite3')
+    yield cache
+    cache.close()
+
+
+def test_unknown_url_needs_a_plain_request(cache):
+    assert cache.lookup(URL) == (None, {})
+
+
+def test_validators_become_conditional_headers(cache):
+    headers = {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+    cache.record(URL, 200, headers, {'status': 'ok', 'code': 200})
+
+    result, conditional = cache.lookup(URL)
+    assert result is None
+    assert conditional == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+
+
+def test_only_final_responses_keep_validators(cache):
+    cache.record(URL, 301, {'ETag': '"v1"'}, {'status': 'redirect', 'code': 301, 'location': 'https://example.org'})
+    assert cache.lookup(URL) == (None, {})
+    assert cache.get(URL)['location'] == 'https://example.org'
+
+
+def test_fresh_entry_skips_the_request(cache):
+    cache.record(URL, 200, {}, {'status': 'ok', 'code': 200})
+
+    result, conditional = cache.lookup(URL, max_age=3600)
+    assert result == {'status': 'ok', 'code': 200, 'cached': True}
+    assert conditional == {}
+    assert cache.stats['fresh'] == 1
+
+
+def test_not_modified_reuses_the_stored_result(cache):
+    cache.record(URL, 200, {'ETag': '"v1"'}, {'status': 'ok', 'code': 200})
+    before = cache.get(URL)['checked_at']
+    time.sleep(0.01)
+
+    result = cache.record(URL, 304, {}, {'status': 'error', 'code': 304})
+    assert result == {'status': 'ok', 'code': 200, 'revalidated': True}
+    entry = cache.get(URL)
+    assert entry['etag'] == '"v1"'
+    assert entry['checked_at'] > before
+    assert cache.stats['revalidated'] == 1
+
+
+def test_not_modified_without_an_entry_is_stored(cache):
+    result = cache.record(URL, 304, {}, {'status': 'error', 'code': 304})
+    assert result == {'status': 'error', 'code': 304}
+    assert cache.get(URL)['status'] == 'error'
+
+
+def test_results_survive_reopening(tmp_path):
+    path = tmp_path / 'url_cache.sqlite3'
+    cache = UrlCache(path)
+    cache.record(URL, 200, {'ETag': '"v1"'}, {'status': 'ok', 'code': 200})
+    cache.close()
+
+    reopened = UrlCache(path)
+    assert reopened.lookup(URL) == (None, {'If-None-Match': '"v1"'})
+    reopened.close()
+
+
+def test_evict_drops_expired_then_oldest(tmp_path):
+    cache = UrlCache(tmp_path / 'url_cache.sqlite3', ttl=60, max_entries=2)
+    for i in range(4):
+        cache.record(f'{URL}/{i}', 200, {}, {'status': 'ok', 'code': 200})
+    with cache._lock:
+        cache._conn.execute("UPDATE url_results SET checked_at = ? WHERE url = ?", (time.time() - 120, f'{URL}/0'))
+        cache._conn.execute("UPDATE url_results SET checked_at = checked_at - 10 WHERE url = ?", (f'{URL}/1',))
+
+    assert cache.evict() == 2
+    assert cache.get(f'{URL}/0') is None
+    assert cache.get(f'{URL}/1') is None
+    assert cache.get(f'{URL}/3') is not None
+    cache.close()